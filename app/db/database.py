@@ -1,16 +1,35 @@
 """
 Módulo de configuración de la base de datos para imdb_scraper.
 
-Este archivo define el motor de conexión a la base de datos y la dependencia `get_db`
-utilizada por FastAPI para manejar sesiones con SQLAlchemy.
+Este archivo define los motores de conexión a la base de datos y las dependencias
+utilizadas por FastAPI para manejar sesiones con SQLAlchemy:
+
+* `get_async_db`: sesión asíncrona (asyncpg en PostgreSQL, aiosqlite en SQLite)
+  que usan las rutas de la API, que corren directamente en el event loop.
+* `get_db` / `SessionLocal`: sesión síncrona (psycopg2) para scripts como
+  `app/scripts/run_query.py`.
+
+El tamaño del pool de ambos motores se configura con `DB_POOL_SIZE`,
+`DB_MAX_OVERFLOW`, `DB_POOL_TIMEOUT` y `DB_POOL_RECYCLE`.
+
+Con `DB=sqlite` la API lee el archivo de `NAMEDB` (por defecto el
+`imdb_movies.db` de `SQLiteStrategy`) y cada conexión recibe las funciones y
+pragmas de `app/db/sqlite.py`.
 """
 
 import os
+from contextlib import asynccontextmanager
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from dotenv import load_dotenv
 from app.db.base import Base
+from app.db.sqlite import install_sqlite_hooks, sqlite_connect_args
+from app.metrics import METRICS_ENABLED, install_engine_metrics, timed_pool_class
+from app.slow_queries import install_slow_query_log
 from fastapi import FastAPI
 
 load_dotenv()
@@ -22,15 +41,98 @@ NAME_SERVICEDB = os.getenv("NAME_SERVICEDB")
 PORT = os.getenv("PORT_DB")
 NAMEDB = os.getenv("NAMEDB")
 
-DATABASE_URL = f"{DB}://{USERDB}:{PASSWORDDB}@{NAME_SERVICEDB}:{PORT}/{NAMEDB}"
-engine = create_engine(DATABASE_URL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Driver asíncrono de cada motor; el resto de la URL es la misma
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+if DB == "sqlite":
+    DATABASE_URL = f"sqlite:///{NAMEDB or 'imdb_movies.db'}"
+else:
+    DATABASE_URL = f"{DB}://{USERDB}:{PASSWORDDB}@{NAME_SERVICEDB}:{PORT}/{NAMEDB}"
+
+
+def async_database_url(url: str) -> str:
+    """Misma URL con el driver asíncrono (`postgresql` -> `postgresql+asyncpg`)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay driver asíncrono configurado para '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
 
+
+def pool_options(url: str, label: str = "sync") -> dict:
+    """
+    Parámetros del pool; SQLite usa el pool por defecto de su dialecto y
+    crea sus conexiones con las funciones de `app/db/sqlite.py`. Con
+    `METRICS_ENABLED`, el pool de PostgreSQL mide la espera de cada checkout
+    (`label` es `sync` o `async`).
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"connect_args": sqlite_connect_args()}
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+    if METRICS_ENABLED:
+        options["poolclass"] = timed_pool_class(AsyncAdaptedQueuePool if label == "async" else QueuePool, label)
+    return options
+
+
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, "async"))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if engine.dialect.name == "sqlite":
+    install_sqlite_hooks(engine)
+    install_sqlite_hooks(async_engine.sync_engine)
 
-def init_db(app: FastAPI):
-    Base.metadata.create_all(engine)
+if METRICS_ENABLED:
+    install_engine_metrics(engine, "sync")
+    install_engine_metrics(async_engine.sync_engine, "async")
+
+# Sólo con SLOW_QUERY_MS; los planes se piden siempre con el motor síncrono
+install_slow_query_log(engine, explain_engine=engine)
+install_slow_query_log(async_engine.sync_engine, explain_engine=engine)
+
+
+@asynccontextmanager
+async def init_db(app: FastAPI):
+    """
+    Crea las tablas, la vista `movie_actor_view` y los índices de búsqueda de
+    nombres una sola vez al arrancar, para que los endpoints no ejecuten DDL
+    en cada petición. Carga los índices en memoria que correspondan (motor
+    NumPy, búsqueda de actores sin `pg_trgm`). Al apagar, cierra las
+    conexiones del pool.
+    """
+    from app.models import models  # noqa: F401  (registra las tablas en Base)
+    from app.queries.actor import create_view_actor_movie
+    from app.queries.numpy_engine import ANALYTICS_ENGINE, numpy_engine
+    from app.queries.actor_search import actor_search_engine, create_people_search_indexes, uses_memory_index
+
+    async with async_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(create_view_actor_movie)
+        await db.run_sync(create_people_search_indexes)
+        if ANALYTICS_ENGINE == "numpy":
+            await numpy_engine.arrays(db)
+        if uses_memory_index(async_engine.dialect.name, "fuzzy"):
+            await actor_search_engine.index(db)
     yield
+    await async_engine.dispose()
 
 def get_db():
     """
@@ -43,3 +145,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Genera una sesión asíncrona para las rutas `async def` de FastAPI.
+
+    La sesión se cierra (y su conexión vuelve al pool) al terminar la petición.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,127 @@
+"""
+Soporte de SQLite para la API.
+
+Las consultas de analítica usan funciones que SQLite no trae (`STDDEV_SAMP`) o
+que se comportan distinto (`ROUND` sobre doubles):
+
+* el agregado `stddev_samp(x)` (desviación estándar muestral, Welford);
+* `round(x, n)` con la semántica de `ROUND(x::numeric, n)` de PostgreSQL
+  (15 dígitos significativos y empates alejándose de cero);
+* `sqrt(x)`, por si la compilación de SQLite no incluye las funciones matemáticas.
+
+`install_sqlite_hooks` las registra en cada conexión nueva, a través del evento
+`connect` del motor, y aplica `SQLITE_PRAGMAS` (WAL, caché de páginas y mmap)
+para lecturas concurrentes sobre un archivo local.
+
+`aiosqlite` sólo expone `create_function`, no `create_aggregate`, y la conexión
+`sqlite3` vive en su hilo. Por eso el motor asíncrono se crea con
+`connect_args=sqlite_connect_args()`: `sqlite3.connect` construye la conexión
+con `AnalyticsConnection`, que registra las funciones al crearse, ya en ese
+hilo.
+"""
+
+import math
+import sqlite3
+from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,  # KiB (64 MB)
+    "mmap_size": 268435456,  # 256 MB
+    "busy_timeout": 5000,  # ms
+    "foreign_keys": "ON",
+}
+
+
+class StddevSamp:
+    """Agregado `stddev_samp(x)` con el algoritmo de Welford; NULL con menos de dos valores."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def step(self, value):
+        if value is None:
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def finalize(self):
+        if self.count < 2:
+            return None
+        return math.sqrt(self.m2 / (self.count - 1))
+
+
+def round_numeric(value, digits=0):
+    """`ROUND(value::numeric, digits)` de PostgreSQL sobre un double."""
+    if value is None:
+        return None
+    try:
+        exact = Decimal(f"{float(value):.15g}")
+        return float(exact.quantize(Decimal(1).scaleb(-int(digits)), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):
+        return value
+
+
+def sqrt(value):
+    if value is None or value < 0:
+        return None
+    return math.sqrt(value)
+
+
+def register_functions(connection: sqlite3.Connection) -> None:
+    connection.create_aggregate("stddev_samp", 1, StddevSamp)
+    connection.create_function("round", 2, round_numeric, deterministic=True)
+    connection.create_function("sqrt", 1, sqrt, deterministic=True)
+
+
+class AnalyticsConnection(sqlite3.Connection):
+    """Conexión `sqlite3` que registra las funciones de analítica al crearse."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        register_functions(self)
+
+
+def sqlite_connect_args() -> dict:
+    """`connect_args` de los motores SQLite (obligatorio con aiosqlite para `stddev_samp`)."""
+    return {"factory": AnalyticsConnection}
+
+
+def _register(dbapi_connection) -> None:
+    driver = getattr(dbapi_connection, "driver_connection", dbapi_connection)
+    if isinstance(driver, AnalyticsConnection):
+        return
+    if isinstance(driver, sqlite3.Connection):
+        register_functions(driver)
+        return
+
+    # aiosqlite sin `sqlite_connect_args()`: sólo se pueden registrar funciones
+    # escalares; las consultas con STDDEV_SAMP fallarán
+    dbapi_connection.create_function("round", 2, round_numeric, deterministic=True)
+    dbapi_connection.create_function("sqrt", 1, sqrt, deterministic=True)
+
+
+def _on_connect(dbapi_connection, connection_record) -> None:
+    _register(dbapi_connection)
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_hooks(engine: Engine) -> None:
+    """
+    Registra funciones y pragmas en cada conexión de `engine` (o
+    `async_engine.sync_engine`, creado con `connect_args=sqlite_connect_args()`).
+    """
+    event.listen(engine, "connect", _on_connect)
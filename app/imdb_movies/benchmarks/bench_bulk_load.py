@@ -0,0 +1,112 @@
+"""
+Benchmark de carga a base de datos: ORM fila a fila vs `BulkMovieLoader` vs
+el cargador propio de la estrategia (COPY en PostgreSQL).
+
+Genera un DataFrame sintético con la forma de la salida refinada y lo carga
+en una base SQLite temporal (o en la base configurada con --db).
+
+Uso (desde app/imdb_movies):
+    python -m benchmarks.bench_bulk_load
+    python -m benchmarks.bench_bulk_load --rows 100000 --batch-size 5000 --orm-rows 10000
+    python -m benchmarks.bench_bulk_load --db postgresql
+"""
+
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from imdb_movies.models_patterns.database_strategies import DatabaseStrategy, SQLiteStrategy, DatabaseStrategyFactory
+from imdb_movies.models_patterns.movie_factory import MovieFactory
+from imdb_movies.models_patterns.bulk_loader import BulkMovieLoader
+
+
+def synthetic_frame(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows)
+    return pd.DataFrame({
+        "title": [f"Película {i}" for i in ids],
+        "movie_id": [f"tt{i:07d}" for i in ids],
+        "date_published": pd.to_datetime(
+            rng.integers(1920, 2025, rows).astype(str), format="%Y"
+        ),
+        "rating": rng.uniform(1, 10, rows).round(1).astype("float32"),
+        "duration_minutes": rng.integers(60, 240, rows).astype(float),
+        "metascore": pd.array(rng.integers(1, 100, rows), dtype="Int16"),
+        "actors": [[f"Actor {i}", f"Actor {i + 1}", f"Actor {i + 2}"] for i in ids],
+        "actor_ids": [[f"nm{i:07d}", f"nm{i + 1:07d}", f"nm{i + 2:07d}"] for i in ids],
+        "movie_url": [f"https://www.imdb.com/title/tt{i:07d}/" for i in ids],
+    })
+
+
+def reset_tables(strategy: DatabaseStrategy) -> None:
+    with strategy.engine.begin() as connection:
+        connection.execute(text("DELETE FROM movie_people"))
+        connection.execute(text("DELETE FROM people"))
+        connection.execute(text("DELETE FROM movies"))
+
+
+def load_orm(strategy: DatabaseStrategy, df: pd.DataFrame) -> float:
+    session = strategy.get_session()
+    people = {}
+    start = time.perf_counter()
+    for _, row in df.iterrows():
+        session.add(MovieFactory.create_movie_from_row(row, people))
+    session.commit()
+    elapsed = time.perf_counter() - start
+    session.close()
+    return elapsed
+
+
+def load_bulk(strategy: DatabaseStrategy, loader: BulkMovieLoader, df: pd.DataFrame) -> float:
+    session = strategy.get_session()
+    start = time.perf_counter()
+    loader.load_frame(session, df)
+    session.commit()
+    elapsed = time.perf_counter() - start
+    session.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga masiva")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--orm-rows", type=int, default=10_000, help="Filas para el camino ORM (0 lo omite)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--db", type=str, default="sqlite", help="sqlite (temporal) o un tipo de DatabaseStrategyFactory")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench_bulk_load")
+    if args.db == "sqlite":
+        strategy = SQLiteStrategy(db_path=str(Path(tempfile.mkdtemp()) / "bench.db"), logger=logger)
+        strategy.create_tables_if_not_exist()
+    else:
+        strategy = DatabaseStrategyFactory.create_strategy(args.db, logger)
+
+    df = synthetic_frame(args.rows)
+    print(f"Base: {strategy.engine.url.render_as_string(hide_password=True)}")
+
+    if args.orm_rows:
+        orm_df = df.head(args.orm_rows)
+        reset_tables(strategy)
+        elapsed = load_orm(strategy, orm_df)
+        print(f"  ORM ({len(orm_df):>7} películas): {elapsed:8.2f}s  {len(orm_df) / elapsed:10.0f} películas/s")
+
+    loaders = [BulkMovieLoader(args.batch_size, logger)]
+    strategy_loader = strategy.get_bulk_loader(args.batch_size)
+    if type(strategy_loader) is not BulkMovieLoader:
+        loaders.append(strategy_loader)
+
+    for loader in loaders:
+        reset_tables(strategy)
+        elapsed = load_bulk(strategy, loader, df)
+        name = type(loader).__name__
+        print(f"  {name} ({len(df):>7} películas): {elapsed:8.2f}s  {len(df) / elapsed:10.0f} películas/s")
+    reset_tables(strategy)
+
+
+if __name__ == "__main__":
+    main()
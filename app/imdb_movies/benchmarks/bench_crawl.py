@@ -0,0 +1,67 @@
+"""
+Benchmark de extremo a extremo: crawl → refinado → carga sin acceso a la red.
+
+Ejecuta `imdb_movies_spider` con `RESPONSE_ARCHIVE_MODE=replay` sobre un
+archivo grabado antes con `RESPONSE_ARCHIVE_MODE=record`, e informa el tiempo
+total (incluye el refinado y la carga que hace el pipeline al cerrar el
+spider) y las estadísticas del crawl. Con --json guarda el resultado para
+compararlo entre commits.
+
+Uso (desde app/imdb_movies):
+    scrapy crawl imdb_movies_spider -a refine=0 -s RESPONSE_ARCHIVE_MODE=record
+    DB=sqlite python -m benchmarks.bench_crawl
+    DB=sqlite python -m benchmarks.bench_crawl --archive /ruta/archivo --refine 0 --json resultado.json
+"""
+
+import os
+import json
+import time
+import argparse
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from imdb_movies.enum_model import RefineLevel
+from imdb_movies.spiders.imdb_movies_spider import ImdbMoviesSpiderSpider
+
+REPORTED_STATS = (
+    "item_scraped_count",
+    "response_archive/replay/hit",
+    "response_archive/replay/miss",
+    "response_archive/replay/bytes",
+    "elapsed_time_seconds",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de crawl → refinado → carga reproduciendo respuestas grabadas")
+    parser.add_argument("--archive", type=str, default=None, help="Directorio del archivo (por defecto data/archive)")
+    parser.add_argument("--refine", type=int, default=RefineLevel.ADVANCED.value, help="0 = sólo extracción, 2 = extracción, refinado y carga")
+    parser.add_argument("--json", type=str, default=None, help="Archivo donde guardar el resultado")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "imdb_movies.settings")
+    settings = get_project_settings()
+    settings.set("RESPONSE_ARCHIVE_MODE", "replay")
+    if args.archive:
+        settings.set("RESPONSE_ARCHIVE_DIR", args.archive)
+
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(ImdbMoviesSpiderSpider)
+    start = time.perf_counter()
+    process.crawl(crawler, refine=args.refine)
+    process.start()
+    elapsed = time.perf_counter() - start
+
+    stats = crawler.stats.get_stats()
+    result = {"refine": args.refine, "total_seconds": round(elapsed, 3)}
+    result.update({key: stats.get(key, 0) for key in REPORTED_STATS})
+
+    print(f"Crawl → refinado → carga (refine={args.refine}): {elapsed:8.2f}s")
+    for key in REPORTED_STATS:
+        print(f"  {key}: {result[key]}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark de la extracción ld+json del spider.
+
+Compara el camino anterior (XPath + `literal_eval` + doble regex de metascore)
+con `imdb_movies.imdb_extract` sobre páginas HTML guardadas y reporta páginas
+por segundo de cada uno.
+
+Uso (desde app/imdb_movies):
+    python -m benchmarks.bench_extract
+    python -m benchmarks.bench_extract --fixtures /ruta/a/html --repeat 200
+"""
+
+import re
+import time
+import argparse
+from ast import literal_eval
+from pathlib import Path
+from scrapy.http import HtmlResponse
+from imdb_movies.enum_model import ConfigImdb
+from imdb_movies.imdb_extract import extract_ld_json, extract_metascore
+
+FIXTURES_PATH = Path(__file__).resolve().parent / "fixtures"
+
+
+def legacy_extract(response: HtmlResponse) -> tuple:
+    info_movie = literal_eval(response.xpath(ConfigImdb.XPATH_JSON_INFO.value).get())
+    metascore = (
+        re.search(r"\"score\":([\d.]+)", response.text).group(1)
+        if re.search(r"\"score\":([\d.]+)", response.text)
+        else ""
+    )
+    return info_movie, metascore
+
+
+def fast_extract(response: HtmlResponse) -> tuple:
+    body_text = response.text
+    info_movie = extract_ld_json(body_text)
+    return info_movie, extract_metascore(body_text, info_movie)
+
+
+def load_pages(fixtures_path: Path) -> list[tuple[str, bytes]]:
+    pages = [(p.name, p.read_bytes()) for p in sorted(fixtures_path.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No hay fixtures HTML en '{fixtures_path}'")
+    return pages
+
+
+def run(extractor, pages: list[tuple[str, bytes]], repeat: int) -> float:
+    """Devuelve páginas por segundo. Cada respuesta se crea nueva para no reutilizar cachés."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name, body in pages:
+            response = HtmlResponse(url=f"https://www.imdb.com/{name}", body=body, encoding="utf-8")
+            extractor(response)
+    elapsed = time.perf_counter() - start
+    return (repeat * len(pages)) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extracción ld+json")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_PATH)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures)
+    for name, body in pages:
+        response = HtmlResponse(url=f"https://www.imdb.com/{name}", body=body, encoding="utf-8")
+        if legacy_extract(response) != fast_extract(response):
+            raise SystemExit(f"Resultados distintos entre extractores para '{name}'")
+
+    legacy_pps = run(legacy_extract, pages, args.repeat)
+    fast_pps = run(fast_extract, pages, args.repeat)
+
+    print(f"Páginas: {len(pages)} x {args.repeat} repeticiones")
+    print(f"  actual  (xpath + literal_eval): {legacy_pps:10.1f} páginas/s")
+    print(f"  nuevo   (imdb_extract)        : {fast_pps:10.1f} páginas/s")
+    print(f"  mejora                        : {fast_pps / legacy_pps:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
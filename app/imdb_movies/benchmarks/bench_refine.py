@@ -0,0 +1,92 @@
+"""
+Benchmark del refinado: camino anterior (`astype` del DataFrame completo +
+`isodate.parse_duration` fila a fila) vs `imdb_refine.refine_frame`.
+
+Genera un DataFrame sintético con la forma de `info_movie` (por defecto 1M
+filas, con un pequeño porcentaje de valores inválidos) y reporta filas/s.
+
+Uso (desde app/imdb_movies):
+    python -m benchmarks.bench_refine
+    python -m benchmarks.bench_refine --rows 200000 --skip-legacy
+"""
+
+import time
+import argparse
+import isodate
+import numpy as np
+import pandas as pd
+from imdb_movies.enum_model import ConfigRefine
+from imdb_movies.imdb_refine import refine_frame
+
+
+def synthetic_raw_frame(rows: int, invalid_ratio: float = 0.001, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    hours = rng.integers(0, 4, rows)
+    minutes = rng.integers(0, 60, rows)
+    durations = np.char.add(
+        np.char.add(np.char.add("PT", hours.astype(str)), "H"),
+        np.char.add(minutes.astype(str), "M"),
+    ).astype(object)
+    durations[rng.random(rows) < invalid_ratio] = "desconocida"
+
+    ids = np.arange(rows).astype(str)
+    return pd.DataFrame({
+        "title": np.char.add("Película ", ids).astype(object),
+        "alternate_title": np.char.add("Movie ", ids).astype(object),
+        "rating": rng.uniform(1, 10, rows).round(1),
+        "duration": durations,
+        "movie_url": np.char.add("https://www.imdb.com/title/tt", ids).astype(object),
+        "movie_id": np.char.add("tt", ids).astype(object),
+        "date_published": np.char.add(rng.integers(1920, 2025, rows).astype(str), "-01-01").astype(object),
+        "actors": [["Actor"]] * rows,
+        "metascore": rng.integers(1, 100, rows),
+    })
+
+
+def legacy_refine(df: pd.DataFrame) -> pd.DataFrame:
+    def parse_duration(iso_duration):
+        try:
+            return isodate.parse_duration(iso_duration).total_seconds() / 60
+        except Exception:
+            return None
+
+    df = df.astype(ConfigRefine.DATA_TYPE.value)
+    df["date_published"] = pd.to_datetime(df["date_published"], errors="coerce")
+    df["duration_minutes"] = df["duration"].apply(parse_duration)
+    return df
+
+
+def vectorized_refine(df: pd.DataFrame) -> pd.DataFrame:
+    return refine_frame(df)[0]
+
+
+def run(refine, df: pd.DataFrame) -> float:
+    """Devuelve filas por segundo; cada ejecución trabaja sobre una copia del frame."""
+    df = df.copy()
+    start = time.perf_counter()
+    refine(df)
+    return len(df) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del refinado")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skip-legacy", action="store_true", help="Omite el camino fila a fila")
+    args = parser.parse_args()
+
+    df = synthetic_raw_frame(args.rows)
+    print(f"Filas: {len(df)}")
+
+    results = {}
+    if not args.skip_legacy:
+        results["legacy"] = run(legacy_refine, df)
+    results["vectorizado"] = run(vectorized_refine, df)
+
+    for name, rate in results.items():
+        print(f"  {name:<12} {rate:12,.0f} filas/s")
+    if "legacy" in results:
+        print(f"  mejora: {results['vectorizado'] / results['legacy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Control adaptativo de concurrencia y retardo por slot de descarga (AIMD).
+
+Reemplaza el `DOWNLOAD_DELAY` fijo: cada slot (un dominio) empieza con
+`ADAPTIVE_THROTTLE_START_CONCURRENCY` peticiones simultáneas y
+`ADAPTIVE_THROTTLE_START_DELAY` segundos entre peticiones, y se ajusta con
+cada respuesta:
+
+* Aumento aditivo: si la latencia media (EWMA) está por debajo de
+  `ADAPTIVE_THROTTLE_TARGET_LATENCY`, el retardo baja
+  `ADAPTIVE_THROTTLE_DELAY_STEP` segundos hasta `ADAPTIVE_THROTTLE_MIN_DELAY`;
+  con el retardo al mínimo, la concurrencia sube 1 tras tantas respuestas
+  buenas seguidas como peticiones simultáneas haya (una "ventana").
+* Disminución multiplicativa: una respuesta 429/503, o una latencia media por
+  encima del objetivo, multiplica la concurrencia por
+  `ADAPTIVE_THROTTLE_BACKOFF` y divide el retardo por el mismo factor. Las
+  respuestas a peticiones enviadas antes del último recorte no vuelven a
+  recortar (son del mismo episodio de congestión).
+* `Retry-After` (segundos o fecha HTTP) pausa el slot hasta esa hora, con
+  `ADAPTIVE_THROTTLE_MAX_DELAY` como tope; después se vuelve al retardo AIMD.
+
+Las decisiones quedan en las estadísticas de Scrapy con el prefijo
+`adaptive_throttle/` (aumentos, recortes, respuestas 429/503, pausas por
+`Retry-After` y la concurrencia y retardo finales de cada slot). Los reintentos
+de las respuestas 429/503 los sigue haciendo `RetryMiddleware`.
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from scrapy import Request, Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = (429, 503)
+STATS_PREFIX = "adaptive_throttle"
+
+
+def parse_retry_after(value: bytes | str | None, now: float | None = None) -> float | None:
+    """Segundos de espera de un encabezado `Retry-After` (entero o fecha HTTP)."""
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+@dataclass
+class AimdController:
+    """Estado AIMD de un slot: concurrencia, retardo y latencia media."""
+    concurrency: float = 1.0
+    delay: float = 1.0
+    min_concurrency: int = 1
+    max_concurrency: int = 8
+    min_delay: float = 0.05
+    max_delay: float = 60.0
+    delay_step: float = 0.1
+    backoff: float = 0.5
+    target_latency: float = 2.0
+    latency_alpha: float = 0.3
+    latency: float | None = None
+    good_streak: int = 0
+    paused_until: float = 0.0
+    last_decrease: float = 0.0
+
+    @property
+    def slot_concurrency(self) -> int:
+        return max(self.min_concurrency, int(self.concurrency))
+
+    def slot_delay(self, now: float) -> float:
+        """Retardo a aplicar en el slot: el AIMD o lo que falte de la pausa de `Retry-After`."""
+        return max(self.delay, self.paused_until - now)
+
+    def observe(self, latency: float, status: int, retry_after: float | None, sent_at: float, now: float) -> str:
+        """
+        Ajusta el estado con una respuesta y devuelve la decisión tomada:
+        `increase`, `decrease` o `hold`.
+        """
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.latency_alpha * (latency - self.latency)
+
+        if retry_after is not None:
+            self.paused_until = max(self.paused_until, now + min(retry_after, self.max_delay))
+
+        congested = status in THROTTLE_STATUSES or self.latency > self.target_latency
+        if congested:
+            self.good_streak = 0
+            if sent_at < self.last_decrease:
+                return "hold"
+            self.concurrency = max(float(self.min_concurrency), self.concurrency * self.backoff)
+            self.delay = min(self.max_delay, max(self.delay, self.delay_step) / self.backoff)
+            self.last_decrease = now
+            return "decrease"
+
+        if status >= 400:
+            # Errores que no indican congestión (404, 500...) no cambian el ritmo
+            return "hold"
+
+        if self.delay > self.min_delay:
+            self.delay = max(self.min_delay, self.delay - self.delay_step)
+            return "increase"
+
+        self.good_streak += 1
+        if self.good_streak >= self.slot_concurrency and self.concurrency < self.max_concurrency:
+            self.good_streak = 0
+            self.concurrency = min(float(self.max_concurrency), self.concurrency + 1)
+            return "increase"
+        return "hold"
+
+
+class AdaptiveThrottle:
+    """Extensión de Scrapy que aplica un `AimdController` a cada slot del downloader."""
+
+    def __init__(self, crawler: Crawler):
+        settings = crawler.settings
+        if not settings.getbool("ADAPTIVE_THROTTLE_ENABLED"):
+            raise NotConfigured
+        if settings.getbool("AUTOTHROTTLE_ENABLED"):
+            raise NotConfigured("ADAPTIVE_THROTTLE_ENABLED y AUTOTHROTTLE_ENABLED no pueden usarse juntos")
+
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.debug = settings.getbool("ADAPTIVE_THROTTLE_DEBUG")
+        self.defaults = {
+            "concurrency": settings.getfloat("ADAPTIVE_THROTTLE_START_CONCURRENCY", 1.0),
+            "delay": settings.getfloat("ADAPTIVE_THROTTLE_START_DELAY", 1.0),
+            "min_delay": settings.getfloat("ADAPTIVE_THROTTLE_MIN_DELAY", 0.05),
+            "max_delay": settings.getfloat("ADAPTIVE_THROTTLE_MAX_DELAY", 60.0),
+            "max_concurrency": settings.getint("ADAPTIVE_THROTTLE_MAX_CONCURRENCY", 8),
+            "delay_step": settings.getfloat("ADAPTIVE_THROTTLE_DELAY_STEP", 0.1),
+            "backoff": settings.getfloat("ADAPTIVE_THROTTLE_BACKOFF", 0.5),
+            "target_latency": settings.getfloat("ADAPTIVE_THROTTLE_TARGET_LATENCY", 2.0),
+        }
+        if not 0 < self.defaults["backoff"] < 1:
+            raise NotConfigured("ADAPTIVE_THROTTLE_BACKOFF debe estar entre 0 y 1")
+        self.controllers: dict[str, AimdController] = {}
+
+        crawler.signals.connect(self._request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(self._response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(self._spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler):
+        return cls(crawler)
+
+    def _controller(self, key: str) -> AimdController:
+        if key not in self.controllers:
+            self.controllers[key] = AimdController(**self.defaults)
+        return self.controllers[key]
+
+    def _slot(self, key: str | None):
+        if key is None or self.crawler.engine is None:
+            return None
+        return self.crawler.engine.downloader.slots.get(key)
+
+    def _apply(self, key: str, controller: AimdController, now: float) -> None:
+        # Los slots inactivos se recolectan y se recrean con la configuración
+        # global, por eso el estado vive aquí y se vuelve a aplicar
+        slot = self._slot(key)
+        if slot is None:
+            return
+        slot.concurrency = controller.slot_concurrency
+        slot.delay = controller.slot_delay(now)
+
+    def _request_reached_downloader(self, request: Request, spider: Spider) -> None:
+        key = request.meta.get("download_slot")
+        if key is None:
+            return
+        request.meta.setdefault("adaptive_throttle_sent_at", time.monotonic())
+        self._apply(key, self._controller(key), time.monotonic())
+
+    def _response_downloaded(self, response: Response, request: Request, spider: Spider) -> None:
+        key = request.meta.get("download_slot")
+        latency = request.meta.get("download_latency")
+        if key is None or latency is None:
+            return
+
+        now = time.monotonic()
+        controller = self._controller(key)
+        retry_after = None
+        if response.status in THROTTLE_STATUSES:
+            self.stats.inc_value(f"{STATS_PREFIX}/throttled/{response.status}")
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                self.stats.inc_value(f"{STATS_PREFIX}/retry_after")
+                self.stats.max_value(f"{STATS_PREFIX}/retry_after_max", round(retry_after, 3))
+
+        sent_at = request.meta.get("adaptive_throttle_sent_at", now - latency)
+        decision = controller.observe(latency, response.status, retry_after, sent_at, now)
+        self.stats.inc_value(f"{STATS_PREFIX}/{decision}")
+        self.stats.max_value(f"{STATS_PREFIX}/max_concurrency", controller.slot_concurrency)
+        self._apply(key, controller, now)
+
+        if self.debug:
+            logger.info(
+                "🎚️ slot=%s status=%d latencia=%.0f ms (media %.0f ms) -> %s: concurrencia=%d retardo=%.2f s",
+                key, response.status, latency * 1000, controller.latency * 1000,
+                decision, controller.slot_concurrency, controller.slot_delay(now),
+            )
+
+    def _spider_closed(self, spider: Spider) -> None:
+        for key, controller in self.controllers.items():
+            self.stats.set_value(f"{STATS_PREFIX}/{key}/concurrency", controller.slot_concurrency)
+            self.stats.set_value(f"{STATS_PREFIX}/{key}/delay", round(controller.delay, 3))
@@ -0,0 +1,171 @@
+"""
+Crawl incremental con peticiones condicionales.
+
+Con `INCREMENTAL_CRAWL=True`, `ConditionalRequestMiddleware` guarda por URL
+los validadores de cada página de detalle (las peticiones con
+`meta["conditional"]`): `ETag`, `Last-Modified` y el sha256 del cuerpo. En la
+siguiente ejecución:
+
+* Envía `If-None-Match` / `If-Modified-Since`. Si el servidor responde 304,
+  la página no cambió: no se descargó el cuerpo ni se extrae.
+* Si el servidor responde 200 con el mismo sha256 (no soporta validadores o
+  los cambia sin cambiar el contenido), tampoco se extrae.
+
+Las páginas sin cambios se descartan con `IgnoreRequest` antes del callback,
+así que no generan items ni pasan por el refinado y la carga. Las
+estadísticas `incremental/*` cuentan las páginas nuevas, cambiadas y sin
+cambios, las llamadas de extracción evitadas (`parse_calls_saved`) y los
+bytes que no se descargaron por las respuestas 304 (`bytes_saved`, tamaño del
+cuerpo descomprimido de la descarga anterior).
+
+Los validadores nuevos se escriben en `INCREMENTAL_CRAWL_DB` sólo al cerrar
+un crawl terminado (`finished`) cuyos items se cargaron en la base de datos:
+el pipeline lo avisa con la señal `load_succeeded` tras una carga sin
+errores. Si el crawl se interrumpe, la carga falla o no hay carga
+(`-a refine=0`), la siguiente ejecución vuelve a procesar esas páginas.
+"""
+
+import time
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from dataclasses import dataclass
+from scrapy import Request, Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Response
+from imdb_movies.enum_model import ConfigImdb
+
+logger = logging.getLogger(__name__)
+
+STATS_PREFIX = "incremental"
+
+# Señal del pipeline: los items del crawl se refinaron y cargaron sin errores
+load_succeeded = object()
+
+
+@dataclass
+class Validators:
+    etag: str | None
+    last_modified: str | None
+    body_sha256: str
+    length: int
+    fetched_at: float
+
+
+class ValidatorStore:
+    """Validadores por URL en SQLite."""
+
+    def __init__(self, db_path: str | Path):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS validators ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,"
+            " body_sha256 TEXT NOT NULL, length INTEGER NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, url: str) -> Validators | None:
+        row = self._db.execute(
+            "SELECT etag, last_modified, body_sha256, length, fetched_at FROM validators WHERE url = ?", (url,)
+        ).fetchone()
+        return Validators(*row) if row else None
+
+    def save(self, validators: dict[str, Validators]) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO validators VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (url, v.etag, v.last_modified, v.body_sha256, v.length, v.fetched_at)
+                for url, v in validators.items()
+            ],
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def _header(response: Response, name: str) -> str | None:
+    value = response.headers.get(name)
+    return value.decode("latin-1") if value else None
+
+
+class ConditionalRequestMiddleware:
+    """Downloader middleware de peticiones condicionales para las páginas de detalle."""
+
+    def __init__(self, crawler: Crawler, store: ValidatorStore):
+        self.stats = crawler.stats
+        self.store = store
+        self.pending: dict[str, Validators] = {}
+        self.loaded = False
+        crawler.signals.connect(self.load_succeeded, signal=load_succeeded)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler):
+        if not crawler.settings.getbool("INCREMENTAL_CRAWL"):
+            raise NotConfigured
+        db_path = crawler.settings.get("INCREMENTAL_CRAWL_DB") or ConfigImdb.DATA_PATH.value / "validators.sqlite"
+        logger.info("🔁 Crawl incremental con validadores en %s", db_path)
+        return cls(crawler, ValidatorStore(db_path))
+
+    def process_request(self, request: Request, spider: Spider):
+        if not request.meta.get("conditional"):
+            return None
+        validators = self.store.get(request.url)
+        if validators is None:
+            return None
+        request.meta["conditional_validators"] = validators
+        if validators.etag:
+            request.headers["If-None-Match"] = validators.etag
+        if validators.last_modified:
+            request.headers["If-Modified-Since"] = validators.last_modified
+        if validators.etag or validators.last_modified:
+            self.stats.inc_value(f"{STATS_PREFIX}/conditional_requests")
+        return None
+
+    def process_response(self, request: Request, response: Response, spider: Spider):
+        if not request.meta.get("conditional"):
+            return response
+        previous: Validators | None = request.meta.get("conditional_validators")
+
+        if response.status == 304 and previous is not None:
+            self.stats.inc_value(f"{STATS_PREFIX}/not_modified")
+            self.stats.inc_value(f"{STATS_PREFIX}/bytes_saved", previous.length)
+            self.stats.inc_value(f"{STATS_PREFIX}/parse_calls_saved")
+            raise IgnoreRequest(f"Página sin cambios (304): {request.url}")
+        if response.status != 200:
+            return response
+
+        digest = hashlib.sha256(response.body).hexdigest()
+        self.pending[request.url] = Validators(
+            etag=_header(response, "ETag"),
+            last_modified=_header(response, "Last-Modified"),
+            body_sha256=digest,
+            length=len(response.body),
+            fetched_at=time.time(),
+        )
+        if previous is None:
+            self.stats.inc_value(f"{STATS_PREFIX}/new")
+        elif previous.body_sha256 == digest:
+            self.stats.inc_value(f"{STATS_PREFIX}/unchanged_body")
+            # Se descargó, pero no hace falta extraerla
+            self.stats.inc_value(f"{STATS_PREFIX}/parse_calls_saved")
+            raise IgnoreRequest(f"Página sin cambios: {request.url}")
+        else:
+            self.stats.inc_value(f"{STATS_PREFIX}/changed")
+        return response
+
+    def load_succeeded(self) -> None:
+        self.loaded = True
+
+    def spider_closed(self, spider: Spider, reason: str) -> None:
+        # El pipeline carga en close_spider, antes de esta señal
+        if reason == "finished" and self.loaded and self.pending:
+            self.store.save(self.pending)
+            logger.info("🔁 %d validadores actualizados", len(self.pending))
+        elif self.pending:
+            logger.info("🔁 %d validadores sin guardar: el crawl no terminó con una carga exitosa", len(self.pending))
+        self.store.close()
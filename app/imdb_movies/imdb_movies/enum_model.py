@@ -5,6 +5,11 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Opciones del refinado leídas del entorno. Van fuera de los Enum: un miembro
+# cuyo valor coincide con otro (p. ej. False == 0) se convierte en su alias.
+REFINE_WORKERS = int(os.getenv("REFINE_WORKERS", "0"))  # procesos de refinado (0 = número de CPUs)
+REFINE_PARQUET = os.getenv("REFINE_PARQUET", "false").lower() in ("1", "true", "yes")  # requiere pyarrow
+
 
 class ConfigDB(Enum):
     DB = os.getenv("DB")
@@ -14,6 +19,7 @@ class ConfigDB(Enum):
     PORT = os.getenv("PORT_DB")
     NAMEDB = os.getenv("NAMEDB")
     DATABASE_URL = f"{DB}://{USERDB}:{PASSWORDDB}@{NAME_SERVICEDB}:{PORT}/{NAMEDB}"
+    BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
 
 
 class RefineLevel(Enum):
@@ -21,6 +27,10 @@ class RefineLevel(Enum):
     INTERMEDIATE = 1
     ADVANCED = 2
 
+class OutputFormat(Enum):
+    JSON = 'json'
+    JSONL = 'jsonl'
+
 class OutputMovieKeys(Enum):
     TITLE = 'title'
     ALT_TITLE = 'alternate_title'
@@ -30,6 +40,7 @@ class OutputMovieKeys(Enum):
     MOVIE_ID = 'movie_id'
     DATE_PUBLISHED = 'date_published'
     ACTORS = 'actors'
+    ACTOR_IDS = 'actor_ids'
     METASCORE = 'metascore'
     INFO_MOVIE = 'info_movie'
 
@@ -47,11 +58,21 @@ class ConfigImdb(Enum):
     PYTHON_BASE = Path(os.getenv("PYTHONPATH", Path(__file__).resolve().parent))
     DATA_PATH = PYTHON_BASE / "data"
     OUTPUT_DOCUMENT_NAME_PAGE = "movies_info.json"
+    OUTPUT_DOCUMENT_NAME_PAGE_JSONL = "movies_info.jsonl"
+    STREAM_BUFFER_SIZE = 100  # items en memoria antes de escribir a disco
     OUTPUT_DOCUMENT_NAME_REFINE = "movies_info_refine.csv"
-    TOTAL_SCRAPY = 50  # cantidad de items scrapy
+    OUTPUT_DOCUMENT_NAME_REFINE_PARQUET = "movies_info_refine.parquet"
+    TOTAL_SCRAPY = int(os.getenv("TOTAL_SCRAPY", "50"))  # tope de títulos por ejecución (0 = sin tope)
 
     BASE_URL = "https://www.imdb.com/"
     TOP_MOVIE_URL = "https://www.imdb.com/chart/top/"
+    # Fuentes semilla del spider (ver imdb_movies/frontier.py); IMDB_SEED_SOURCES apunta a un JSON con la misma forma
+    SEED_SOURCES = [
+        {"name": "top", "kind": "chart", "url": TOP_MOVIE_URL, "priority": 100},
+    ]
+    SEED_SOURCES_FILE = os.getenv("IMDB_SEED_SOURCES")
+    FRONTIER_DB = "frontier.sqlite"
+    FRONTIER_IN_FLIGHT = int(os.getenv("FRONTIER_IN_FLIGHT", "64"))  # páginas de detalle en el scheduler
 
     HEADERS = {
         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -108,6 +129,7 @@ class ConfigRefine(Enum):
         "movie_id": "string",
         "metascore": "Int16",
         "actors": "object",
+        "actor_ids": "object",
     }
     OUTPUT_COLUMNS = [
         "title",
@@ -116,5 +138,9 @@ class ConfigRefine(Enum):
         "duration_minutes",
         "metascore",
         "actors",
+        "actor_ids",
         "movie_url",
+        "movie_id",
     ]
+    CHUNK_SIZE = 5000  # filas por bloque al refinar JSON Lines
+    PARQUET_ROW_GROUP_SIZE = 100_000  # filas por row group del Parquet refinado
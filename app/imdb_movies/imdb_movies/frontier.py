@@ -0,0 +1,145 @@
+"""
+Fuentes semilla y frontera de títulos del spider.
+
+Las fuentes semilla (`SeedSource`) son páginas de IMDb que listan títulos:
+
+* `chart` y `list`: una sola página (charts como `/chart/top/` o listas
+  `/list/ls.../`); los títulos salen del `itemListElement` del ld+json, con
+  título, rating y duración.
+* `search`: resultados paginados; la url lleva `{start}` (posición del primer
+  resultado, desde 1) y se recorren hasta `max_pages` páginas de `page_size`
+  resultados, o hasta una página sin títulos nuevos. Sin ld+json se usan los
+  enlaces `/title/tt...` y los datos se completan en la página de detalle.
+
+Se configuran en `ConfigImdb.SEED_SOURCES` o en un archivo JSON con la misma
+lista (`IMDB_SEED_SOURCES` o `-a seeds=archivo.json`).
+
+`Frontier` guarda los títulos en SQLite (`data/frontier.sqlite`): el id de
+título es la clave, así que un título que aparece en varias fuentes se
+descarga una sola vez con la mayor prioridad de ellas. El spider sólo
+mantiene en el scheduler `FRONTIER_IN_FLIGHT` páginas de detalle y va pidiendo
+las siguientes por prioridad a medida que terminan, de modo que la memoria no
+crece con el número de títulos. `TOTAL_SCRAPY` limita cuántos títulos se
+admiten por ejecución (0 = sin tope).
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from dataclasses import dataclass
+from imdb_movies.enum_model import ConfigImdb
+
+SOURCE_KINDS = ("chart", "list", "search")
+
+PENDING, DISPATCHED, DONE = 0, 1, 2
+
+
+@dataclass
+class SeedSource:
+    name: str
+    url: str
+    kind: str = "chart"
+    priority: int = 0
+    max_pages: int = 1
+    page_size: int = 50
+
+    def __post_init__(self):
+        if self.kind not in SOURCE_KINDS:
+            raise ValueError(f"Tipo de fuente no soportado: {self.kind}. Disponibles: {', '.join(SOURCE_KINDS)}")
+        if self.kind == "search" and "{start}" not in self.url:
+            raise ValueError(f"La fuente de búsqueda {self.name} necesita `{{start}}` en la url")
+
+    def page_url(self, page: int) -> str:
+        """Url de la página `page` (desde 0) de la fuente."""
+        if self.kind != "search":
+            return self.url
+        return self.url.format(start=page * self.page_size + 1)
+
+    def has_page(self, page: int) -> bool:
+        return page < (self.max_pages if self.kind == "search" else 1)
+
+
+def load_seed_sources(path: str | None = ConfigImdb.SEED_SOURCES_FILE.value) -> list[SeedSource]:
+    """Fuentes del archivo JSON `path` o, si no se indica, las de `ConfigImdb.SEED_SOURCES`."""
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            sources = json.load(f)
+    else:
+        sources = ConfigImdb.SEED_SOURCES.value
+    return [SeedSource(**source) for source in sources]
+
+
+class Frontier:
+    """Cola de títulos en SQLite, sin repetidos y por prioridad."""
+
+    def __init__(self, db_path: str | Path, limit: int = ConfigImdb.TOTAL_SCRAPY.value, resume: bool = False):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.limit = limit
+        self._db = sqlite3.connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS titles ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, title_id TEXT NOT NULL UNIQUE, url TEXT NOT NULL,"
+            " priority INTEGER NOT NULL, source TEXT NOT NULL, meta TEXT NOT NULL, state INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_titles_next ON titles (state, priority DESC, seq)")
+        if resume:
+            # Las páginas despachadas y no terminadas en la ejecución anterior se vuelven a pedir
+            self._db.execute("UPDATE titles SET state = ? WHERE state = ?", (PENDING, DISPATCHED))
+        else:
+            self._db.execute("DELETE FROM titles")
+        self._db.commit()
+        self._size = self._db.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+
+    @property
+    def full(self) -> bool:
+        return bool(self.limit) and self._size >= self.limit
+
+    def add(self, title_id: str, url: str, priority: int, source: str, meta: dict) -> str:
+        """
+        Admite un título. Devuelve `added`, `duplicate` (ya estaba; conserva la
+        mayor prioridad si sigue pendiente) o `full` (se alcanzó el tope).
+        """
+        cursor = self._db.execute(
+            "UPDATE titles SET priority = MAX(priority, ?) WHERE title_id = ? AND state = ?",
+            (priority, title_id, PENDING),
+        )
+        if cursor.rowcount or self._db.execute("SELECT 1 FROM titles WHERE title_id = ?", (title_id,)).fetchone():
+            return "duplicate"
+        if self.full:
+            return "full"
+        self._db.execute(
+            "INSERT INTO titles (title_id, url, priority, source, meta, state) VALUES (?, ?, ?, ?, ?, ?)",
+            (title_id, url, priority, source, json.dumps(meta, ensure_ascii=False), PENDING),
+        )
+        self._size += 1
+        return "added"
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def pop(self, count: int) -> list[tuple[str, str, int, dict]]:
+        """Hasta `count` títulos pendientes de mayor prioridad, marcados como despachados."""
+        if count <= 0:
+            return []
+        rows = self._db.execute(
+            "SELECT seq, title_id, url, priority, meta FROM titles WHERE state = ?"
+            " ORDER BY priority DESC, seq LIMIT ?",
+            (PENDING, count),
+        ).fetchall()
+        self._db.executemany("UPDATE titles SET state = ? WHERE seq = ?", [(DISPATCHED, row[0]) for row in rows])
+        self._db.commit()
+        return [(title_id, url, priority, json.loads(meta)) for _, title_id, url, priority, meta in rows]
+
+    def done(self, title_id: str) -> None:
+        self._db.execute("UPDATE titles SET state = ? WHERE title_id = ?", (DONE, title_id))
+        self._db.commit()
+
+    def pending(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM titles WHERE state = ?", (PENDING,)).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        self._db.commit()
+        self._db.close()
@@ -0,0 +1,89 @@
+"""
+Extracción de datos estructurados (ld+json) desde las páginas de IMDb.
+
+Sustituye el recorrido XPath + `ast.literal_eval` del spider por una única
+búsqueda sobre el texto de la respuesta y un decodificador JSON real, con
+`literal_eval` como respaldo tolerante para bloques mal formados.
+"""
+
+import re
+import json
+from ast import literal_eval
+from typing import Any
+
+
+LD_JSON_SCRIPT_RE = re.compile(
+    r"<script[^>]*?type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL,
+)
+METASCORE_RE = re.compile(r"\"score\":([\d.]+)")
+PERSON_ID_RE = re.compile(r"/name/(nm\d+)")
+TITLE_ID_RE = re.compile(r"/title/(tt\d+)")
+
+_JSON_DECODER = json.JSONDecoder(strict=False)
+_METASCORE_KEYS = ("metascore", "metaScore")
+
+
+def find_ld_json(body_text: str) -> str | None:
+    """Devuelve el contenido del primer script `application/ld+json` o None."""
+    if not body_text:
+        return None
+    match = LD_JSON_SCRIPT_RE.search(body_text)
+    if match is None:
+        return None
+    raw = match.group(1).strip()
+    return raw or None
+
+
+def decode_ld_json(raw: str | None) -> Any:
+    """
+    Decodifica el bloque ld+json.
+
+    Usa el decodificador JSON estándar en modo no estricto (acepta caracteres
+    de control dentro de cadenas) y, si falla, recurre a `literal_eval`.
+    Lanza ValueError si ninguno de los dos logra interpretar el texto.
+    """
+    if not raw:
+        return None
+    try:
+        return _JSON_DECODER.decode(raw)
+    except ValueError as json_error:
+        try:
+            return literal_eval(raw)
+        except (ValueError, SyntaxError) as eval_error:
+            raise ValueError(f"{json_error} / {eval_error}") from eval_error
+
+
+def extract_ld_json(body_text: str) -> Any:
+    """Localiza y decodifica el ld+json de una página en un solo paso."""
+    return decode_ld_json(find_ld_json(body_text))
+
+
+def extract_metascore(body_text: str, info_movie: Any = None) -> str:
+    """
+    Obtiene el metascore a partir de los datos ya decodificados y, si no
+    está presente, con un único escaneo de la expresión precompilada.
+    """
+    if isinstance(info_movie, dict):
+        for key in _METASCORE_KEYS:
+            value = info_movie.get(key)
+            if isinstance(value, dict):
+                value = value.get("score")
+            if value not in (None, ""):
+                return str(value)
+
+    match = METASCORE_RE.search(body_text) if body_text else None
+    return match.group(1) if match else ""
+
+
+def extract_person_id(url: str | None) -> str:
+    """Id de IMDb (nm...) de la url de una persona del ld+json, o cadena vacía."""
+    match = PERSON_ID_RE.search(url or "")
+    return match.group(1) if match else ""
+
+
+def extract_title_ids(body_text: str) -> list[str]:
+    """Ids de título (tt...) enlazados en la página, sin repetir y en orden de aparición."""
+    if not body_text:
+        return []
+    return list(dict.fromkeys(TITLE_ID_RE.findall(body_text)))
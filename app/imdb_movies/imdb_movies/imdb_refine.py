@@ -1,9 +1,98 @@
 import json
 import isodate
+import numpy as np
 import pandas as pd
 from os import path
 from logging import Logger
+from typing import Iterator
 from imdb_movies.enum_model import ConfigRefine
+from imdb_movies.parquet_output import ParquetChunkWriter
+
+
+ISO_DURATION_RE = (
+    r"^P(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$"
+)
+NUMERIC_DTYPES = ("float32", "float64", "Int16", "Int32", "Int64")
+
+InvalidSummary = dict[str, tuple[int, object]]
+
+
+def _isodate_minutes(value: str) -> float | None:
+    try:
+        return isodate.parse_duration(value).total_seconds() / 60
+    except Exception:
+        return None
+
+
+def parse_iso_durations(durations: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """
+    Convierte duraciones ISO-8601 (`PT2H22M`, `P1DT2H`...) a minutos por columnas.
+
+    Las duraciones se repiten mucho, así que se factoriza la columna y sólo se
+    interpretan los valores distintos: la forma habitual `P#DT#H#M#S` con
+    `str.extract` y el resto (p.ej. con años o semanas) con `isodate`.
+    Devuelve los minutos (float64) y la máscara de valores no nulos que no se
+    pudieron interpretar.
+    """
+    codes, uniques = pd.factorize(durations.astype("string").str.strip())
+    uniques = pd.Series(uniques, dtype="string")
+
+    parts = uniques.str.extract(ISO_DURATION_RE).astype("float64")
+    matched = parts.notna().any(axis=1)
+    unique_minutes = (
+        parts["days"].fillna(0) * 1440
+        + parts["hours"].fillna(0) * 60
+        + parts["minutes"].fillna(0)
+        + parts["seconds"].fillna(0) / 60
+    ).where(matched)
+    unique_minutes[~matched] = uniques[~matched].map(_isodate_minutes).astype("float64")
+
+    # factorize marca los nulos con -1: se agrega un NaN al final para indexarlos
+    lookup = np.append(unique_minutes.to_numpy(dtype="float64"), np.nan)
+    minutes = pd.Series(lookup[codes], index=durations.index)
+    invalid = pd.Series(codes >= 0, index=durations.index) & minutes.isna()
+    return minutes, invalid
+
+
+def refine_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, InvalidSummary]:
+    """
+    Aplica los tipos de `ConfigRefine.DATA_TYPE` y calcula `date_published` y
+    `duration_minutes` modificando `df` columna a columna.
+
+    Los valores que no se pueden convertir quedan nulos en lugar de invalidar
+    el bloque completo; se devuelven agregados por columna como
+    {columna: (cantidad, ejemplo)}.
+    """
+    invalid: InvalidSummary = {}
+
+    def track(column: str, raw: pd.Series, bad: pd.Series) -> None:
+        count = int(bad.sum())
+        if count:
+            invalid[column] = (count, raw[bad].iloc[0])
+
+    for column in dict.fromkeys([*ConfigRefine.DATA_TYPE.value, *ConfigRefine.OUTPUT_COLUMNS.value]):
+        if column not in df.columns:
+            df[column] = None
+
+    for column, dtype in ConfigRefine.DATA_TYPE.value.items():
+        raw = df[column]
+        if dtype in NUMERIC_DTYPES:
+            numeric = pd.to_numeric(raw, errors="coerce")
+            track(column, raw, raw.notna() & numeric.isna())
+            if dtype.startswith("Int"):
+                numeric = numeric.round()
+            df[column] = numeric.astype(dtype)
+        elif dtype != "object":
+            df[column] = raw.astype(dtype)
+
+    raw = df["date_published"]
+    df["date_published"] = pd.to_datetime(raw, errors="coerce", format="ISO8601")
+    track("date_published", raw, raw.notna() & df["date_published"].isna())
+
+    df["duration_minutes"], bad = parse_iso_durations(df["duration"])
+    track("duration", df["duration"], bad)
+    return df, invalid
 
 
 class CreatorOutputData:
@@ -11,39 +100,97 @@ class CreatorOutputData:
     def __init__(self, **kwargs):
         self.document_json_path: str | None = kwargs.get('document_json_path')
         self.output_document_csv_path: str | None = kwargs.get('document_csv_path')
+        self.output_document_parquet_path: str | None = kwargs.get('document_parquet_path')
+        self._parquet_writer = None
+        self.chunk_size: int = kwargs.get('chunk_size') or ConfigRefine.CHUNK_SIZE.value
         self.logger: Logger = kwargs.get('logger')
 
-    def refine_output_data(self) -> pd.DataFrame | None:
-        movies_data = self._read_json_file(self.document_json_path)
-
-        if not movies_data:
-            self.logger.warning(
-                "El archivo JSON '%s' está vacío o no se pudo leer.",
-                self.document_json_path
-            )
-            return None
+    def iter_movie_batches(self) -> Iterator[list[dict]]:
+        """Lee el archivo de entrada (JSON o JSON Lines) en bloques de `chunk_size` items."""
+        return self._iter_movie_batches(self.document_json_path)
 
+    def refine_records(self, movies_data: list[dict]) -> pd.DataFrame | None:
+        """Refina un bloque de items tal como los genera el spider."""
         df = pd.DataFrame([movie.get('info_movie', {}) for movie in movies_data])
-
         if df.empty:
-            self.logger.warning("No se extrajo información válida desde el JSON.")
             return None
+        return self._refine_frame(df)
 
-        try:
-            df = df.astype(ConfigRefine.DATA_TYPE.value)
-            df["date_published"] = pd.to_datetime(df["date_published"], errors="coerce")
-            df["duration_minutes"] = df["duration"].apply(self._parse_duration)
+    def export_chunk(self, df: pd.DataFrame, header: bool = True) -> None:
+        """Exporta un bloque refinado al CSV y, si se configuró, al Parquet."""
+        if self.output_document_csv_path:
+            self.export_csv(df, header=header)
+        if self.output_document_parquet_path:
+            if self._parquet_writer is None:
+                self._parquet_writer = ParquetChunkWriter(self.output_document_parquet_path)
+            self._parquet_writer.write(df)
 
-            df_to_export = df[ConfigRefine.OUTPUT_COLUMNS.value]
-            df_to_export.to_csv(self.output_document_csv_path, index=False, encoding='utf-8')
+    def close(self) -> None:
+        """Cierra el Parquet de salida escribiendo el último row group."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self.logger.info("Datos refinados exportados a Parquet en '%s'.", self.output_document_parquet_path)
+            self._parquet_writer = None
 
-            self.logger.info("Datos refinados y exportados a CSV en '%s'.", self.output_document_csv_path)
-            return df
+    def export_csv(self, df: pd.DataFrame, header: bool = True) -> None:
+        """Escribe (header=True) o agrega un bloque refinado al CSV de salida."""
+        df[ConfigRefine.OUTPUT_COLUMNS.value].to_csv(
+            self.output_document_csv_path,
+            mode='w' if header else 'a',
+            header=header,
+            index=False,
+            encoding='utf-8',
+        )
 
+    def _refine_frame(self, df: pd.DataFrame) -> pd.DataFrame | None:
+        try:
+            df, invalid = refine_frame(df)
         except Exception as e:
             self.logger.exception("Error procesando los datos del DataFrame: %s", str(e))
             return None
 
+        if invalid:
+            self.logger.warning(
+                "Bloque de %d filas con valores inválidos convertidos a nulo: %s",
+                len(df),
+                "; ".join(f"{column}={count} (ej. {example!r})" for column, (count, example) in invalid.items()),
+            )
+        return df
+
+    def _iter_movie_batches(self, file_path: str | None) -> Iterator[list[dict]]:
+        if file_path and file_path.endswith('.jsonl'):
+            yield from self._iter_json_lines_batches(file_path)
+            return
+
+        movies_data = self._read_json_file(file_path)
+        for start in range(0, len(movies_data), self.chunk_size):
+            yield movies_data[start:start + self.chunk_size]
+
+    def _iter_json_lines_batches(self, file_path: str) -> Iterator[list[dict]]:
+        if not path.exists(file_path):
+            self.logger.warning("Ruta no válida o archivo no encontrado: '%s'", file_path)
+            return
+
+        batch = []
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    batch.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    # Una línea truncada (p.ej. proceso interrumpido) no invalida el resto
+                    self.logger.warning(
+                        "Línea %d inválida en '%s': %s", line_number, file_path, str(e)
+                    )
+                    continue
+                if len(batch) >= self.chunk_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
     def _read_json_file(self, file_path: str | None) -> list[dict]:
         if not file_path or not path.exists(file_path):
             self.logger.warning("Ruta no válida o archivo no encontrado: '%s'", file_path)
@@ -55,11 +202,3 @@ class CreatorOutputData:
         except Exception as e:
             self.logger.exception("Error al leer el archivo JSON '%s': %s", file_path, str(e))
             return []
-
-    def _parse_duration(self, iso_duration: str) -> float | None:
-        try:
-            duration = isodate.parse_duration(iso_duration)
-            return duration.total_seconds() / 60
-        except Exception as e:
-            self.logger.warning("Error parseando duración ISO '%s': %s", iso_duration, str(e))
-            return None
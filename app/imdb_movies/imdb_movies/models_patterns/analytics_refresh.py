@@ -0,0 +1,190 @@
+"""
+Tablas de analítica precalculadas.
+
+Las consultas de la API (top 5 por década, desviación estándar del rating por
+año y diferencias IMDb/Metascore) recorren toda la tabla `movies`, pero los
+datos sólo cambian cuando carga el pipeline. Después de cada commit de carga
+se refrescan tres tablas resumen:
+
+* `analytics_top_by_decade`: el top 5 de duración de cada década.
+* `analytics_rating_by_year`: n, suma y suma de cuadrados del rating por año;
+  la API deriva la desviación estándar muestral de esos agregados.
+* `analytics_rating_diff`: las películas con más de un 20% de diferencia.
+
+Como las consultas directas, las películas sin año forman su propio grupo
+(año y década NULL).
+
+El refresco es incremental: sólo se recalculan los años (y sus décadas) de las
+películas escritas, antes y después de la carga (`LoadResult.years`).
+`analytics_state.version` guarda la versión de `data_version` que reflejan las
+tablas; si no es la inmediatamente anterior a la actual (por ejemplo, porque
+un refresco falló) se recalcula todo. La API sólo usa las tablas cuando esa
+versión coincide con la de los datos.
+
+Se usan tablas y SQL portable en lugar de vistas materializadas para poder
+refrescar por año en PostgreSQL, SQLite y MySQL.
+
+Uso (desde app/imdb_movies), para un refresco completo:
+    python -m imdb_movies.models_patterns.analytics_refresh --db postgresql
+"""
+
+import re
+import time
+import logging
+import argparse
+from typing import Iterable
+from sqlalchemy import text, bindparam, select, update, insert, func
+from sqlalchemy.engine import Connection
+from imdb_movies.enum_model import ConfigDB
+from imdb_movies.models_patterns.models import DataVersion, AnalyticsState
+
+
+TOP_N = 5
+
+# {scope}, {decade_scope}, {top_scope} y {diff_scope} son los filtros de años de un
+# refresco incremental (o `1 = 1` en uno completo)
+TOP_BY_DECADE_SQL = (
+    "DELETE FROM analytics_top_by_decade WHERE {decade_scope}",
+    f"""
+    INSERT INTO analytics_top_by_decade (movie_id, decade, rn, title, year, rating, metascore, duration)
+    SELECT id, decade, rn, title, year, rating, metascore, duration
+    FROM (
+        SELECT
+            id, title, year, rating, metascore, duration,
+            year - year % 10 AS decade,
+            ROW_NUMBER() OVER (
+                PARTITION BY year - year % 10
+                ORDER BY duration DESC
+            ) AS rn
+        FROM movies
+        WHERE duration IS NOT NULL
+          AND {{top_scope}}
+    ) ranked
+    WHERE rn <= {TOP_N}
+    """,
+)
+
+RATING_BY_YEAR_SQL = (
+    "DELETE FROM analytics_rating_by_year WHERE {scope}",
+    """
+    INSERT INTO analytics_rating_by_year (year, ratings, rating_sum, rating_sum_sq)
+    SELECT year, COUNT(rating), SUM(rating), SUM(rating * rating)
+    FROM movies
+    WHERE rating IS NOT NULL
+      AND {scope}
+    GROUP BY year
+    """,
+)
+
+RATING_DIFF_SQL = (
+    "DELETE FROM analytics_rating_diff WHERE {diff_scope}",
+    """
+    INSERT INTO analytics_rating_diff (movie_id, year, title, rating, metascore, abs_diff, relative_diff)
+    SELECT
+        id, year, title, rating, metascore,
+        ROUND(CAST(ABS(rating - metascore / 10.0) AS DECIMAL(12, 6)), 2),
+        ROUND(CAST(ABS(rating - metascore / 10.0) / rating AS DECIMAL(12, 6)), 2)
+    FROM movies
+    WHERE rating IS NOT NULL
+      AND metascore IS NOT NULL
+      AND ABS(rating - metascore / 10.0) / rating > 0.20
+      AND {diff_scope}
+    """,
+)
+
+
+def _execute(connection: Connection, statements: tuple, params: dict, scopes: dict) -> None:
+    for statement in statements:
+        sql = text(statement.format(**scopes))
+        used = {name: value for name, value in params.items() if re.search(rf":{name}\b", sql.text)}
+        for name in used:
+            sql = sql.bindparams(bindparam(name, expanding=True))
+        connection.execute(sql, used)
+
+
+def _set_state(connection: Connection, version: int) -> None:
+    table = AnalyticsState.__table__
+    updated = connection.execute(
+        update(table).where(table.c.id == 1).values(version=version, refreshed_at=func.now())
+    )
+    if updated.rowcount == 0:
+        connection.execute(insert(table).values(id=1, version=version, refreshed_at=func.now()))
+
+
+def refresh_analytics(
+    connection: Connection,
+    years: Iterable[int | None] | None = None,
+    force: bool = False,
+    logger: logging.Logger = None,
+) -> str | None:
+    """
+    Refresca las tablas de analítica dentro de la transacción de `connection`.
+
+    `years` son los años afectados por la última carga (None en un año
+    desconocido). Devuelve "incremental", "completo" o None si ya estaban al
+    día; el commit queda a cargo de quien llama.
+    """
+    logger = logger or logging.getLogger(__name__)
+    version = connection.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar()
+    if version is None:
+        return None
+    state = connection.execute(select(AnalyticsState.version).where(AnalyticsState.id == 1)).scalar()
+    if state == version and not force:
+        return None
+
+    start = time.perf_counter()
+    incremental = not force and years is not None and state == version - 1
+    if incremental:
+        years = set(years)
+        known = sorted(year for year in years if year is not None)
+        decades = sorted({year - year % 10 for year in known})
+        params = {
+            "years": known,
+            "decade_years": [decade + offset for decade in decades for offset in range(10)],
+            "decades": decades,
+        }
+        scopes = {
+            "scope": "year IN :years" if known else "1 = 0",
+            "decade_scope": "decade IN :decades" if decades else "1 = 0",
+            "top_scope": "year IN :decade_years" if decades else "1 = 0",
+        }
+        if None in years:
+            # El grupo sin año también se recalcula
+            scopes = {
+                "scope": f"({scopes['scope']} OR year IS NULL)",
+                "decade_scope": f"({scopes['decade_scope']} OR decade IS NULL)",
+                "top_scope": f"({scopes['top_scope']} OR year IS NULL)",
+            }
+        scopes["diff_scope"] = scopes["scope"]
+    else:
+        params = {}
+        scopes = dict.fromkeys(("scope", "decade_scope", "top_scope", "diff_scope"), "1 = 1")
+
+    for statements in (TOP_BY_DECADE_SQL, RATING_BY_YEAR_SQL, RATING_DIFF_SQL):
+        _execute(connection, statements, params, scopes)
+    _set_state(connection, version)
+
+    mode = "incremental" if incremental else "completo"
+    logger.info(
+        "📈 Analítica refrescada (%s, versión %d) en %.2fs", mode, version, time.perf_counter() - start
+    )
+    return mode
+
+
+def main():
+    from imdb_movies.models_patterns.database_strategies import DatabaseStrategyFactory
+
+    parser = argparse.ArgumentParser(description="Refresco completo de las tablas de analítica")
+    parser.add_argument("--db", type=str, default=ConfigDB.DB.value, help="Tipo de base de datos de DatabaseStrategyFactory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logger = logging.getLogger(__name__)
+
+    strategy = DatabaseStrategyFactory.create_strategy((args.db or "").lower(), logger)
+    with strategy.engine.begin() as connection:
+        refresh_analytics(connection, force=True, logger=logger)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Carga masiva de películas y actores.
+
+Construye los registros por columnas a partir del DataFrame refinado y los
+escribe con `executemany` por lotes en lugar de crear un objeto ORM y un
+INSERT por cada fila. Las películas se identifican por su id de IMDb
+(`imdb_id`, tt...) y se insertan con un upsert propio de cada dialecto; las
+filas cuyo `content_hash` no cambió se omiten sin reescribirse.
+
+Los actores se guardan una sola vez en `people` (por id nm... o, si no se
+conoce, por nombre) y el reparto de cada película en `movie_people`. Los ids
+de `people` se resuelven con una caché en memoria que dura lo que el cargador.
+"""
+
+import json
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Iterator
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select, delete, update, bindparam
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from imdb_movies.enum_model import ConfigDB
+from imdb_movies.models_patterns.models import Movie, Person, MoviePerson
+from imdb_movies.models_patterns.movie_factory import MovieFactory, CastMember
+
+
+MOVIE_COLUMNS = ("imdb_id", "title", "year", "rating", "duration", "metascore", "content_hash")
+UPDATE_COLUMNS = ("title", "year", "rating", "duration", "metascore", "content_hash")
+
+
+@dataclass
+class LoadResult:
+    movies: int = 0
+    actors: int = 0  # filas de reparto (movie_people) escritas
+    skipped: int = 0
+    people: int = 0  # personas nuevas en `people`
+    years: set = field(default_factory=set)  # años de las películas escritas, antes y después de la carga
+
+    def __add__(self, other: "LoadResult") -> "LoadResult":
+        return LoadResult(
+            self.movies + other.movies,
+            self.actors + other.actors,
+            self.skipped + other.skipped,
+            self.people + other.people,
+            self.years | other.years,
+        )
+
+
+def _column_or_none(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series([None] * len(df), index=df.index, dtype="object")
+
+
+def _to_python_list(series: pd.Series) -> list:
+    """Convierte una serie a lista de valores Python con None en lugar de NaN/NA."""
+    series = series.astype("object")
+    return series.where(series.notna(), None).tolist()
+
+
+def content_hash(row: dict, cast: list[CastMember]) -> str:
+    """Huella de los datos de una película; si no cambia, la fila no se reescribe."""
+    payload = [row[column] for column in UPDATE_COLUMNS if column != "content_hash"]
+    payload.append([[member.person_key, member.name] for member in cast])
+    return hashlib.md5(
+        json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def build_movie_payloads(df: pd.DataFrame) -> tuple[list[dict], list[list[CastMember]], int]:
+    """
+    Construye los registros de `movies` y el reparto de cada película.
+
+    Todas las conversiones se hacen por columna sobre el DataFrame completo;
+    sólo el ensamblado final de diccionarios recorre las filas. Descarta las
+    filas sin título o sin id de IMDb y, si un id aparece repetido, conserva
+    la última aparición. Devuelve también el número de filas descartadas.
+    """
+    years = pd.to_datetime(_column_or_none(df, "date_published"), errors="coerce").dt.year
+    ratings = pd.to_numeric(_column_or_none(df, "rating"), errors="coerce")
+    durations = pd.to_numeric(_column_or_none(df, "duration_minutes"), errors="coerce")
+    metascores = pd.to_numeric(_column_or_none(df, "metascore"), errors="coerce")
+
+    columns = {
+        "imdb_id": _to_python_list(_column_or_none(df, "movie_id")),
+        "title": _to_python_list(_column_or_none(df, "title")),
+        "year": _to_python_list(years.astype("Int64")),
+        "rating": _to_python_list(ratings.astype("Float64")),
+        "duration": _to_python_list(np.trunc(durations).astype("Int64")),
+        "metascore": _to_python_list(metascores.astype("Float64")),
+    }
+    actors_raw = _column_or_none(df, "actors").tolist()
+    actor_ids_raw = _column_or_none(df, "actor_ids").tolist()
+
+    by_imdb_id: dict[str, tuple[dict, list[CastMember]]] = {}
+    for values, names_raw, ids_raw in zip(zip(*columns.values()), actors_raw, actor_ids_raw):
+        row = dict(zip(columns.keys(), values))
+        if not row["title"] or not row["imdb_id"]:
+            continue
+        cast = MovieFactory.parse_cast(names_raw, ids_raw)
+        row["content_hash"] = content_hash(row, cast)
+        by_imdb_id[row["imdb_id"]] = (row, cast)
+
+    movie_rows = [row for row, _ in by_imdb_id.values()]
+    casts = [cast for _, cast in by_imdb_id.values()]
+    invalid = len(df) - len(movie_rows)
+    return movie_rows, casts, invalid
+
+
+def upsert_statement(connection: Connection, table, conflict_column: str, update_columns: tuple):
+    """
+    INSERT con resolución de conflicto por `conflict_column` según el dialecto:
+    ON CONFLICT DO UPDATE (PostgreSQL, SQLite) u ON DUPLICATE KEY UPDATE (MySQL).
+    En PostgreSQL/SQLite sólo se actualiza si cambió `content_hash`.
+    """
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c[conflict_column]],
+            set_={column: statement.excluded[column] for column in update_columns},
+            where=table.c.content_hash.is_distinct_from(statement.excluded.content_hash),
+        )
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        statement = dialect_insert(table)
+        # MySQL no reescribe filas cuyos valores no cambian
+        return statement.on_duplicate_key_update(
+            {column: statement.inserted[column] for column in update_columns}
+        )
+    return insert(table)
+
+
+def insert_ignore_statement(connection: Connection, table, conflict_column: str):
+    """INSERT que ignora las filas cuya `conflict_column` ya existe, según el dialecto."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        return dialect_insert(table).on_conflict_do_nothing(index_elements=[table.c[conflict_column]])
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(table).on_conflict_do_nothing(index_elements=[table.c[conflict_column]])
+    if dialect in ("mysql", "mariadb"):
+        return insert(table).prefix_with("IGNORE")
+    return insert(table)
+
+
+def _batches(size: int, total: int) -> Iterator[slice]:
+    for start in range(0, total, size):
+        yield slice(start, start + size)
+
+
+class PersonCache:
+    """
+    Caché {person_key: id} de la tabla `people`.
+
+    Las claves desconocidas se buscan en la base de datos y las que faltan se
+    insertan, de modo que cada persona se consulta una sola vez por cargador.
+    Una persona con id nm... nuevo adopta antes la fila guardada por nombre
+    (sin id) con el mismo nombre, como las que deja la migración de `actors`,
+    en lugar de duplicarla. Si la transacción se revierte, la caché debe
+    vaciarse con `clear()`.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.table = Person.__table__
+        self._ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+    def resolve(self, connection: Connection, members: list[CastMember]) -> tuple[dict[str, int], int]:
+        """Devuelve la caché con todas las personas de `members` y cuántas se insertaron."""
+        missing = {member.person_key: member for member in members if member.person_key not in self._ids}
+        if not missing:
+            return self._ids, 0
+
+        self._select(connection, list(missing))
+        self._claim_name_keys(connection, [member for key, member in missing.items() if key not in self._ids])
+        new_people = [
+            {"person_key": member.person_key, "imdb_person_id": member.imdb_person_id, "name": member.name}
+            for key, member in missing.items() if key not in self._ids
+        ]
+        if new_people:
+            connection.execute(insert_ignore_statement(connection, self.table, "person_key"), new_people)
+            self._select(connection, [person["person_key"] for person in new_people])
+        return self._ids, len(new_people)
+
+    def _claim_name_keys(self, connection: Connection, members: list[CastMember]) -> None:
+        """Pasa a la clave nm... las filas guardadas por nombre de las personas con id nuevo."""
+        by_name: dict[str, CastMember] = {}
+        for member in members:
+            if member.imdb_person_id:
+                by_name.setdefault(member.name, member)
+        if not by_name:
+            return
+
+        names = list(by_name)
+        claimed = []
+        for batch in _batches(self.batch_size, len(names)):
+            rows = connection.execute(
+                select(self.table.c.person_key, self.table.c.id).where(
+                    self.table.c.person_key.in_(names[batch]), self.table.c.imdb_person_id.is_(None)
+                )
+            )
+            claimed.extend({"row_id": person_id, "key": by_name[name].imdb_person_id} for name, person_id in rows)
+        if not claimed:
+            return
+
+        connection.execute(
+            update(self.table)
+            .where(self.table.c.id == bindparam("row_id"))
+            .values(person_key=bindparam("key"), imdb_person_id=bindparam("key")),
+            claimed,
+        )
+        self._ids.update({row["key"]: row["row_id"] for row in claimed})
+
+    def _select(self, connection: Connection, keys: list[str]) -> None:
+        for batch in _batches(self.batch_size, len(keys)):
+            rows = connection.execute(
+                select(self.table.c.person_key, self.table.c.id).where(self.table.c.person_key.in_(keys[batch]))
+            )
+            self._ids.update({person_key: person_id for person_key, person_id in rows})
+
+
+class BulkMovieLoader:
+    """Cargador genérico por lotes, válido para cualquier `DatabaseStrategy`."""
+
+    def __init__(self, batch_size: int | None = None, logger: logging.Logger = None):
+        self.batch_size = batch_size or ConfigDB.BULK_BATCH_SIZE.value
+        self.logger = logger or logging.getLogger(__name__)
+        self.movies_table = Movie.__table__
+        self.cast_table = MoviePerson.__table__
+        self.people = PersonCache(self.batch_size)
+
+    def load_frame(self, session: Session, df: pd.DataFrame) -> LoadResult:
+        """Carga las películas del DataFrame dentro de la transacción de `session`."""
+        if df is None or df.empty:
+            return LoadResult()
+
+        movie_rows, casts, invalid = build_movie_payloads(df)
+        if invalid:
+            self.logger.warning(f"⚠️ {invalid} filas sin título, sin id de IMDb o repetidas omitidas")
+
+        connection = session.connection()
+        result = LoadResult()
+
+        for batch in _batches(self.batch_size, len(movie_rows)):
+            rows, batch_casts = movie_rows[batch], casts[batch]
+            existing = self._existing_rows(connection, [row["imdb_id"] for row in rows])
+
+            changed = [
+                (row, cast) for row, cast in zip(rows, batch_casts)
+                if existing.get(row["imdb_id"], (None, None))[0] != row["content_hash"]
+            ]
+            result.skipped += len(rows) - len(changed)
+            if not changed:
+                continue
+            for row, _ in changed:
+                result.years.add(row["year"])
+                if row["imdb_id"] in existing:
+                    result.years.add(existing[row["imdb_id"]][1])
+
+            movie_ids = self._upsert_movies(connection, [row for row, _ in changed])
+            changed = [(movie_ids[row["imdb_id"]], cast) for row, cast in changed if row["imdb_id"] in movie_ids]
+            connection.execute(
+                delete(self.cast_table).where(self.cast_table.c.movie_id.in_([movie_id for movie_id, _ in changed]))
+            )
+
+            person_ids, new_people = self.people.resolve(
+                connection, [member for _, cast in changed for member in cast]
+            )
+            cast_rows = [
+                {"movie_id": movie_id, "person_id": person_ids[member.person_key], "ordinal": ordinal}
+                for movie_id, cast in changed
+                for ordinal, member in enumerate(cast)
+            ]
+            if cast_rows:
+                connection.execute(insert(self.cast_table), cast_rows)
+
+            result.movies += len(changed)
+            result.actors += len(cast_rows)
+            result.people += new_people
+
+        self.logger.debug(
+            f"💾 Lote cargado: {result.movies} películas, {result.actors} actores "
+            f"({result.people} personas nuevas), {result.skipped} sin cambios"
+        )
+        return result
+
+    def _existing_rows(self, connection: Connection, imdb_ids: list[str]) -> dict[str, tuple[str, int]]:
+        """{imdb_id: (content_hash, year)} de las películas que ya existen."""
+        table = self.movies_table
+        rows = connection.execute(
+            select(table.c.imdb_id, table.c.content_hash, table.c.year).where(table.c.imdb_id.in_(imdb_ids))
+        )
+        return {imdb_id: (row_hash, year) for imdb_id, row_hash, year in rows}
+
+    def _upsert_movies(self, connection: Connection, rows: list[dict]) -> dict[str, int]:
+        """Escribe las películas y devuelve {imdb_id: id} de las insertadas o actualizadas."""
+        table = self.movies_table
+        statement = upsert_statement(connection, table, "imdb_id", UPDATE_COLUMNS)
+
+        if connection.dialect.insert_executemany_returning:
+            returned = connection.execute(statement.returning(table.c.imdb_id, table.c.id), rows)
+            return {imdb_id: movie_id for imdb_id, movie_id in returned}
+
+        # Dialectos sin RETURNING en executemany (MySQL): se consultan los ids después
+        connection.execute(statement, rows)
+        selected = connection.execute(
+            select(table.c.imdb_id, table.c.id).where(table.c.imdb_id.in_([row["imdb_id"] for row in rows]))
+        )
+        return {imdb_id: movie_id for imdb_id, movie_id in selected}
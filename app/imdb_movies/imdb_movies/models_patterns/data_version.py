@@ -0,0 +1,23 @@
+"""
+Sello de versión de los datos.
+
+Cada transacción de carga que escribe películas incrementa
+`data_version.version` antes del commit; la API usa ese número para
+invalidar su caché de consultas y para los ETag de las respuestas.
+"""
+
+from sqlalchemy import insert, update, func
+from sqlalchemy.engine import Connection
+from imdb_movies.models_patterns.models import DataVersion
+
+
+def bump_data_version(connection: Connection) -> None:
+    """Incrementa la versión dentro de la transacción actual (crea la fila si no existe)."""
+    table = DataVersion.__table__
+    updated = connection.execute(
+        update(table)
+        .where(table.c.id == 1)
+        .values(version=table.c.version + 1, updated_at=func.now())
+    )
+    if updated.rowcount == 0:
+        connection.execute(insert(table).values(id=1, version=1, updated_at=func.now()))
@@ -6,6 +6,8 @@ from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError, DisconnectionError
 from imdb_movies.enum_model import ConfigDB
 from imdb_movies.models_patterns.models import Base
+from imdb_movies.models_patterns.bulk_loader import BulkMovieLoader
+from imdb_movies.models_patterns.postgres_copy import PostgresCopyLoader
 from imdb_movies.models_patterns.error_handlers import ErrorHandler, ErrorType, retry_with_backoff, RetryConfig
 
 
@@ -53,6 +55,11 @@ class DatabaseStrategy(ABC):
         except Exception as e:
             self.logger.error(f"❌ Error creando tablas: {e}")
             raise
+
+    def get_bulk_loader(self, batch_size: int = None) -> BulkMovieLoader:
+        return BulkMovieLoader(batch_size=batch_size, logger=self.logger)
+
+
 class PostgreSQLStrategy(DatabaseStrategy):
 
     def __init__(self, logger=None, **kwargs):
@@ -85,6 +92,15 @@ class PostgreSQLStrategy(DatabaseStrategy):
         self.engine = create_engine(connection_string, **engine_config)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         self.logger.info("🐘 Engine PostgreSQL inicializado correctamente")
+
+    def get_bulk_loader(self, batch_size: int = None) -> BulkMovieLoader:
+        """Usa COPY FROM STDIN con psycopg2; con otros drivers recurre a la carga por lotes"""
+        if self.engine.dialect.driver == "psycopg2":
+            return PostgresCopyLoader(batch_size=batch_size, logger=self.logger)
+        self.logger.info("🐘 Driver %s sin soporte COPY, usando carga por lotes", self.engine.dialect.driver)
+        return super().get_bulk_loader(batch_size)
+
+
 class SQLiteStrategy(DatabaseStrategy):
     """Estrategia para base de datos SQLite con manejo robusto de errores"""
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Float, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import declarative_base
 
@@ -6,22 +6,120 @@ Base = declarative_base()
 
 class Movie(Base):
     __tablename__ = 'movies'
+    __table_args__ = (
+        Index('idx_movies_imdb_id', 'imdb_id', unique=True),
+        # Listado /movies: filtro por rango y orden keyset (columna, id)
+        Index('idx_movies_year_id', 'year', 'id'),
+        Index('idx_movies_rating_id', 'rating', 'id'),
+        Index('idx_movies_metascore_id', 'metascore', 'id'),
+        Index('idx_movies_duration_id', 'duration', 'id'),
+        Index('idx_movies_year_rating', 'year', 'rating'),
+    )
 
     id = Column(Integer, primary_key=True)
+    imdb_id = Column(String(20))
     title = Column(String, nullable=False)
     year = Column(Integer, index=True)
     rating = Column(Float)
     duration = Column(Integer)
     metascore = Column(Float)
+    content_hash = Column(String(32))
 
-    actors = relationship("Actor", back_populates="movie")
+    cast = relationship("MoviePerson", back_populates="movie", order_by="MoviePerson.ordinal")
 
 
-class Actor(Base):
-    __tablename__ = 'actors'
+class Person(Base):
+    """Persona (actor) única; `person_key` es su id de IMDb (nm...) o, si no se conoce, su nombre."""
+    __tablename__ = 'people'
+    __table_args__ = (
+        Index('idx_people_person_key', 'person_key', unique=True),
+        Index('idx_people_name', 'name'),
+    )
 
     id = Column(Integer, primary_key=True)
-    movie_id = Column(Integer, ForeignKey('movies.id'), index=True)
-    name = Column(String, index=True)
+    person_key = Column(String, nullable=False)
+    imdb_person_id = Column(String(20))
+    name = Column(String, nullable=False)
 
-    movie = relationship("Movie", back_populates="actors")
+    movies = relationship("MoviePerson", back_populates="person")
+
+
+class MoviePerson(Base):
+    """Reparto de una película: enlace película-persona con el orden de aparición."""
+    __tablename__ = 'movie_people'
+    __table_args__ = (
+        Index('idx_movie_people_person_id', 'person_id'),
+    )
+
+    movie_id = Column(Integer, ForeignKey('movies.id', ondelete='CASCADE'), primary_key=True)
+    person_id = Column(Integer, ForeignKey('people.id', ondelete='CASCADE'), primary_key=True)
+    ordinal = Column(SmallInteger, nullable=False, default=0)
+
+    movie = relationship("Movie", back_populates="cast")
+    person = relationship("Person", back_populates="movies")
+
+
+class DataVersion(Base):
+    """Versión de los datos (fila única id=1); la carga la incrementa en cada transacción con cambios."""
+    __tablename__ = 'data_version'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now())
+
+
+class AnalyticsState(Base):
+    """Versión de los datos (`data_version.version`) que reflejan las tablas de analítica (fila única id=1)."""
+    __tablename__ = 'analytics_state'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    refreshed_at = Column(DateTime, server_default=func.now())
+
+
+class TopMovieByDecade(Base):
+    """Top 5 de películas más largas de cada década, precalculado tras cada carga."""
+    __tablename__ = 'analytics_top_by_decade'
+    __table_args__ = (
+        Index('idx_analytics_top_by_decade_decade', 'decade', 'rn'),
+    )
+
+    movie_id = Column(Integer, primary_key=True)
+    decade = Column(Integer)  # NULL: películas sin año
+    rn = Column(Integer, nullable=False)
+    title = Column(String, nullable=False)
+    year = Column(Integer)
+    rating = Column(Float)
+    metascore = Column(Float)
+    duration = Column(Integer)
+
+
+class RatingByYear(Base):
+    """Agregados del rating por año (n, suma y suma de cuadrados) para derivar la desviación estándar."""
+    __tablename__ = 'analytics_rating_by_year'
+    __table_args__ = (
+        # Un índice único admite la fila NULL de las películas sin año
+        Index('idx_analytics_rating_by_year_year', 'year', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    year = Column(Integer)
+    ratings = Column(Integer, nullable=False)
+    rating_sum = Column(Float, nullable=False)
+    rating_sum_sq = Column(Float, nullable=False)
+
+
+class RatingDifference(Base):
+    """Películas con más de un 20% de diferencia entre el rating de IMDb y el Metascore."""
+    __tablename__ = 'analytics_rating_diff'
+    __table_args__ = (
+        Index('idx_analytics_rating_diff_year', 'year'),
+    )
+
+    movie_id = Column(Integer, primary_key=True)
+    year = Column(Integer)
+    title = Column(String, nullable=False)
+    rating = Column(Float)
+    metascore = Column(Float)
+    abs_diff = Column(Float)
+    relative_diff = Column(Float)
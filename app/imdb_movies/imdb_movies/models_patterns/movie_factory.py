@@ -1,18 +1,30 @@
-from imdb_movies.models_patterns.models import Movie, Actor
+from imdb_movies.models_patterns.models import Movie, Person, MoviePerson
 import ast
-from typing import List
+import numpy as np
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class CastMember(NamedTuple):
+    person_key: str
+    imdb_person_id: Optional[str]
+    name: str
+
 
 class MovieFactory:
     @staticmethod
-    def create_movie_from_row(row: dict) -> Movie:
+    def create_movie_from_row(row: dict, people: Optional[Dict[str, Person]] = None) -> Movie:
+        """
+        Crea una película con su reparto. `people` ({person_key: Person})
+        permite reutilizar la misma persona entre películas de una sesión.
+        """
         title = row.get('title')
         year = int(str(row['date_published'])[:4]) if row.get('date_published') else None
         rating = float(row['rating']) if row.get('rating') else None
         duration = int(row['duration_minutes']) if row.get('duration_minutes') else None
         metascore = float(row['metascore']) if row.get('metascore') else None
-        actors_raw = row.get('actors')
 
         movie = Movie(
+            imdb_id=row.get('movie_id') or None,
             title=title,
             year=year,
             rating=rating,
@@ -20,17 +32,41 @@ class MovieFactory:
             metascore=metascore
         )
 
-        actor_names: List[str] = []
-        if actors_raw:
-            if isinstance(actors_raw, list):
-                actor_names = actors_raw
-            elif isinstance(actors_raw, str):
-                try:
-                    actor_names = ast.literal_eval(actors_raw)
-                    if not isinstance(actor_names, list):
-                        raise ValueError
-                except Exception:
-                    actor_names = [a.strip() for a in actors_raw.split(';')]
-
-        movie.actors = [Actor(name=a) for a in actor_names if a]
+        people = {} if people is None else people
+        movie.cast = []
+        for ordinal, member in enumerate(MovieFactory.parse_cast(row.get('actors'), row.get('actor_ids'))):
+            person = people.setdefault(member.person_key, Person(**member._asdict()))
+            movie.cast.append(MoviePerson(person=person, ordinal=ordinal))
         return movie
+
+    @staticmethod
+    def parse_cast(actors_raw: Any, actor_ids_raw: Any = None) -> List[CastMember]:
+        """
+        Reparto a partir de las listas de nombres e ids nm... (alineadas por
+        posición). La clave de cada persona es su id de IMDb o, si no se conoce,
+        su nombre; se omiten nombres vacíos y personas repetidas.
+        """
+        names = MovieFactory.parse_actor_names(actors_raw)
+        ids = MovieFactory.parse_actor_names(actor_ids_raw)
+        cast: Dict[str, CastMember] = {}
+        for position, name in enumerate(names):
+            if not name:
+                continue
+            imdb_person_id = str(ids[position]) if position < len(ids) and ids[position] else None
+            person_key = imdb_person_id or str(name)
+            cast.setdefault(person_key, CastMember(person_key, imdb_person_id, str(name)))
+        return list(cast.values())
+
+    @staticmethod
+    def parse_actor_names(actors_raw: Any) -> List[str]:
+        actor_names: List[str] = []
+        if isinstance(actors_raw, (list, tuple, np.ndarray)):
+            actor_names = list(actors_raw)
+        elif isinstance(actors_raw, str) and actors_raw:
+            try:
+                actor_names = ast.literal_eval(actors_raw)
+                if not isinstance(actor_names, list):
+                    raise ValueError
+            except Exception:
+                actor_names = [a.strip() for a in actors_raw.split(';')]
+        return actor_names
@@ -0,0 +1,216 @@
+"""
+Carga rápida para PostgreSQL mediante `COPY FROM STDIN`.
+
+Las filas del DataFrame refinado se serializan a CSV en memoria, bloque a
+bloque, y se envían a tablas temporales de staging a través de
+`cursor.copy_expert` de psycopg2 (sin archivo intermedio). Después un merge
+basado en conjuntos hace el upsert en `movies` por `imdb_id` (omitiendo las
+filas cuyo `content_hash` no cambió), agrega a `people` las personas nuevas
+(o completa el id nm... de las guardadas sólo por nombre) y reemplaza el reparto (`movie_people`) de las películas insertadas o
+actualizadas. Aquí los ids de `people` se resuelven con un JOIN en la base de
+datos en lugar de con la caché en memoria del cargador genérico.
+"""
+
+import io
+import csv
+from typing import Iterator, Iterable
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from imdb_movies.models_patterns.bulk_loader import (
+    BulkMovieLoader,
+    LoadResult,
+    MOVIE_COLUMNS,
+    UPDATE_COLUMNS,
+    build_movie_payloads,
+)
+
+
+STAGING_DDL = (
+    """
+    CREATE TEMP TABLE IF NOT EXISTS movies_stage (
+        imdb_id VARCHAR(20) PRIMARY KEY,
+        title VARCHAR,
+        year INTEGER,
+        rating DOUBLE PRECISION,
+        duration INTEGER,
+        metascore DOUBLE PRECISION,
+        content_hash VARCHAR(32)
+    ) ON COMMIT DROP
+    """,
+    """
+    CREATE TEMP TABLE IF NOT EXISTS cast_stage (
+        imdb_id VARCHAR(20),
+        person_key VARCHAR,
+        imdb_person_id VARCHAR(20),
+        name VARCHAR,
+        ordinal SMALLINT
+    ) ON COMMIT DROP
+    """,
+    """
+    CREATE TEMP TABLE IF NOT EXISTS movies_upserted (
+        id INTEGER PRIMARY KEY,
+        imdb_id VARCHAR(20)
+    ) ON COMMIT DROP
+    """,
+    "TRUNCATE movies_stage, cast_stage, movies_upserted",
+)
+
+MERGE_MOVIES_SQL = f"""
+    WITH upserted AS (
+        INSERT INTO movies ({', '.join(MOVIE_COLUMNS)})
+        SELECT {', '.join(MOVIE_COLUMNS)}
+        FROM movies_stage
+        ON CONFLICT (imdb_id) DO UPDATE SET
+            {', '.join(f'{column} = EXCLUDED.{column}' for column in UPDATE_COLUMNS)}
+        WHERE movies.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+        RETURNING id, imdb_id
+    )
+    INSERT INTO movies_upserted (id, imdb_id)
+    SELECT id, imdb_id FROM upserted
+"""
+
+# Años de las películas que el merge va a reescribir (antes) y de las escritas (después)
+CHANGED_YEARS_BEFORE_SQL = """
+    SELECT DISTINCT m.year
+    FROM movies m
+    JOIN movies_stage s USING (imdb_id)
+    WHERE m.content_hash IS DISTINCT FROM s.content_hash
+"""
+
+CHANGED_YEARS_AFTER_SQL = """
+    SELECT DISTINCT m.year
+    FROM movies m
+    JOIN movies_upserted u ON u.id = m.id
+"""
+
+# Antes de insertar personas: las que llegan con id nm... nuevo adoptan la fila
+# guardada por nombre (sin id) con el mismo nombre, como las de la migración de `actors`
+CLAIM_PEOPLE_SQL = """
+    UPDATE people p
+    SET person_key = c.imdb_person_id, imdb_person_id = c.imdb_person_id
+    FROM (
+        SELECT DISTINCT ON (s.name) s.name, s.imdb_person_id
+        FROM cast_stage s
+        JOIN movies_upserted u USING (imdb_id)
+        WHERE s.imdb_person_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM people e WHERE e.person_key = s.imdb_person_id)
+        ORDER BY s.name, s.imdb_person_id
+    ) c
+    WHERE p.person_key = c.name AND p.imdb_person_id IS NULL
+"""
+
+MERGE_PEOPLE_SQL = """
+    INSERT INTO people (person_key, imdb_person_id, name)
+    SELECT DISTINCT ON (s.person_key) s.person_key, s.imdb_person_id, s.name
+    FROM cast_stage s
+    JOIN movies_upserted u USING (imdb_id)
+    ORDER BY s.person_key
+    ON CONFLICT (person_key) DO NOTHING
+"""
+
+DELETE_CAST_SQL = """
+    DELETE FROM movie_people mp
+    USING movies_upserted u
+    WHERE mp.movie_id = u.id
+"""
+
+MERGE_CAST_SQL = """
+    INSERT INTO movie_people (movie_id, person_id, ordinal)
+    SELECT u.id, p.id, s.ordinal
+    FROM cast_stage s
+    JOIN movies_upserted u USING (imdb_id)
+    JOIN people p USING (person_key)
+"""
+
+
+class IteratorFile(io.TextIOBase):
+    """Objeto tipo archivo de sólo lectura que consume un iterador de cadenas."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buffer = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def iter_csv_chunks(rows: Iterable[tuple], rows_per_chunk: int = 1000) -> Iterator[str]:
+    """Serializa tuplas a CSV (None -> NULL) en bloques de `rows_per_chunk` filas."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+class PostgresCopyLoader(BulkMovieLoader):
+    """Cargador basado en COPY; requiere el driver psycopg2."""
+
+    def load_frame(self, session: Session, df: pd.DataFrame) -> LoadResult:
+        if df is None or df.empty:
+            return LoadResult()
+
+        movie_rows, casts, invalid = build_movie_payloads(df)
+        if invalid:
+            self.logger.warning(f"⚠️ {invalid} filas sin título, sin id de IMDb o repetidas omitidas")
+        if not movie_rows:
+            return LoadResult()
+
+        connection = session.connection()
+        for statement in STAGING_DDL:
+            connection.execute(text(statement))
+
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY movies_stage ({', '.join(MOVIE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                IteratorFile(iter_csv_chunks(
+                    tuple(row[column] for column in MOVIE_COLUMNS) for row in movie_rows
+                )),
+            )
+            cursor.copy_expert(
+                "COPY cast_stage (imdb_id, person_key, imdb_person_id, name, ordinal) FROM STDIN WITH (FORMAT csv)",
+                IteratorFile(iter_csv_chunks(
+                    (row["imdb_id"], *member, ordinal)
+                    for row, cast in zip(movie_rows, casts)
+                    for ordinal, member in enumerate(cast)
+                )),
+            )
+        finally:
+            cursor.close()
+
+        years = set(connection.execute(text(CHANGED_YEARS_BEFORE_SQL)).scalars())
+        movies_count = connection.execute(text(MERGE_MOVIES_SQL)).rowcount
+        years.update(connection.execute(text(CHANGED_YEARS_AFTER_SQL)).scalars())
+        connection.execute(text(CLAIM_PEOPLE_SQL))
+        people_count = connection.execute(text(MERGE_PEOPLE_SQL)).rowcount
+        connection.execute(text(DELETE_CAST_SQL))
+        cast_count = connection.execute(text(MERGE_CAST_SQL)).rowcount
+
+        result = LoadResult(movies_count, cast_count, len(movie_rows) - movies_count, people_count, years)
+        self.logger.debug(
+            f"🐘 COPY cargado: {result.movies} películas, {result.actors} actores "
+            f"({result.people} personas nuevas), {result.skipped} sin cambios"
+        )
+        return result
@@ -0,0 +1,95 @@
+"""
+Salida columnar (Parquet) de los datos refinados.
+
+A diferencia del CSV, conserva los tipos de cada columna y guarda `actors`
+(y `actor_ids`) como columnas `list<string>` con codificación por diccionario, de modo
+que las cargas posteriores no tienen que volver a interpretar la lista con
+`ast.literal_eval`. Los bloques refinados se acumulan hasta
+`ConfigRefine.PARQUET_ROW_GROUP_SIZE` filas y se escriben como un row group.
+
+Requiere `pyarrow`, que es una dependencia opcional.
+"""
+
+from typing import Iterator
+import pandas as pd
+from imdb_movies.enum_model import ConfigRefine
+from imdb_movies.models_patterns.movie_factory import MovieFactory
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depende del entorno
+    pa = pq = None
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("La salida Parquet requiere 'pyarrow' (pip install pyarrow)")
+
+
+def refined_schema() -> "pa.Schema":
+    """Esquema tipado de las columnas de `ConfigRefine.OUTPUT_COLUMNS`."""
+    _require_pyarrow()
+    return pa.schema([
+        ("title", pa.string()),
+        ("date_published", pa.timestamp("ms")),
+        ("rating", pa.float32()),
+        ("duration_minutes", pa.float64()),
+        ("metascore", pa.int16()),
+        ("actors", pa.list_(pa.string())),
+        ("actor_ids", pa.list_(pa.string())),
+        ("movie_url", pa.string()),
+        ("movie_id", pa.string()),
+    ])
+
+
+def _string_lists(values: pd.Series) -> list[list[str]]:
+    return [[str(value) for value in MovieFactory.parse_actor_names(raw)] for raw in values]
+
+
+class ParquetChunkWriter:
+    """Escribe bloques refinados en un archivo Parquet, un row group por cada `row_group_size` filas."""
+
+    def __init__(self, output_path: str, row_group_size: int = ConfigRefine.PARQUET_ROW_GROUP_SIZE.value):
+        _require_pyarrow()
+        self.output_path = output_path
+        self.row_group_size = row_group_size
+        self.schema = refined_schema()
+        self.rows = 0
+        self._pending: list["pa.Table"] = []
+        self._pending_rows = 0
+        self._writer = pq.ParquetWriter(output_path, self.schema, use_dictionary=True, compression="snappy")
+
+    def write(self, df: pd.DataFrame) -> None:
+        frame = df[self.schema.names].assign(
+            actors=_string_lists(df["actors"]), actor_ids=_string_lists(df["actor_ids"])
+        )
+        table = pa.Table.from_pandas(frame, schema=self.schema, preserve_index=False)
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        self.rows += table.num_rows
+        if self._pending_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self._writer.write_table(pa.concat_tables(self._pending), row_group_size=self.row_group_size)
+        self._pending.clear()
+        self._pending_rows = 0
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+        self._writer = None
+
+
+def iter_parquet_chunks(file_path: str) -> Iterator[pd.DataFrame]:
+    """Lee un Parquet refinado row group a row group con los mismos tipos que el refinado."""
+    _require_pyarrow()
+    types = {pa.int16(): pd.Int16Dtype(), pa.string(): pd.StringDtype()}
+    parquet_file = pq.ParquetFile(file_path)
+    for index in range(parquet_file.num_row_groups):
+        yield parquet_file.read_row_group(index).to_pandas(types_mapper=types.get)
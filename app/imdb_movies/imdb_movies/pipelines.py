@@ -2,14 +2,9 @@ import json
 from os import path
 from scrapy import Spider
 from imdb_movies.items import ImdbMoviesItem
-from imdb_movies.enum_model import ConfigImdb, ConfigDB, RefineLevel
-from imdb_movies.imdb_refine import CreatorOutputData
-from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError, DisconnectionError
-from imdb_movies.models_patterns.movie_factory import MovieFactory
-from imdb_movies.models_patterns.error_handlers import retry_with_backoff, RetryConfig
+from imdb_movies.enum_model import ConfigImdb, ConfigDB, RefineLevel, OutputFormat, REFINE_PARQUET
+from imdb_movies.refine_load import refine_and_load, default_input_paths
+from imdb_movies.conditional import load_succeeded
 from imdb_movies.models_patterns.database_strategies import DatabaseStrategyFactory
 
 
@@ -26,57 +21,111 @@ def save_to_json_file(data: list[dict], output_path: str) -> None:
         print(f"Error al guardar el archivo JSON: {e}")
 
 
+class JsonLinesWriter:
+    """
+    Escribe items en formato JSON Lines a medida que llegan.
+
+    Mantiene en memoria como máximo `buffer_size` líneas y las vuelca a disco
+    (con flush) al llenarse, de forma que un proceso interrumpido conserva
+    todo lo ya escrito.
+    """
+
+    def __init__(self, output_path: str, buffer_size: int = ConfigImdb.STREAM_BUFFER_SIZE.value):
+        self.output_path = output_path
+        self.buffer_size = buffer_size
+        self._buffer: list[str] = []
+        self._file = open(output_path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, data: dict) -> None:
+        self._buffer.append(json.dumps(data, ensure_ascii=False))
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
 class ImdbMoviesPipeline:
 
     def open_spider(self, spider: Spider):
         spider.logger.info('- Inicio del spider: %s', spider.name)
         self.items = []
+        self.writer: JsonLinesWriter | None = None
+        self.streaming = getattr(spider, 'output_format', OutputFormat.JSON.value) == OutputFormat.JSONL.value
         self.input_document_json_path = path.join(
-            ConfigImdb.DATA_PATH.value, ConfigImdb.OUTPUT_DOCUMENT_NAME_PAGE.value
+            ConfigImdb.DATA_PATH.value,
+            ConfigImdb.OUTPUT_DOCUMENT_NAME_PAGE_JSONL.value if self.streaming
+            else ConfigImdb.OUTPUT_DOCUMENT_NAME_PAGE.value
         )
         self.output_document_json_path = path.join(
             ConfigImdb.DATA_PATH.value, ConfigImdb.OUTPUT_DOCUMENT_NAME_REFINE.value
         )
+        self.output_document_parquet_path = path.join(
+            ConfigImdb.DATA_PATH.value, ConfigImdb.OUTPUT_DOCUMENT_NAME_REFINE_PARQUET.value
+        ) if REFINE_PARQUET else None
+
+        if self.streaming and spider.refine != RefineLevel.INTERMEDIATE.value:
+            self.writer = JsonLinesWriter(self.input_document_json_path)
 
     def process_item(self, item: ImdbMoviesItem, spider: Spider):
-        self.items.append(dict(item))
+        if self.writer:
+            self.writer.write(dict(item))
+        else:
+            self.items.append(dict(item))
         return item
 
     def close_spider(self, spider: Spider):
         spider.logger.info('- Finalizada la ejecución del spider: %s', spider.name)
 
         if spider.refine == RefineLevel.INTERMEDIATE.value:
+            # Sin crawl: se refinan y cargan los archivos ya existentes
+            self._refine_and_load(spider, default_input_paths())
             return
 
-        save_to_json_file(self.items, self.input_document_json_path)
+        if self.writer:
+            self.writer.close()
+            spider.logger.info(
+                '- %d items escritos en %s', self.writer.count, self.input_document_json_path
+            )
+        else:
+            save_to_json_file(self.items, self.input_document_json_path)
 
         if spider.refine ==  RefineLevel.BASIC.value:
             spider.logger.info('- Proceso de extracción finalizado')
             return
 
-        spider.logger.info('- Procesando archivo JSON...')
-    
-        try:
-            strategy = get_database_strategy(spider.logger)
-            session = strategy.get_session()
-
-            creator_output_data = CreatorOutputData(
-                document_json_path=self.input_document_json_path,
-                document_csv_path=self.output_document_json_path,
-                logger=spider.logger
-            )
-
-            df_output = creator_output_data.refine_output_data()
+        self._refine_and_load(spider, [self.input_document_json_path])
 
-            for _, row in df_output.iterrows():
-                try:
-                    movie = MovieFactory.create_movie_from_row(row)
-                    session.add(movie)
-                except Exception as row_error:
-                    spider.logger.error(f"❌ Error procesando fila: {row_error}")
+    def _refine_and_load(self, spider: Spider, input_paths: list[str]):
+        spider.logger.info('- Procesando archivos: %s', ', '.join(input_paths))
 
-            self._commit_with_retry(session, spider.logger)
-            spider.logger.info('Guardado exitoso de modelos Movie y Actor.')
+        try:
+            report = refine_and_load(
+                input_paths,
+                get_database_strategy(spider.logger),
+                csv_path=self.output_document_json_path,
+                parquet_path=self.output_document_parquet_path,
+                workers=1,  # dentro del crawl: sin pool de procesos en close_spider
+                log=spider.logger,
+            )
+            spider.logger.info(
+                'Guardado exitoso de %d películas y %d actores (%d películas sin cambios).',
+                report.result.movies, report.result.actors, report.result.skipped
+            )
+            crawler = getattr(spider, 'crawler', None)
+            if crawler:
+                crawler.signals.send_catch_log(signal=load_succeeded)
 
             print('\n' + '🎉' * 60)
             print('✅ ¡IMDB SCRAPER COMPLETADO EXITOSAMENTE!')
@@ -85,14 +134,3 @@ class ImdbMoviesPipeline:
 
         except Exception as error:
             spider.logger.error(f'❌ Error general en refinado o guardado a modelos: {error}')
-            session.rollback()
-        finally:
-            session.close()
-
-    @retry_with_backoff(
-        config=RetryConfig(max_retries=3, base_delay=2.0),
-        retry_on=(SQLAlchemyError, DisconnectionError)
-    )
-    def _commit_with_retry(self, session: Session, logger):
-        logger.info('Intentando commit a la base de datos...')
-        session.commit()
\ No newline at end of file
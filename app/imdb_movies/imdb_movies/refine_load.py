@@ -0,0 +1,310 @@
+"""
+Refinado y carga sin crawl.
+
+Lee los archivos ya extraídos (`movies_info.json` o shards JSON Lines),
+refina los bloques en un pool de procesos y los carga en la base de datos
+configurada desde el proceso principal. Los Parquet ya refinados
+(`movies_info_refine.parquet`) se cargan directamente, sin refinado. Al
+terminar cada bloque informa las filas por segundo de cada etapa (lectura,
+refinado y carga).
+
+Uso (desde app/imdb_movies):
+    python -m imdb_movies.refine_load
+    python -m imdb_movies.refine_load data/movies_info-*.jsonl --workers 4 --chunk-size 10000
+    python -m imdb_movies.refine_load data/movies_info.json --db sqlite --no-csv --parquet
+    python -m imdb_movies.refine_load data/movies_info_refine.parquet
+"""
+
+import os
+import glob
+import json
+import time
+import logging
+import argparse
+from os import path
+from collections import deque
+from itertools import chain, islice
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, Executor
+from typing import Callable, Iterable, Iterator
+import pandas as pd
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError, DisconnectionError
+from imdb_movies.enum_model import ConfigImdb, ConfigDB, ConfigRefine, REFINE_PARQUET, REFINE_WORKERS
+from imdb_movies.imdb_refine import CreatorOutputData
+from imdb_movies.parquet_output import iter_parquet_chunks
+from imdb_movies.models_patterns.bulk_loader import LoadResult
+from imdb_movies.models_patterns.data_version import bump_data_version
+from imdb_movies.models_patterns.analytics_refresh import refresh_analytics
+from imdb_movies.models_patterns.error_handlers import retry_with_backoff, RetryConfig
+from imdb_movies.models_patterns.database_strategies import DatabaseStrategy, DatabaseStrategyFactory
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageStats:
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class RefineLoadReport:
+    """Filas y tiempo ocupado de cada etapa, más el resultado de la carga."""
+    read: StageStats = field(default_factory=StageStats)
+    refine: StageStats = field(default_factory=StageStats)
+    load: StageStats = field(default_factory=StageStats)
+    result: LoadResult = field(default_factory=LoadResult)
+    chunks: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        return (
+            f"lectura {self.read.rows} filas ({self.read.rate:,.0f}/s) | "
+            f"refinado {self.refine.rows} filas ({self.refine.rate:,.0f}/s) | "
+            f"carga {self.load.rows} filas ({self.load.rate:,.0f}/s) | "
+            f"total {self.elapsed:.1f}s"
+        )
+
+
+def default_input_paths(data_path: str = str(ConfigImdb.DATA_PATH.value)) -> list[str]:
+    """Shards JSON Lines del directorio de datos o, si no hay, `movies_info.json`."""
+    stem, _ = path.splitext(ConfigImdb.OUTPUT_DOCUMENT_NAME_PAGE_JSONL.value)
+    shards = sorted(glob.glob(path.join(data_path, f"{stem}*.jsonl")))
+    if shards:
+        return shards
+    return [path.join(data_path, ConfigImdb.OUTPUT_DOCUMENT_NAME_PAGE.value)]
+
+
+def resolve_input_paths(patterns: Iterable[str]) -> list[str]:
+    """Expande patrones glob conservando el orden y sin repetir archivos."""
+    paths: list[str] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        paths.extend(match for match in matches if match not in paths)
+    return paths
+
+
+def iter_raw_batches(file_path: str, chunk_size: int) -> Iterator[list]:
+    """
+    Lee un archivo de entrada en bloques de `chunk_size` items.
+
+    Para JSON Lines devuelve las líneas sin decodificar: el `json.loads` se
+    hace en el proceso de refinado y el proceso principal sólo envía texto.
+    """
+    if not file_path.endswith('.jsonl'):
+        reader = CreatorOutputData(document_json_path=file_path, chunk_size=chunk_size, logger=logger)
+        yield from reader.iter_movie_batches()
+        return
+
+    if not path.exists(file_path):
+        logger.warning("Ruta no válida o archivo no encontrado: '%s'", file_path)
+        return
+
+    batch = []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            batch.append(line)
+            if len(batch) >= chunk_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def refine_batch(batch: list) -> tuple[pd.DataFrame | None, float]:
+    """Trabajo de cada proceso: decodifica y refina un bloque; devuelve también su duración."""
+    start = time.perf_counter()
+    records = []
+    for item in batch:
+        if isinstance(item, str):
+            try:
+                item = json.loads(item)
+            except json.JSONDecodeError as e:
+                logger.warning("Línea JSON inválida omitida: %s", str(e))
+                continue
+        records.append(item)
+
+    df = CreatorOutputData(logger=logger).refine_records(records) if records else None
+    return df, time.perf_counter() - start
+
+
+def _ordered_map(
+    executor: Executor | None, fn: Callable, items: Iterable, max_in_flight: int
+) -> Iterator:
+    """Como `executor.map`, pero con un máximo de tareas pendientes para acotar la memoria."""
+    if executor is None:
+        yield from map(fn, items)
+        return
+
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+@retry_with_backoff(
+    config=RetryConfig(max_retries=3, base_delay=2.0),
+    retry_on=(SQLAlchemyError, DisconnectionError)
+)
+def commit_with_retry(session: Session) -> None:
+    session.commit()
+
+
+def refine_and_load(
+    input_paths: list[str],
+    strategy: DatabaseStrategy,
+    csv_path: str | None = None,
+    parquet_path: str | None = None,
+    workers: int = REFINE_WORKERS,
+    chunk_size: int = ConfigRefine.CHUNK_SIZE.value,
+    log: logging.Logger = logger,
+) -> RefineLoadReport:
+    """
+    Refina los archivos de entrada en paralelo y los carga con el cargador de la estrategia.
+
+    Cada bloque se confirma en su propia transacción: la carga es un upsert
+    por `imdb_id`, así que repetir una ejecución interrumpida no duplica datos.
+    Los bloques con cambios incrementan `data_version` en esa misma transacción
+    y, tras el commit, refrescan las tablas de analítica de los años afectados.
+    Con `workers <= 1`, o si la entrada cabe en un solo bloque, el refinado se
+    hace en el proceso actual sin arrancar el pool. Los archivos `.parquet` ya
+    están refinados y sólo pasan por la etapa de carga.
+    """
+    workers = workers or os.cpu_count() or 1
+    report = RefineLoadReport()
+    writer = CreatorOutputData(document_csv_path=csv_path, document_parquet_path=parquet_path, logger=log)
+    loader = strategy.get_bulk_loader()
+    parquet_inputs = [file_path for file_path in input_paths if file_path.endswith('.parquet')]
+    raw_inputs = [file_path for file_path in input_paths if file_path not in parquet_inputs]
+
+    def load_chunk(session: Session, df: pd.DataFrame) -> None:
+        start = time.perf_counter()
+        result = loader.load_frame(session, df)
+        if result.movies:
+            # Misma transacción que los datos: la API ve la versión nueva junto con ellos
+            bump_data_version(session.connection())
+        commit_with_retry(session)
+        if result.movies:
+            refresh_chunk_analytics(session, result.years)
+        report.result += result
+        report.load.seconds += time.perf_counter() - start
+        report.load.rows += len(df)
+        log.info("📊 Bloque %d: %s", report.chunks, report.summary())
+
+    def refresh_chunk_analytics(session: Session, years: set) -> None:
+        try:
+            refresh_analytics(session.connection(), years, logger=log)
+            session.commit()
+        except SQLAlchemyError as e:
+            # No interrumpe la carga: la API usa las consultas directas hasta el siguiente refresco (completo)
+            session.rollback()
+            log.warning("⚠️ No se pudo refrescar la analítica: %s", str(e))
+
+    def read_parquet() -> Iterator[pd.DataFrame]:
+        for file_path in parquet_inputs:
+            log.info("📂 Leyendo %s", file_path)
+            chunks = iter_parquet_chunks(file_path)
+            while True:
+                start = time.perf_counter()
+                df = next(chunks, None)
+                report.read.seconds += time.perf_counter() - start
+                if df is None:
+                    break
+                report.read.rows += len(df)
+                yield df
+
+    def read_batches() -> Iterator[list]:
+        for file_path in raw_inputs:
+            log.info("📂 Leyendo %s", file_path)
+            batches = iter_raw_batches(file_path, chunk_size)
+            while True:
+                start = time.perf_counter()
+                batch = next(batches, None)
+                report.read.seconds += time.perf_counter() - start
+                if batch is None:
+                    break
+                report.read.rows += len(batch)
+                yield batch
+
+    executor = None
+    session = strategy.get_session()
+    try:
+        for df in read_parquet():
+            report.chunks += 1
+            load_chunk(session, df)
+
+        # El pool sólo compensa su arranque si hay más de un bloque que refinar
+        batches = read_batches()
+        first_batches = list(islice(batches, 2))
+        if workers > 1 and len(first_batches) > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+
+        for df, refine_seconds in _ordered_map(executor, refine_batch, chain(first_batches, batches), workers * 2):
+            report.chunks += 1
+            report.refine.seconds += refine_seconds
+            if df is None:
+                continue
+            report.refine.rows += len(df)
+
+            writer.export_chunk(df, header=report.refine.rows == len(df))
+            load_chunk(session, df)
+
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+        writer.close()
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    log.info(
+        "✅ Refinado y carga finalizados: %d películas, %d actores, %d sin cambios",
+        report.result.movies, report.result.actors, report.result.skipped
+    )
+    log.info("📊 %s", report.summary())
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refinado y carga de archivos ya extraídos")
+    parser.add_argument("inputs", nargs="*", help="Archivos .json/.jsonl o patrones glob (por defecto, el directorio de datos)")
+    parser.add_argument("--workers", type=int, default=REFINE_WORKERS, help="Procesos de refinado (0 = número de CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=ConfigRefine.CHUNK_SIZE.value)
+    parser.add_argument("--db", type=str, default=ConfigDB.DB.value, help="Tipo de base de datos de DatabaseStrategyFactory")
+    parser.add_argument("--csv", type=str, default=path.join(ConfigImdb.DATA_PATH.value, ConfigImdb.OUTPUT_DOCUMENT_NAME_REFINE.value))
+    parser.add_argument("--no-csv", action="store_true", help="No exportar el CSV refinado")
+    parser.add_argument("--parquet", action="store_true", default=REFINE_PARQUET, help="Exportar también el Parquet refinado (requiere pyarrow)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    input_paths = resolve_input_paths(args.inputs) if args.inputs else default_input_paths()
+    strategy = DatabaseStrategyFactory.create_strategy((args.db or "").lower(), logger)
+    refine_and_load(
+        input_paths,
+        strategy,
+        csv_path=None if args.no_csv else args.csv,
+        parquet_path=path.join(ConfigImdb.DATA_PATH.value, ConfigImdb.OUTPUT_DOCUMENT_NAME_REFINE_PARQUET.value) if args.parquet else None,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
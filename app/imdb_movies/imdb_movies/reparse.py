@@ -0,0 +1,119 @@
+"""
+Re-extracción de las páginas archivadas, sin red.
+
+Vuelve a ejecutar `ImdbMoviesSpiderSpider.parse_main_info_movie` (y con él
+`_get_metascore`) sobre la última descarga de cada título del archivo de
+páginas (`-a archive_pages=1` al hacer el crawl), repartiendo las páginas en
+un pool de procesos. Cada proceso lee y descomprime sus páginas del almacén;
+el proceso principal sólo recibe los items y los pasa por el pipeline normal
+(`ImdbMoviesPipeline`), que los escribe y, según `--refine`, los refina y
+carga en la base de datos.
+
+Uso (desde app/imdb_movies):
+    python -m imdb_movies.reparse
+    python -m imdb_movies.reparse --archive /ruta/archivo --workers 8 --refine 0
+    python -m imdb_movies.reparse --title tt0111161 --title tt0068646
+"""
+
+import os
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from imdb_movies.enum_model import ConfigImdb, OutputFormat, RefineLevel, REFINE_WORKERS
+from imdb_movies.items import ImdbMoviesItem
+from imdb_movies.pipelines import ImdbMoviesPipeline
+from imdb_movies.refine_load import _ordered_map
+from imdb_movies.response_archive import ArchivedPage, ResponseArchive, load_body
+from imdb_movies.spiders.imdb_movies_spider import ImdbMoviesSpiderSpider
+
+logger = logging.getLogger(__name__)
+
+PAGES_PER_TASK = 50
+
+_worker_spider: ImdbMoviesSpiderSpider | None = None
+
+
+def _spider() -> ImdbMoviesSpiderSpider:
+    # Una instancia por proceso: sólo se usan sus callbacks de extracción
+    global _worker_spider
+    if _worker_spider is None:
+        _worker_spider = ImdbMoviesSpiderSpider(refine=RefineLevel.BASIC.value)
+    return _worker_spider
+
+
+def reparse_pages(task: tuple[str, list[ArchivedPage]]) -> list[dict]:
+    """Trabajo de cada proceso: extrae los items de un bloque de páginas archivadas."""
+    objects_dir, pages = task
+    spider = _spider()
+    items = []
+    for page in pages:
+        request = Request(page.url, meta={"output_info_movie": dict(page.meta)})
+        response = HtmlResponse(page.url, body=load_body(objects_dir, page.body_sha256), encoding="utf-8", request=request)
+        items.extend(dict(item) for item in spider.parse_main_info_movie(response))
+    return items
+
+
+def reparse_archive(
+    archive: ResponseArchive,
+    refine: int = RefineLevel.ADVANCED.value,
+    output_format: str = OutputFormat.JSONL.value,
+    workers: int = REFINE_WORKERS,
+    title_ids: list[str] | None = None,
+) -> int:
+    """Re-extrae las páginas de `archive` y pasa los items por el pipeline; devuelve cuántos items generó."""
+    workers = workers or os.cpu_count() or 1
+    pages = archive.latest_pages(title_ids)
+    logger.info("📦 %d páginas archivadas en %s", len(pages), archive.root)
+
+    spider = ImdbMoviesSpiderSpider(refine=refine, output_format=output_format)
+    pipeline = ImdbMoviesPipeline()
+    pipeline.open_spider(spider)
+
+    tasks = (
+        (str(archive.objects), pages[start:start + PAGES_PER_TASK])
+        for start in range(0, len(pages), PAGES_PER_TASK)
+    )
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(pages) > PAGES_PER_TASK else None
+    start = time.perf_counter()
+    count = 0
+    try:
+        for items in _ordered_map(executor, reparse_pages, tasks, workers * 2):
+            for item in items:
+                pipeline.process_item(ImdbMoviesItem(item), spider)
+            count += len(items)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "✅ %d items re-extraídos en %.1fs (%.0f páginas/s)",
+        count, elapsed, len(pages) / elapsed if elapsed else 0.0,
+    )
+    pipeline.close_spider(spider)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extracción de las páginas archivadas sin red")
+    parser.add_argument("--archive", type=str, default=str(ConfigImdb.DATA_PATH.value / "archive"))
+    parser.add_argument("--workers", type=int, default=REFINE_WORKERS, help="Procesos de extracción (0 = número de CPUs)")
+    parser.add_argument("--refine", type=int, default=RefineLevel.ADVANCED.value, choices=(RefineLevel.BASIC.value, RefineLevel.ADVANCED.value))
+    parser.add_argument("--output-format", type=str, default=OutputFormat.JSONL.value, choices=[fmt.value for fmt in OutputFormat])
+    parser.add_argument("--title", action="append", dest="titles", help="Sólo estos ids de título (se puede repetir)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    archive = ResponseArchive(args.archive)
+    try:
+        reparse_archive(archive, args.refine, args.output_format, args.workers, args.titles)
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
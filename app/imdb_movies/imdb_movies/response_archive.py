@@ -0,0 +1,256 @@
+"""
+Grabación y reproducción de respuestas HTTP.
+
+`ResponseArchive` guarda los cuerpos comprimidos con gzip en un almacén
+direccionado por contenido (`objects/<sha256[:2]>/<sha256>.gz`, un archivo por
+cuerpo distinto) y, en `index.sqlite`, la URL, el método, el estado y los
+encabezados de cada petición, identificada por su huella de Scrapy. La tabla
+`pages` guarda además las páginas de detalle por id de título y fecha de
+descarga, junto con los datos del chart, para volver a extraerlas con
+`imdb_movies.reparse`.
+
+`ResponseArchiveMiddleware` lo usa según `RESPONSE_ARCHIVE_MODE`:
+
+* `record`: guarda cada respuesta descargada (la última gana).
+* `replay`: responde desde el archivo sin acceso a la red; las peticiones que
+  no están grabadas se descartan con `IgnoreRequest`.
+* `off` (por defecto): no se instala.
+
+Se ubica después de `HttpCacheMiddleware` (950), de modo que se graba la
+respuesta tal como llega del servidor y la reproducción pasa por los mismos
+middlewares (descompresión, cookies, redirecciones, reintentos) que una
+descarga real.
+
+Uso (desde app/imdb_movies):
+    scrapy crawl imdb_movies_spider -a refine=0 -s RESPONSE_ARCHIVE_MODE=record
+    scrapy crawl imdb_movies_spider -s RESPONSE_ARCHIVE_MODE=replay -s RESPONSE_ARCHIVE_DIR=/ruta/archivo
+"""
+
+import os
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from dataclasses import dataclass
+from scrapy import Request, Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Headers, Response
+from scrapy.responsetypes import responsetypes
+from imdb_movies.enum_model import ConfigImdb
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_MODES = ("off", "record", "replay")
+
+
+@dataclass
+class ArchivedResponse:
+    url: str
+    method: str
+    status: int
+    headers: dict[str, list[str]]
+    body_sha256: str
+    fetched_at: float
+
+
+@dataclass
+class ArchivedPage:
+    title_id: str
+    url: str
+    body_sha256: str
+    fetched_at: float
+    meta: dict
+
+
+def load_body(objects_dir: str | Path, digest: str) -> bytes:
+    """Cuerpo de `digest` en el almacén (sin abrir el índice, para los procesos de re-extracción)."""
+    return gzip.decompress((Path(objects_dir) / digest[:2] / f"{digest}.gz").read_bytes())
+
+
+def encode_headers(headers: Headers) -> dict[str, list[str]]:
+    return {
+        key.decode("latin-1"): [value.decode("latin-1") for value in values]
+        for key, values in headers.items()
+    }
+
+
+class ResponseArchive:
+    """Cuerpos gzip direccionados por su sha256 más un índice SQLite de respuestas."""
+
+    def __init__(self, root: str | Path, compresslevel: int = 6):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.compresslevel = compresslevel
+        self._db = sqlite3.connect(self.root / "index.sqlite")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " fingerprint TEXT PRIMARY KEY, url TEXT NOT NULL, method TEXT NOT NULL,"
+            " status INTEGER NOT NULL, headers TEXT NOT NULL, body_sha256 TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " title_id TEXT NOT NULL, fetched_at REAL NOT NULL, url TEXT NOT NULL,"
+            " body_sha256 TEXT NOT NULL, meta TEXT NOT NULL,"
+            " PRIMARY KEY (title_id, fetched_at))"
+        )
+        self._db.commit()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.gz"
+
+    def put_body(self, body: bytes) -> tuple[str, int]:
+        """Guarda `body` si no existe; devuelve su sha256 y los bytes comprimidos escritos (0 si ya estaba)."""
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        if object_path.exists():
+            return digest, 0
+        object_path.parent.mkdir(exist_ok=True)
+        data = gzip.compress(body, compresslevel=self.compresslevel, mtime=0)
+        # Escritura atómica: un proceso interrumpido no deja objetos truncados
+        fd, tmp_path = tempfile.mkstemp(dir=object_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, object_path)
+        return digest, len(data)
+
+    def get_body(self, digest: str) -> bytes:
+        return load_body(self.objects, digest)
+
+    def record(
+        self,
+        fingerprint: str,
+        url: str,
+        method: str,
+        status: int,
+        headers: dict[str, list[str]],
+        body: bytes,
+        fetched_at: float | None = None,
+    ) -> int:
+        """Graba una respuesta; devuelve los bytes comprimidos nuevos en el almacén."""
+        digest, written = self.put_body(body)
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (fingerprint, url, method, status, json.dumps(headers), digest, fetched_at or time.time()),
+        )
+        self._db.commit()
+        return written
+
+    def lookup(self, fingerprint: str) -> ArchivedResponse | None:
+        row = self._db.execute(
+            "SELECT url, method, status, headers, body_sha256, fetched_at FROM responses WHERE fingerprint = ?",
+            (fingerprint,),
+        ).fetchone()
+        if row is None:
+            return None
+        url, method, status, headers, digest, fetched_at = row
+        return ArchivedResponse(url, method, status, json.loads(headers), digest, fetched_at)
+
+    def add_page(self, title_id: str, url: str, body: bytes, meta: dict, fetched_at: float | None = None) -> int:
+        """Archiva la página de detalle de `title_id`; devuelve los bytes comprimidos nuevos."""
+        digest, written = self.put_body(body)
+        self._db.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+            (title_id, fetched_at or time.time(), url, digest, json.dumps(meta, ensure_ascii=False)),
+        )
+        self._db.commit()
+        return written
+
+    def latest_pages(self, title_ids: list[str] | None = None) -> list[ArchivedPage]:
+        """Última descarga archivada de cada título (o de `title_ids`), ordenadas por id."""
+        rows = self._db.execute(
+            "SELECT title_id, url, body_sha256, MAX(fetched_at), meta FROM pages GROUP BY title_id ORDER BY title_id"
+        ).fetchall()
+        wanted = set(title_ids) if title_ids else None
+        return [
+            ArchivedPage(title_id, url, digest, fetched_at, json.loads(meta))
+            for title_id, url, digest, fetched_at, meta in rows
+            if wanted is None or title_id in wanted
+        ]
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def archive_dir(settings) -> Path:
+    return Path(settings.get("RESPONSE_ARCHIVE_DIR") or ConfigImdb.DATA_PATH.value / "archive")
+
+
+class ResponseArchiveMiddleware:
+    """Downloader middleware que graba o reproduce respuestas con `ResponseArchive`."""
+
+    def __init__(self, crawler: Crawler, mode: str, archive: ResponseArchive):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.mode = mode
+        self.archive = archive
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler):
+        mode = (crawler.settings.get("RESPONSE_ARCHIVE_MODE") or "off").lower()
+        if mode not in ARCHIVE_MODES:
+            raise NotConfigured(f"RESPONSE_ARCHIVE_MODE debe ser uno de {', '.join(ARCHIVE_MODES)}: {mode}")
+        if mode == "off":
+            raise NotConfigured
+        root = archive_dir(crawler.settings)
+        if mode == "replay" and not (root / "index.sqlite").exists():
+            raise FileNotFoundError(f"No hay respuestas grabadas en {root}")
+        logger.info("📼 Archivo de respuestas en modo %s: %s", mode, root)
+        return cls(crawler, mode, ResponseArchive(root))
+
+    def _fingerprint(self, request: Request) -> str:
+        return self.crawler.request_fingerprinter.fingerprint(request).hex()
+
+    def process_request(self, request: Request, spider: Spider):
+        if self.mode != "replay":
+            return None
+
+        archived = self.archive.lookup(self._fingerprint(request))
+        if archived is None:
+            self.stats.inc_value("response_archive/replay/miss")
+            raise IgnoreRequest(f"Respuesta no grabada: {request.url}")
+
+        body = self.archive.get_body(archived.body_sha256)
+        headers = Headers(archived.headers)
+        response_class = responsetypes.from_args(headers=headers, url=archived.url, body=body)
+        self.stats.inc_value("response_archive/replay/hit")
+        self.stats.inc_value("response_archive/replay/bytes", len(body))
+        return response_class(
+            url=archived.url,
+            status=archived.status,
+            headers=headers,
+            body=body,
+            request=request,
+            flags=["replay"],
+        )
+
+    def process_response(self, request: Request, response: Response, spider: Spider):
+        if self.mode != "record" or "cached" in response.flags:
+            return response
+
+        written = self.archive.record(
+            self._fingerprint(request),
+            response.url,
+            request.method,
+            response.status,
+            encode_headers(response.headers),
+            response.body,
+        )
+        self.stats.inc_value("response_archive/record/responses")
+        self.stats.inc_value("response_archive/record/bytes", len(response.body))
+        self.stats.inc_value("response_archive/record/stored_bytes", written)
+        return response
+
+    def spider_closed(self, spider: Spider) -> None:
+        self.archive.close()
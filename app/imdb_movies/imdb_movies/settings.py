@@ -24,9 +24,22 @@ ROBOTSTXT_OBEY = False
 
 # Concurrency and throttling settings
 #CONCURRENT_REQUESTS = 16
+# Valores fijos si se desactiva ADAPTIVE_THROTTLE_ENABLED
 CONCURRENT_REQUESTS_PER_DOMAIN = 1
 DOWNLOAD_DELAY = 1
 
+# Concurrencia y retardo adaptativos por slot (AIMD), ver imdb_movies/adaptive_throttle.py
+ADAPTIVE_THROTTLE_ENABLED = True
+ADAPTIVE_THROTTLE_START_CONCURRENCY = 1
+ADAPTIVE_THROTTLE_MAX_CONCURRENCY = 8
+ADAPTIVE_THROTTLE_START_DELAY = 1.0
+ADAPTIVE_THROTTLE_MIN_DELAY = 0.05
+ADAPTIVE_THROTTLE_MAX_DELAY = 60.0
+ADAPTIVE_THROTTLE_DELAY_STEP = 0.1
+ADAPTIVE_THROTTLE_BACKOFF = 0.5
+ADAPTIVE_THROTTLE_TARGET_LATENCY = 2.0
+ADAPTIVE_THROTTLE_DEBUG = False
+
 # Disable cookies (enabled by default)
 #COOKIES_ENABLED = False
 
@@ -47,15 +60,25 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "imdb_movies.middlewares.ImdbMoviesDownloaderMiddleware": 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    # Después de HttpCompressionMiddleware (590): el sha256 es del cuerpo descomprimido
+    "imdb_movies.conditional.ConditionalRequestMiddleware": 580,
+    "imdb_movies.response_archive.ResponseArchiveMiddleware": 950,
+}
+
+# Grabación (record) y reproducción sin red (replay) de respuestas, ver imdb_movies/response_archive.py
+RESPONSE_ARCHIVE_MODE = "off"
+RESPONSE_ARCHIVE_DIR = None  # por defecto data/archive
+
+# Peticiones condicionales a las páginas de detalle, ver imdb_movies/conditional.py
+INCREMENTAL_CRAWL = False
+INCREMENTAL_CRAWL_DB = None  # por defecto data/validators.sqlite
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    "imdb_movies.adaptive_throttle.AdaptiveThrottle": 500,
+}
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -1,15 +1,19 @@
 from logging import config
 import os
-import re
 import scrapy
 from pathlib import Path
-from ast import literal_eval
 from scrapy.http import Response
 from imdb_movies.items import ImdbMoviesItem
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+from imdb_movies.imdb_extract import extract_ld_json, extract_metascore, extract_person_id, extract_title_ids
+from imdb_movies.frontier import Frontier, load_seed_sources
+from imdb_movies.response_archive import ResponseArchive, archive_dir
 from imdb_movies.enum_model import (
     ConfigDB,
     ConfigImdb,
     RefineLevel,
+    OutputFormat,
     MovieJsonKeys,
     OutputMovieKeys,
 )
@@ -18,90 +22,196 @@ from imdb_movies.enum_model import (
 class ImdbMoviesSpiderSpider(scrapy.Spider):
     name = "imdb_movies_spider"
 
-    def __init__(self, refine=RefineLevel.ADVANCED.value, *args, **kwargs):
+    def __init__(
+        self,
+        refine=RefineLevel.ADVANCED.value,
+        output_format=OutputFormat.JSONL.value,
+        archive_pages="0",
+        seeds=None,
+        total_scrapy=ConfigImdb.TOTAL_SCRAPY.value,
+        resume="0",
+        frontier_db=None,
+        *args,
+        **kwargs,
+    ):
         super(ImdbMoviesSpiderSpider).__init__(*args, **kwargs)
         self.refine = int(refine)
+        self.output_format = OutputFormat(output_format).value
+        self.archive_pages = str(archive_pages).lower() in ("1", "true", "yes")
+        self.page_archive: ResponseArchive | None = None
+        self.seeds = seeds or ConfigImdb.SEED_SOURCES_FILE.value
+        self.total_scrapy = int(total_scrapy)
+        self.resume = str(resume).lower() in ("1", "true", "yes")
+        self.frontier_db = frontier_db or ConfigImdb.DATA_PATH.value / ConfigImdb.FRONTIER_DB.value
+        self.frontier: Frontier | None = None
+        self._in_flight = 0
         Path(ConfigImdb.DATA_PATH.value).mkdir(parents=True, exist_ok=True)
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        return spider
+
     def start_requests(self):
 
         if self.refine == RefineLevel.INTERMEDIATE.value:
             self.logger.info("Ejecucion de proceso de refinado")
             return []
 
-        start_url = ConfigImdb.TOP_MOVIE_URL.value
-        return [
-            scrapy.Request(
-                url=start_url,
-                headers=ConfigImdb.HEADERS.value,
-                cookies=ConfigImdb.COOKIES.value,
-                callback=self.parse,
-            )
-        ]
-
-    def parse(self, response: Response):
-        """Pagina con las 250 peliculas"""
-
-        info_movies = response.xpath(ConfigImdb.XPATH_JSON_INFO.value).get()
-        if info_movies is None:
-            self.logger.warning("No se encontraron datos de peliculas en la pagina.")
-            return
+        if self.archive_pages:
+            # Páginas de detalle comprimidas por título y fecha, para `python -m imdb_movies.reparse`
+            self.page_archive = ResponseArchive(archive_dir(self.settings))
 
-        info_movies = literal_eval(info_movies)
-        if not info_movies:
-            self.logger.error("No se obtuvo informacion de todas las peliculas")
-            return None
+        self.seed_sources = load_seed_sources(self.seeds)
+        self.frontier = Frontier(self.frontier_db, limit=self.total_scrapy, resume=self.resume)
+        self.logger.info(
+            "🌱 %d fuentes semilla (%s), tope de %s títulos",
+            len(self.seed_sources),
+            ", ".join(source.name for source in self.seed_sources),
+            self.total_scrapy or "∞",
+        )
+        requests = [self._seed_request(index, 0) for index in range(len(self.seed_sources))]
+        # Al reanudar, los títulos pendientes de la ejecución anterior se piden sin esperar a las semillas
+        return requests + list(self._dispatch())
 
-        info_movies: list[dict] = info_movies.get("itemListElement", [])
+    def _seed_request(self, source_index: int, page: int) -> scrapy.Request:
+        source = self.seed_sources[source_index]
+        return scrapy.Request(
+            url=source.page_url(page),
+            headers=ConfigImdb.HEADERS.value,
+            cookies=ConfigImdb.COOKIES.value,
+            callback=self.parse,
+            dont_filter=True,
+            priority=source.priority,
+            meta={"seed_source": source_index, "seed_page": page},
+        )
 
-        for index, info_movie in enumerate(info_movies):
+    def parse(self, response: Response):
+        """Página de una fuente semilla (chart, lista o búsqueda): admite sus títulos en la frontera."""
 
-            if index == ConfigImdb.TOTAL_SCRAPY.value:
-                break
+        source_index = response.meta.get("seed_source", 0)
+        page = response.meta.get("seed_page", 0)
+        source = self.seed_sources[source_index]
+        stats = self.crawler.stats
 
-            output_info_movie = self._get_info_movie_from_top_movies(
-                info_movie.get("item", {})
-            )
+        added = 0
+        for output_info_movie in self._get_seed_entries(response):
             if output_info_movie["movie_url"] == "":
                 self.logger.warning(
                     "%s no cuenta con una url", output_info_movie["title"]
                 )
                 continue
 
+            result = self.frontier.add(
+                output_info_movie["movie_id"],
+                output_info_movie["movie_url"],
+                source.priority,
+                source.name,
+                output_info_movie,
+            )
+            stats.inc_value(f"frontier/{result}")
+            added += result == "added"
+            if result == "full":
+                break
+        self.frontier.commit()
+        self.logger.info("🌱 %s página %d: %d títulos nuevos (%d en la frontera)", source.name, page + 1, added, len(self.frontier))
+
+        if added and source.has_page(page + 1) and not self.frontier.full:
+            yield self._seed_request(source_index, page + 1)
+        yield from self._dispatch()
+
+    def _get_seed_entries(self, response: Response) -> list[dict]:
+        try:
+            info_movies = extract_ld_json(response.text)
+        except ValueError as e:
+            self.logger.error("Error al decodificar JSON de la pagina: %s", str(e))
+            info_movies = None
+
+        if isinstance(info_movies, dict) and info_movies.get("itemListElement"):
+            return [
+                self._get_info_movie_from_top_movies(info_movie.get("item", {}))
+                for info_movie in info_movies["itemListElement"]
+            ]
+
+        # Sin ld+json (resultados de búsqueda): enlaces a títulos; el resto se completa en la página de detalle
+        title_ids = extract_title_ids(response.text)
+        if not title_ids:
+            self.logger.warning("No se encontraron peliculas en %s", response.url)
+        return [
+            self._get_info_movie_from_top_movies({MovieJsonKeys.URL.value: response.urljoin(f"/title/{title_id}/")})
+            for title_id in title_ids
+        ]
+
+    def _dispatch(self):
+        """Pide a la frontera los títulos que caben en el scheduler, por prioridad."""
+        if self.frontier is None:
+            return
+        for title_id, url, priority, output_info_movie in self.frontier.pop(ConfigImdb.FRONTIER_IN_FLIGHT.value - self._in_flight):
+            self._in_flight += 1
             yield scrapy.Request(
-                url=output_info_movie["movie_url"],
+                url=url,
                 headers=ConfigImdb.HEADERS.value,
                 cookies=ConfigImdb.COOKIES.value,
-                callback=self.parse_main_info_movie,
+                callback=self._parse_detail,
+                errback=self._detail_failed,
                 dont_filter=True,
-                meta={"output_info_movie": output_info_movie},
+                priority=priority,
+                meta={"output_info_movie": output_info_movie, "conditional": True, "title_id": title_id},
             )
 
+    def _parse_detail(self, response: Response):
+        yield from self.parse_main_info_movie(response)
+        self._in_flight -= 1
+        self.frontier.done(response.meta["title_id"])
+        yield from self._dispatch()
+
+    def _detail_failed(self, failure):
+        # También llegan aquí las páginas sin cambios del crawl incremental (IgnoreRequest)
+        self._in_flight -= 1
+        self.frontier.done(failure.request.meta["title_id"])
+        yield from self._dispatch()
+
+    def spider_idle(self, spider):
+        if self.frontier is None or not self.frontier.pending():
+            return
+        self._in_flight = 0
+        for request in self._dispatch():
+            self.crawler.engine.crawl(request)
+        raise DontCloseSpider
+
     def parse_main_info_movie(self, response: Response):
         """Extrae la información principal de una película desde la página de IMDb."""
 
         output_info_movie = response.meta.get("output_info_movie", {})
+        if self.page_archive is not None:
+            self.page_archive.add_page(
+                output_info_movie.get(OutputMovieKeys.MOVIE_ID.value) or self._get_movie_id(response.url),
+                response.url,
+                response.body,
+                dict(output_info_movie),
+            )
         item = ImdbMoviesItem()
 
-        info_movie_raw = response.xpath(ConfigImdb.XPATH_JSON_INFO.value).get()
+        body_text = response.text
         title_fallback = output_info_movie.get(OutputMovieKeys.TITLE.value, "[Título desconocido]")
 
-        if not info_movie_raw:
-            self.logger.warning(
-                "%s no cuenta con información JSON en la página principal",
+        try:
+            info_movie = extract_ld_json(body_text)
+        except ValueError as e:
+            self.logger.error(
+                "Error al evaluar JSON info_movie para %s: %s",
                 title_fallback,
+                str(e),
             )
             item[OutputMovieKeys.INFO_MOVIE.value] = output_info_movie
             yield item
             return
 
-        try:
-            info_movie = literal_eval(info_movie_raw)
-        except Exception as e:
-            self.logger.error(
-                "Error al evaluar JSON info_movie para %s: %s",
+        if info_movie is None:
+            self.logger.warning(
+                "%s no cuenta con información JSON en la página principal",
                 title_fallback,
-                str(e),
             )
             item[OutputMovieKeys.INFO_MOVIE.value] = output_info_movie
             yield item
@@ -116,19 +226,32 @@ class ImdbMoviesSpiderSpider(scrapy.Spider):
             yield item
             return
 
+        # Títulos de fuentes sin ld+json (búsquedas): los datos del listado salen de la página de detalle
+        detail_info_movie = self._get_info_movie_from_top_movies(info_movie)
+        for key in (OutputMovieKeys.TITLE, OutputMovieKeys.ALT_TITLE, OutputMovieKeys.RATING, OutputMovieKeys.DURATION):
+            if output_info_movie.get(key.value) in (None, ""):
+                output_info_movie[key.value] = detail_info_movie[key.value]
+
         output_info_movie[OutputMovieKeys.DATE_PUBLISHED.value] = info_movie.get(
             MovieJsonKeys.DATE_PUBLISHED.value, ""
         )
 
-        output_info_movie[OutputMovieKeys.ACTORS.value] = self._get_actors(
-            info_movie.get(MovieJsonKeys.ACTOR.value, [{}])
-        )
+        actors = info_movie.get(MovieJsonKeys.ACTOR.value, [{}])
+        output_info_movie[OutputMovieKeys.ACTORS.value] = self._get_actors(actors)
+        output_info_movie[OutputMovieKeys.ACTOR_IDS.value] = self._get_actor_ids(actors)
 
-        output_info_movie[OutputMovieKeys.METASCORE.value] = self._get_metascore(response.text)
+        output_info_movie[OutputMovieKeys.METASCORE.value] = self._get_metascore(body_text, info_movie)
 
         item[OutputMovieKeys.INFO_MOVIE.value] = output_info_movie
         yield item
 
+    def closed(self, reason):
+        if self.page_archive is not None:
+            self.page_archive.close()
+        if self.frontier is not None:
+            self.crawler.stats.set_value("frontier/size", len(self.frontier))
+            self.frontier.close()
+
     def _get_info_movie_from_top_movies(self, info_movie: dict[str, str | dict]) -> dict[str, str | list]:
         return {
             OutputMovieKeys.TITLE.value: info_movie.get(MovieJsonKeys.NAME.value, ''),
@@ -139,6 +262,7 @@ class ImdbMoviesSpiderSpider(scrapy.Spider):
             OutputMovieKeys.MOVIE_ID.value: self._get_movie_id(info_movie.get(MovieJsonKeys.URL.value, '')),
             OutputMovieKeys.DATE_PUBLISHED.value: '',
             OutputMovieKeys.ACTORS.value: [],
+            OutputMovieKeys.ACTOR_IDS.value: [],
             OutputMovieKeys.METASCORE.value: ''
         }
 
@@ -151,9 +275,9 @@ class ImdbMoviesSpiderSpider(scrapy.Spider):
     def _get_actors(self, actors: list[dict]) -> list[str]:
         return [actor.get("name", "") for actor in actors if actor.get("name")]
 
-    def _get_metascore(self, body_text: str) -> str:
-        return (
-            re.search(r"\"score\":([\d.]+)", body_text).group(1)
-            if re.search(r"\"score\":([\d.]+)", body_text)
-            else ""
-        )
+    def _get_actor_ids(self, actors: list[dict]) -> list[str]:
+        """Ids nm... alineados con `_get_actors` (cadena vacía si el actor no tiene url)."""
+        return [extract_person_id(actor.get("url")) for actor in actors if actor.get("name")]
+
+    def _get_metascore(self, body_text: str, info_movie: dict | None = None) -> str:
+        return extract_metascore(body_text, info_movie)
@@ -4,6 +4,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.db.database import init_db
 from app.routers import movies
+from app import metrics
 
 app = FastAPI(
     title="IMDb Scraper API",
@@ -20,6 +21,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.include_router(metrics.router)
+
 @app.get("/")
 async def root():
     """
@@ -0,0 +1,325 @@
+"""
+Métricas de la API en formato de texto de Prometheus.
+
+* `MetricsMiddleware` (ASGI) mide la latencia de cada petición por método,
+  ruta (la plantilla, p. ej. `/movies/actors/view`) y código de estado,
+  incluyendo el envío de respuestas en streaming.
+* `install_engine_metrics` engancha eventos de un motor SQLAlchemy: tiempo de
+  cada sentencia, atribuido a la ruta en curso y a la función de
+  `app/queries` marcada con `track_query`, conexiones abiertas por el pool y
+  uso del overflow (eventos `connect`/`checkout` del pool).
+* `timed_pool_class` crea la clase de pool (`poolclass` de `create_engine`)
+  que mide la espera para obtener una conexión.
+* `router` expone todo en `GET /metrics`.
+
+Es opcional: sólo con `METRICS_ENABLED=1` se instalan el middleware, los
+eventos y la ruta. Si tampoco está activo el registro de consultas lentas,
+`track_query` devuelve la función sin envolver, así que el costo es nulo.
+"""
+
+import os
+import time
+import inspect
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Tuple
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes")
+# El registro de consultas lentas (`app/slow_queries.py`) también usa `track_query`
+TRACK_QUERIES = METRICS_ENABLED or float(os.getenv("SLOW_QUERY_MS", "0")) > 0
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Petición (scope ASGI) y función de consulta en curso; las sesiones asíncronas
+# de SQLAlchemy propagan el contexto al greenlet que ejecuta las sentencias
+_request_scope: ContextVar[dict | None] = ContextVar("metrics_request_scope", default=None)
+_query_function: ContextVar[str] = ContextVar("metrics_query_function", default="-")
+
+
+class Histogram:
+    """Histograma acumulativo por combinación de etiquetas, seguro entre hilos."""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [conteo por bucket (+Inf al final), suma, total]
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for label_values, (counts, total, count) in sorted(series.items()):
+            labels = _format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+class Counter:
+    """Contador por combinación de etiquetas."""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            lines.append(f"{self.name}{{{_format_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _format_labels(names: Tuple[str, ...], values: tuple) -> str:
+    return ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP.", ("method", "route", "status")
+)
+QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Tiempo de ejecución de cada sentencia SQL.", ("engine", "route", "function")
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_seconds", "Tiempo para obtener una conexión del pool.", ("engine",)
+)
+POOL_CONNECTS = Counter(
+    "db_pool_connections_opened_total", "Conexiones DBAPI nuevas abiertas por el pool.", ("engine",)
+)
+POOL_OVERFLOW_CHECKOUTS = Counter(
+    "db_pool_overflow_checkouts_total", "Conexiones entregadas mientras el pool usaba overflow.", ("engine",)
+)
+
+_engines: Dict[str, Engine] = {}
+
+
+def _route_label(scope: dict | None) -> str:
+    if scope is None:
+        return "-"
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+def query_context() -> Tuple[str, str]:
+    """Ruta y función de `app/queries` de la sentencia en curso ("-" si no hay)."""
+    return _route_label(_request_scope.get()), _query_function.get()
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que registra `http_request_duration_seconds`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+        token = _request_scope.set(scope)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_scope.reset(token)
+            # El router de FastAPI deja la ruta resuelta en el scope
+            REQUEST_LATENCY.observe(time.perf_counter() - start, scope["method"], _route_label(scope), status)
+
+
+def track_query(function: Callable) -> Callable:
+    """
+    Atribuye las sentencias SQL que ejecuta `function` (síncrona, corrutina o
+    generador) a su nombre en `db_query_duration_seconds`.
+    """
+    if not TRACK_QUERIES:
+        return function
+    name = f"{function.__module__.rsplit('.', 1)[-1]}.{function.__name__}"
+
+    if inspect.isasyncgenfunction(function):
+        @wraps(function)
+        async def async_generator_wrapper(*args, **kwargs):
+            generator = function(*args, **kwargs)
+            try:
+                while True:
+                    token = _query_function.set(name)
+                    try:
+                        item = await generator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        _query_function.reset(token)
+                    yield item
+            finally:
+                await generator.aclose()
+        return async_generator_wrapper
+
+    if inspect.isgeneratorfunction(function):
+        @wraps(function)
+        def generator_wrapper(*args, **kwargs):
+            generator = function(*args, **kwargs)
+            try:
+                while True:
+                    token = _query_function.set(name)
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        _query_function.reset(token)
+                    yield item
+            finally:
+                generator.close()
+        return generator_wrapper
+
+    if inspect.iscoroutinefunction(function):
+        @wraps(function)
+        async def async_wrapper(*args, **kwargs):
+            token = _query_function.set(name)
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                _query_function.reset(token)
+        return async_wrapper
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        token = _query_function.set(name)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _query_function.reset(token)
+    return wrapper
+
+
+def timed_pool_class(pool_class: type, label: str) -> type:
+    """
+    Subclase de `pool_class` (`QueuePool` o `AsyncAdaptedQueuePool`) que
+    registra en `db_pool_checkout_seconds` la espera de cada checkout,
+    incluida la cola cuando el pool y el overflow están agotados. Se pasa como
+    `poolclass` al crear el motor; `dispose()` recrea el pool con la misma clase.
+    """
+    class TimedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                POOL_WAIT.observe(time.perf_counter() - start, label)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+def install_engine_metrics(engine: Engine, label: str) -> None:
+    """Registra tiempos de sentencias y del pool de `engine` (o `async_engine.sync_engine`)."""
+    _engines[label] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        QUERY_LATENCY.observe(elapsed, label, *query_context())
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("metrics_query_start"):
+            connection.info["metrics_query_start"].pop()
+
+    # Los eventos del pool se registran en el motor para sobrevivir a `dispose()`
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        POOL_CONNECTS.inc(label)
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        overflow = getattr(engine.pool, "overflow", None)
+        if overflow is not None and overflow() > 0:
+            POOL_OVERFLOW_CHECKOUTS.inc(label)
+
+
+def _pool_gauges() -> list:
+    lines = []
+    for name, method, documentation in (
+        ("db_pool_size", "size", "Tamaño configurado del pool."),
+        ("db_pool_checked_out", "checkedout", "Conexiones prestadas en este momento."),
+        ("db_pool_overflow", "overflow", "Conexiones de overflow abiertas (negativo: huecos libres del pool)."),
+    ):
+        values = [
+            (label, getattr(engine.pool, method)())
+            for label, engine in sorted(_engines.items())
+            if hasattr(engine.pool, method)
+        ]
+        if values:
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+            lines += [f'{name}{{engine="{label}"}} {value}' for label, value in values]
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in (REQUEST_LATENCY, QUERY_LATENCY, POOL_WAIT, POOL_CONNECTS, POOL_OVERFLOW_CHECKOUTS):
+        lines += metric.render()
+    lines += _pool_gauges()
+    return "\n".join(lines) + "\n"
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,21 +1,22 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class TopMovieBase(BaseModel):
     id: int
     title: str
-    year: int
-    rating: float
-    duration: int
-    metascore: float
-    decade: int
+    year: Optional[int] = None
+    rating: Optional[float] = None
+    duration: Optional[int] = None
+    metascore: Optional[float] = None
+    decade: Optional[int] = None  # None: películas sin año
     rn: int
 
     model_config = {"from_attributes": True}
 
 
 class StdRatingBase(BaseModel):
-    year: int
-    rating_stddev: float
+    year: Optional[int] = None  # None: películas sin año
+    rating_stddev: Optional[float] = None
 
 
 class RatingNormalizadoBase(BaseModel):
@@ -35,5 +36,28 @@ class ActorBase(BaseModel):
     duration: int
     metascore: int
     actor_name: str
+    person_id: int
+    imdb_person_id: Optional[str] = None
+    ordinal: int
+
+    model_config = {"from_attributes": True}
+
+
+class ActorSearchResult(BaseModel):
+    person_id: int
+    name: str
+    imdb_person_id: Optional[str] = None
+    movies: int
+    score: float
+
+
+class MovieBase(BaseModel):
+    id: int
+    imdb_id: Optional[str] = None
+    title: str
+    year: Optional[int] = None
+    rating: Optional[float] = None
+    duration: Optional[int] = None
+    metascore: Optional[float] = None
 
     model_config = {"from_attributes": True}
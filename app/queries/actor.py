@@ -1,38 +1,140 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from typing import Optional
+from sqlalchemy.sql.elements import TextClause
+import base64
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from app.metrics import track_query
 
 
+@track_query
 def create_view_actor_movie(db: Session):
-    query = text("""
-        -- Vista que une películas y actores
-        CREATE OR REPLACE VIEW movie_actor_view AS
+    """
+    Crea (o reemplaza) `movie_actor_view`. Se ejecuta una vez al arrancar la
+    API; SQLite no admite `CREATE OR REPLACE VIEW`, así que allí se recrea.
+    """
+    create = "CREATE OR REPLACE VIEW"
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("DROP VIEW IF EXISTS movie_actor_view"))
+        create = "CREATE VIEW"
+    query = text(f"""
+        -- Vista que une películas y su reparto (people + movie_people)
+        {create} movie_actor_view AS
         SELECT
-            m.id AS movie_id,
+            mp.movie_id,
             m.title,
             m.year,
             m.rating,
             m.duration,
             m.metascore,
-            a.name AS actor_name
+            p.name AS actor_name,
+            mp.person_id,
+            p.imdb_person_id,
+            mp.ordinal
         FROM movies m
-        JOIN actors a ON m.id = a.movie_id;
+        JOIN movie_people mp ON mp.movie_id = m.id
+        JOIN people p ON p.id = mp.person_id;
     """)
     db.execute(query)
     db.commit()
 
-def get_view_actor_movie(db: Session, actor_name: Optional[str] = None):
+def encode_cursor(movie_id: int, person_id: int) -> str:
+    """Cursor opaco con la última clave (movie_id, person_id) de una página."""
+    return base64.urlsafe_b64encode(f"{movie_id}:{person_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Inverso de `encode_cursor`; lanza ValueError si el cursor no es válido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        movie_id, person_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return int(movie_id), int(person_id)
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from e
+
+
+def _view_query(
+    actor_name: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[int, int]] = None,
+) -> Tuple[TextClause, dict]:
+    conditions = []
+    params = {}
     if actor_name:
-        query = text(
-            """
-            SELECT *
-            FROM movie_actor_view
-            WHERE actor_name = :actor_name
-            """
-        )
-        result = db.execute(query, {"actor_name": actor_name})
-    else:
-        query = text("SELECT * FROM movie_actor_view")
-        result = db.execute(query)
+        conditions.append("actor_name = :actor_name")
+        params["actor_name"] = actor_name
+    if after:
+        conditions.append("(movie_id, person_id) > (:after_movie_id, :after_person_id)")
+        params["after_movie_id"], params["after_person_id"] = after
 
+    sql = "SELECT * FROM movie_actor_view"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY movie_id, person_id"
+    if limit:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    return text(sql), params
+
+
+@track_query
+def get_view_actor_movie(
+    db: Session,
+    actor_name: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[int, int]] = None,
+):
+    """
+    Filas de `movie_actor_view` ordenadas por (movie_id, person_id), que es la
+    clave primaria de `movie_people`. Con `limit` y `after` (la última clave de
+    la página anterior) pagina por keyset: cada página es un recorrido de
+    índice desde la clave, sin OFFSET.
+    """
+    query, params = _view_query(actor_name, limit, after)
+    result = db.execute(query, params)
     return [dict(row._mapping) for row in result.fetchall()]
+
+
+@track_query
+def iter_view_actor_movie(
+    db: Session,
+    actor_name: Optional[str] = None,
+    after: Optional[Tuple[int, int]] = None,
+    chunk_size: int = 1000,
+) -> Iterator[List[dict]]:
+    """
+    Igual que `get_view_actor_movie` sin límite, pero en bloques de
+    `chunk_size` filas leídos de un cursor del servidor (`yield_per`): la
+    memoria no depende del tamaño del resultado.
+    """
+    query, params = _view_query(actor_name, after=after)
+    result = db.execute(query, params, execution_options={"yield_per": chunk_size})
+    for partition in result.mappings().partitions(chunk_size):
+        yield [dict(row) for row in partition]
+
+
+@track_query
+async def get_view_actor_movie_async(
+    db: AsyncSession,
+    actor_name: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[int, int]] = None,
+):
+    """Versión asíncrona de `get_view_actor_movie`."""
+    query, params = _view_query(actor_name, limit, after)
+    result = await db.execute(query, params)
+    return [dict(row._mapping) for row in result.fetchall()]
+
+
+@track_query
+async def iter_view_actor_movie_async(
+    db: AsyncSession,
+    actor_name: Optional[str] = None,
+    after: Optional[Tuple[int, int]] = None,
+    chunk_size: int = 1000,
+) -> AsyncIterator[List[dict]]:
+    """Versión asíncrona de `iter_view_actor_movie` (`AsyncSession.stream`)."""
+    query, params = _view_query(actor_name, after=after)
+    result = await db.stream(query, params, execution_options={"yield_per": chunk_size})
+    async for partition in result.mappings().partitions(chunk_size):
+        yield [dict(row) for row in partition]
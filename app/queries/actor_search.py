@@ -0,0 +1,242 @@
+"""
+Búsqueda de actores por nombre: prefijo o aproximada, sin distinguir mayúsculas.
+
+* `prefix`: nombres que empiezan por el texto buscado. El puntaje es la
+  fracción del nombre que cubre la búsqueda (1.0 si coincide completo).
+* `fuzzy`: similitud por trigramas como `pg_trgm` (`similarity`): trigramas
+  de cada palabra con dos espacios delante y uno detrás, y puntaje
+  |A ∩ B| / |A ∪ B|. Se devuelven los nombres con similitud >= `FUZZY_THRESHOLD`.
+
+Los resultados se ordenan por puntaje, nombre e id, y se paginan con
+`limit`/`offset`.
+
+En PostgreSQL la búsqueda se hace en SQL: el prefijo es un rango sobre el
+índice `lower(name) text_pattern_ops` y la búsqueda aproximada usa el índice
+GIN `gin_trgm_ops` (ambos los crea `create_people_search_indexes` al arrancar).
+En SQLite, para la búsqueda aproximada si `pg_trgm` no está disponible, o con
+`ACTOR_SEARCH_ENGINE=memory`, se usa `ActorNameIndex`: los nombres en minúsculas ordenados (prefijo por
+bisección) y un índice invertido de trigramas, en memoria y reconstruido
+cuando cambia `data_version`.
+"""
+
+import os
+import re
+import asyncio
+import logging
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import text
+from app.metrics import track_query
+from app.queries.cache import cached_query, get_data_version_async
+
+ACTOR_SEARCH_ENGINE = os.getenv("ACTOR_SEARCH_ENGINE", "auto").lower()
+FUZZY_THRESHOLD = 0.3  # valor por defecto de pg_trgm.similarity_threshold
+
+logger = logging.getLogger(__name__)
+
+# Se activa en `create_people_search_indexes` si la extensión pudo crearse
+pg_trgm_available = False
+
+PEOPLE_QUERY = text("""
+    SELECT p.id, p.name, p.imdb_person_id, COUNT(mp.movie_id) AS movies
+    FROM people p
+    LEFT JOIN movie_people mp ON mp.person_id = p.id
+    GROUP BY p.id, p.name, p.imdb_person_id
+""")
+
+PREFIX_SEARCH = text("""
+    SELECT
+        p.id AS person_id,
+        p.name,
+        p.imdb_person_id,
+        (SELECT COUNT(*) FROM movie_people mp WHERE mp.person_id = p.id) AS movies,
+        CAST(LENGTH(:q) AS FLOAT) / LENGTH(p.name) AS score
+    FROM people p
+    WHERE lower(p.name) ~>=~ :q
+      AND lower(p.name) ~<~ :q_next
+    ORDER BY score DESC, lower(p.name), p.id
+    LIMIT :limit OFFSET :offset
+""")
+
+FUZZY_SEARCH = text("""
+    SELECT
+        p.id AS person_id,
+        p.name,
+        p.imdb_person_id,
+        (SELECT COUNT(*) FROM movie_people mp WHERE mp.person_id = p.id) AS movies,
+        similarity(lower(p.name), :q) AS score
+    FROM people p
+    WHERE lower(p.name) % :q
+    ORDER BY score DESC, lower(p.name), p.id
+    LIMIT :limit OFFSET :offset
+""")
+
+PREFIX_INDEX = "CREATE INDEX IF NOT EXISTS idx_people_name_prefix ON people (lower(name) text_pattern_ops)"
+TRIGRAM_INDEX = "CREATE INDEX IF NOT EXISTS idx_people_name_trgm ON people USING gin (lower(name) gin_trgm_ops)"
+
+
+def trigrams(value: str) -> Set[str]:
+    """Trigramas de `value` como los calcula `pg_trgm` (palabras alfanuméricas, en minúsculas)."""
+    result = set()
+    for word in re.findall(r"[^\W_]+", value.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def _next_prefix(prefix: str) -> str:
+    """Menor cadena mayor que todas las que empiezan por `prefix` (límite superior del rango)."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _result(person_id: int, name: str, imdb_person_id: Optional[str], movies: int, score: float) -> dict:
+    return {
+        "person_id": person_id,
+        "name": name,
+        "imdb_person_id": imdb_person_id,
+        "movies": movies,
+        "score": round(float(score), 4),
+    }
+
+
+@dataclass
+class ActorNameIndex:
+    """Nombres de `people` ordenados en minúsculas e índice invertido de trigramas."""
+    version: Optional[int]
+    keys: List[str] = field(default_factory=list)
+    people: List[tuple] = field(default_factory=list)
+    postings: Dict[str, List[int]] = field(default_factory=dict)
+    sizes: List[int] = field(default_factory=list)
+
+    @classmethod
+    def from_rows(cls, version: Optional[int], rows: list) -> "ActorNameIndex":
+        people = sorted(
+            ((name.lower(), person_id, name, imdb_person_id, movies) for person_id, name, imdb_person_id, movies in rows),
+        )
+        postings = defaultdict(list)
+        sizes = []
+        for position, person in enumerate(people):
+            grams = trigrams(person[0])
+            sizes.append(len(grams))
+            for gram in grams:
+                postings[gram].append(position)
+        return cls(
+            version=version,
+            keys=[person[0] for person in people],
+            people=[person[1:] for person in people],
+            postings=dict(postings),
+            sizes=sizes,
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _page(self, ranked: list, limit: int, offset: int) -> List[dict]:
+        ranked.sort(key=lambda item: (-item[0], self.keys[item[1]], self.people[item[1]][0]))
+        return [_result(*self.people[position], score) for score, position in ranked[offset:offset + limit]]
+
+    def prefix(self, query: str, limit: int = 20, offset: int = 0) -> List[dict]:
+        query = query.lower()
+        start = bisect_left(self.keys, query)
+        end = bisect_left(self.keys, _next_prefix(query), lo=start)
+        ranked = [(len(query) / len(self.people[position][1]), position) for position in range(start, end)]
+        return self._page(ranked, limit, offset)
+
+    def fuzzy(self, query: str, limit: int = 20, offset: int = 0, threshold: float = FUZZY_THRESHOLD) -> List[dict]:
+        grams = trigrams(query)
+        if not grams:
+            return []
+        common = Counter(position for gram in grams for position in self.postings.get(gram, ()))
+        ranked = []
+        for position, shared in common.items():
+            score = shared / (len(grams) + self.sizes[position] - shared)
+            if score >= threshold:
+                ranked.append((score, position))
+        return self._page(ranked, limit, offset)
+
+
+class ActorSearchEngine:
+    """Mantiene el `ActorNameIndex` de la versión actual y lo reconstruye cuando cambia."""
+
+    def __init__(self):
+        self._index: Optional[ActorNameIndex] = None
+        self._lock = asyncio.Lock()
+
+    @track_query
+    async def index(self, db: AsyncSession) -> ActorNameIndex:
+        version = await get_data_version_async(db)
+        current = self._index
+        if current is not None and current.version == version:
+            return current
+
+        async with self._lock:
+            if self._index is None or self._index.version != version:
+                rows = (await db.execute(PEOPLE_QUERY)).fetchall()
+                self._index = await asyncio.to_thread(ActorNameIndex.from_rows, version, rows)
+        return self._index
+
+
+actor_search_engine = ActorSearchEngine()
+
+
+def uses_memory_index(dialect: str, mode: str) -> bool:
+    """True si la búsqueda `mode` se resuelve con `ActorNameIndex` en lugar de SQL."""
+    if ACTOR_SEARCH_ENGINE == "memory" or dialect != "postgresql":
+        return True
+    return mode == "fuzzy" and not pg_trgm_available
+
+
+@track_query
+def create_people_search_indexes(db: Session) -> None:
+    """
+    Crea los índices de búsqueda de nombres en PostgreSQL (no hace nada en
+    otros motores). Si no se puede crear la extensión `pg_trgm` (falta el
+    paquete o permisos), la búsqueda aproximada usa el índice en memoria.
+    """
+    global pg_trgm_available
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(text(PREFIX_INDEX))
+    db.commit()
+    try:
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        db.execute(text(TRIGRAM_INDEX))
+        db.commit()
+        pg_trgm_available = True
+    except SQLAlchemyError as e:
+        db.rollback()
+        pg_trgm_available = False
+        logger.warning("pg_trgm no disponible; la búsqueda aproximada de actores usará el índice en memoria: %s", e)
+
+
+@track_query
+@cached_query
+async def search_actors_async(
+    db: AsyncSession,
+    query: str,
+    mode: str = "prefix",
+    limit: int = 20,
+    offset: int = 0,
+) -> List[dict]:
+    """Actores cuyo nombre coincide con `query` según `mode` (`prefix` o `fuzzy`), ordenados por puntaje."""
+    query = query.strip().lower()
+    if not query:
+        return []
+
+    if uses_memory_index(db.get_bind().dialect.name, mode):
+        index = await actor_search_engine.index(db)
+        return index.fuzzy(query, limit, offset) if mode == "fuzzy" else index.prefix(query, limit, offset)
+
+    params = {"q": query, "limit": limit, "offset": offset}
+    if mode == "fuzzy":
+        statement = FUZZY_SEARCH
+    else:
+        statement = PREFIX_SEARCH
+        params["q_next"] = _next_prefix(query)
+    result = await db.execute(statement, params)
+    return [_result(*row) for row in result.fetchall()]
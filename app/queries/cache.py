@@ -0,0 +1,175 @@
+"""
+Caché de resultados para las consultas analíticas.
+
+Los datos sólo cambian cuando el pipeline del scraper carga películas, y cada
+carga incrementa `data_version.version` en su transacción. La clave de cada
+entrada incluye la consulta, sus parámetros y esa versión, así que una carga
+nueva invalida todo sin borrar nada: las entradas de versiones anteriores
+dejan de pedirse y salen por LRU. La memoria está acotada por
+`QUERY_CACHE_SIZE` entradas.
+
+`cached_query` sirve tanto para funciones síncronas (`Session`) como para
+corrutinas (`AsyncSession`).
+"""
+
+import os
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Hashable, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.metrics import track_query
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "128"))
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Diccionario acotado con expulsión LRU, seguro entre hilos."""
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+query_cache = LRUCache()
+
+DATA_VERSION_QUERY = text("SELECT version FROM data_version WHERE id = 1")
+ANALYTICS_VERSION_QUERY = text("SELECT version FROM analytics_state WHERE id = 1")
+
+
+@track_query
+def get_data_version(db: Session) -> Optional[int]:
+    """
+    Versión actual de los datos, leída una sola vez por sesión (es decir, por
+    petición). Devuelve 0 si aún no hubo cargas y None si la tabla no existe,
+    en cuyo caso no se usa la caché.
+    """
+    if "data_version" not in db.info:
+        try:
+            version = db.execute(DATA_VERSION_QUERY).scalar()
+            db.info["data_version"] = version or 0
+        except SQLAlchemyError:
+            db.rollback()
+            db.info["data_version"] = None
+    return db.info["data_version"]
+
+
+@track_query
+async def get_data_version_async(db: AsyncSession) -> Optional[int]:
+    """Versión asíncrona de `get_data_version`."""
+    if "data_version" not in db.info:
+        try:
+            version = (await db.execute(DATA_VERSION_QUERY)).scalar()
+            db.info["data_version"] = version or 0
+        except SQLAlchemyError:
+            await db.rollback()
+            db.info["data_version"] = None
+    return db.info["data_version"]
+
+
+@track_query
+def analytics_ready(db: Session) -> bool:
+    """
+    True si las tablas de analítica precalculadas reflejan la versión actual de
+    los datos (ver `models_patterns/analytics_refresh.py` del scraper).
+    """
+    if "analytics_ready" not in db.info:
+        version = get_data_version(db)
+        try:
+            analytics_version = db.execute(ANALYTICS_VERSION_QUERY).scalar()
+        except SQLAlchemyError:
+            db.rollback()
+            analytics_version = None
+        db.info["analytics_ready"] = version is not None and analytics_version == version
+    return db.info["analytics_ready"]
+
+
+@track_query
+async def analytics_ready_async(db: AsyncSession) -> bool:
+    """Versión asíncrona de `analytics_ready`."""
+    if "analytics_ready" not in db.info:
+        version = await get_data_version_async(db)
+        try:
+            analytics_version = (await db.execute(ANALYTICS_VERSION_QUERY)).scalar()
+        except SQLAlchemyError:
+            await db.rollback()
+            analytics_version = None
+        db.info["analytics_ready"] = version is not None and analytics_version == version
+    return db.info["analytics_ready"]
+
+
+def _cache_key(fn: Callable, args: tuple, kwargs: dict, version: int) -> Hashable:
+    return (fn.__module__, fn.__qualname__, args, tuple(sorted(kwargs.items())), version)
+
+
+def cached_query(fn: Callable) -> Callable:
+    """
+    Cachea el resultado de una función de consulta `fn(db, *args, **kwargs)`
+    por (función, parámetros, versión de datos). El resultado se comparte
+    entre peticiones y no debe modificarse.
+    """
+    if inspect.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def async_wrapper(db: AsyncSession, *args, **kwargs):
+            version = await get_data_version_async(db)
+            if version is None:
+                return await fn(db, *args, **kwargs)
+
+            key = _cache_key(fn, args, kwargs, version)
+            result = query_cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = await fn(db, *args, **kwargs)
+                query_cache.set(key, result)
+            return result
+
+        return async_wrapper
+
+    @wraps(fn)
+    def wrapper(db: Session, *args, **kwargs):
+        version = get_data_version(db)
+        if version is None:
+            return fn(db, *args, **kwargs)
+
+        key = _cache_key(fn, args, kwargs, version)
+        result = query_cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = fn(db, *args, **kwargs)
+            query_cache.set(key, result)
+        return result
+
+    return wrapper
@@ -1,60 +1,274 @@
+import math
+import json
+import base64
+from functools import lru_cache
+from typing import Optional, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
+from sqlalchemy.sql.elements import TextClause
+from app.db.sqlite import round_numeric
+from app.metrics import track_query
+from app.queries.cache import cached_query, analytics_ready, analytics_ready_async
+from app.queries.numpy_engine import ANALYTICS_ENGINE, numpy_engine
 
+TOP_MOVIES_BY_DECADE = text("""
+    -- Top 5 películas más largas por década
+    SELECT *
+    FROM (
+        SELECT 
+            id,
+            title,
+            year,
+            rating,
+            metascore,
+            duration,
+            (year / 10) * 10 AS decade,
+            ROW_NUMBER() OVER (
+                PARTITION BY (year / 10) * 10
+                ORDER BY duration DESC
+            ) AS rn
+        FROM movies
+        WHERE duration IS NOT NULL
+    ) AS ranked
+    WHERE rn <= 5
+    ORDER BY decade, duration DESC;
+""")
+
+def _numeric(expression: str, dialect: str) -> str:
+    """
+    Cast a numeric antes de `ROUND`, para redondear decimales exactos. En
+    SQLite no hay cast: `ROUND` es la función registrada en `app/db/sqlite.py`,
+    que ya redondea como PostgreSQL.
+    """
+    if dialect == "postgresql":
+        return f"({expression})::NUMERIC"
+    if dialect == "sqlite":
+        return expression
+    return f"CAST({expression} AS DECIMAL(12, 6))"
+
+
+@lru_cache(maxsize=None)
+def rating_stddev_by_year_query(dialect: str = "postgresql"):
+    return text(f"""
+    -- Desviación estándar del rating por año
+    SELECT
+        year,
+        COALESCE(ROUND({_numeric("STDDEV_SAMP(rating)", dialect)}, 2), 0.00) AS rating_stddev
+    FROM movies
+    WHERE rating IS NOT NULL
+    GROUP BY year
+    ORDER BY year;
+""")
+
+
+@lru_cache(maxsize=None)
+def rating_differences_query(dialect: str = "postgresql"):
+    return text(f"""
+    -- Diferencias significativas entre metascore e IMDb (>20%)
+    SELECT
+        id,
+        title,
+        rating,
+        metascore,
+        ROUND({_numeric("ABS(rating - metascore / 10.0)", dialect)}, 2) AS abs_diff,
+        ROUND({_numeric("ABS(rating - metascore / 10.0) / rating", dialect)}, 2) AS relative_diff
+    FROM movies
+    WHERE rating IS NOT NULL
+      AND metascore IS NOT NULL
+      AND ABS(rating - metascore / 10.0) / rating > 0.20;
+""")
+
+
+RATING_STDDEV_BY_YEAR = rating_stddev_by_year_query()
+RATING_DIFFERENCES = rating_differences_query()
+
+# Lecturas de las tablas precalculadas tras cada carga; sólo se usan cuando
+# reflejan la versión actual de los datos (`analytics_ready`)
+TOP_MOVIES_BY_DECADE_SUMMARY = text("""
+    SELECT movie_id AS id, title, year, rating, metascore, duration, decade, rn
+    FROM analytics_top_by_decade
+    ORDER BY decade, duration DESC;
+""")
+
+RATING_BY_YEAR_SUMMARY = text("""
+    SELECT year, ratings, rating_sum, rating_sum_sq
+    FROM analytics_rating_by_year
+    ORDER BY year;
+""")
+
+RATING_DIFFERENCES_SUMMARY = text("""
+    SELECT movie_id AS id, title, rating, metascore, abs_diff, relative_diff
+    FROM analytics_rating_diff;
+""")
+
+
+def _dialect(db) -> str:
+    return db.get_bind().dialect.name
+
+
+def _rows(result):
+    return [dict(row._mapping) for row in result.fetchall()]
+
+
+def _stddev_rows(result):
+    """Desviación estándar muestral por año a partir de n, suma y suma de cuadrados."""
+    rows = []
+    for year, n, total, total_sq in result.fetchall():
+        variance = (total_sq - total * total / n) / (n - 1) if n > 1 else 0.0
+        # Mismo redondeo que ROUND(numeric, 2) de la consulta directa (empates hacia arriba)
+        rows.append({"year": year, "rating_stddev": round_numeric(math.sqrt(max(variance, 0.0)), 2)})
+    return rows
+
+
+@track_query
+@cached_query
 def get_top_movies_by_decade(db: Session):
-    query = text("""
-        -- Top 5 películas más largas por década
-        SELECT *
-        FROM (
-            SELECT 
-                id,
-                title,
-                year,
-                rating,
-                metascore,
-                duration,
-                (year / 10) * 10 AS decade,
-                ROW_NUMBER() OVER (
-                    PARTITION BY (year / 10) * 10
-                    ORDER BY duration DESC
-                ) AS rn
-            FROM movies
-            WHERE duration IS NOT NULL
-        ) AS ranked
-        WHERE rn <= 5
-        ORDER BY decade, duration DESC;
-    """)
-    return [dict(row._mapping) for row in db.execute(query).fetchall()]
+    query = TOP_MOVIES_BY_DECADE_SUMMARY if analytics_ready(db) else TOP_MOVIES_BY_DECADE
+    return _rows(db.execute(query))
 
 
+@track_query
+@cached_query
+async def get_top_movies_by_decade_async(db: AsyncSession):
+    if ANALYTICS_ENGINE == "numpy":
+        return (await numpy_engine.arrays(db)).top_by_decade()
+    query = TOP_MOVIES_BY_DECADE_SUMMARY if await analytics_ready_async(db) else TOP_MOVIES_BY_DECADE
+    return _rows(await db.execute(query))
+
+
+@track_query
+@cached_query
 def get_standard_deviation_rating(db: Session):
-    query = text("""
-        -- Desviación estándar del rating por año
-        SELECT
-            year,
-            COALESCE(ROUND(STDDEV_SAMP(rating)::NUMERIC, 2), 0.00) AS rating_stddev
-        FROM movies
-        WHERE rating IS NOT NULL
-        GROUP BY year
-        ORDER BY year;
-    """)
-    return [dict(row._mapping) for row in db.execute(query).fetchall()]
+    if analytics_ready(db):
+        return _stddev_rows(db.execute(RATING_BY_YEAR_SUMMARY))
+    return _rows(db.execute(rating_stddev_by_year_query(_dialect(db))))
+
+
+@track_query
+@cached_query
+async def get_standard_deviation_rating_async(db: AsyncSession):
+    if ANALYTICS_ENGINE == "numpy":
+        return (await numpy_engine.arrays(db)).rating_stddev_by_year()
+    if await analytics_ready_async(db):
+        return _stddev_rows(await db.execute(RATING_BY_YEAR_SUMMARY))
+    return _rows(await db.execute(rating_stddev_by_year_query(_dialect(db))))
 
 
+@track_query
+@cached_query
 def get_metascore_and_imdb_rating_normalizado(db: Session):
-    query = text("""
-        -- Diferencias significativas entre metascore e IMDb (>20%)
-        SELECT
-            id,
-            title,
-            rating,
-            metascore,
-            ROUND(ABS(rating - metascore / 10.0)::numeric, 2) AS abs_diff,
-            ROUND((ABS(rating - metascore / 10.0) / rating)::numeric, 2) AS relative_diff
-        FROM movies
-        WHERE rating IS NOT NULL
-          AND metascore IS NOT NULL
-          AND ABS(rating - metascore / 10.0) / rating > 0.20;
-    """)
-    return [dict(row._mapping) for row in db.execute(query).fetchall()]
+    if analytics_ready(db):
+        return _rows(db.execute(RATING_DIFFERENCES_SUMMARY))
+    return _rows(db.execute(rating_differences_query(_dialect(db))))
+
+
+@track_query
+@cached_query
+async def get_metascore_and_imdb_rating_normalizado_async(db: AsyncSession):
+    if ANALYTICS_ENGINE == "numpy":
+        return (await numpy_engine.arrays(db)).rating_differences()
+    if await analytics_ready_async(db):
+        return _rows(await db.execute(RATING_DIFFERENCES_SUMMARY))
+    return _rows(await db.execute(rating_differences_query(_dialect(db))))
+
+
+# Listado /movies: columnas de orden (con su tipo, para el cursor) y filtros por
+# rango. Cada orden tiene su índice (columna, id) en `movies`.
+MOVIE_SORTS = {"id": int, "year": int, "rating": float, "metascore": float, "duration": int}
+MOVIE_FILTERS = {
+    "year_min": ("year", ">="),
+    "year_max": ("year", "<="),
+    "rating_min": ("rating", ">="),
+    "rating_max": ("rating", "<="),
+    "metascore_min": ("metascore", ">="),
+    "metascore_max": ("metascore", "<="),
+    "duration_min": ("duration", ">="),
+    "duration_max": ("duration", "<="),
+}
+
+
+def encode_movie_cursor(sort: str, value, movie_id: int) -> str:
+    """
+    Cursor opaco con el orden `sort` (con su dirección) y la última clave
+    (valor de la columna de orden, id) de una página.
+    """
+    return base64.urlsafe_b64encode(json.dumps([sort, value, movie_id]).encode()).decode().rstrip("=")
+
+
+def decode_movie_cursor(cursor: str, sort: str = "id") -> Tuple:
+    """
+    Inverso de `encode_movie_cursor` para el orden `sort`. Lanza ValueError si
+    no es válido o si se generó con otro orden: su clave no sirve de punto de
+    partida para este recorrido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, movie_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        key = MOVIE_SORTS[sort.lstrip("-")](value), int(movie_id)
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from e
+    if cursor_sort != sort:
+        raise ValueError(f"El cursor es del orden {cursor_sort!r}, no de {sort!r}")
+    return key
+
+
+def _movie_list_query(
+    filters: Optional[dict] = None,
+    sort: str = "id",
+    limit: Optional[int] = None,
+    after: Optional[Tuple] = None,
+) -> Tuple[TextClause, dict]:
+    descending = sort.startswith("-")
+    column = sort.lstrip("-")
+    if column not in MOVIE_SORTS:
+        raise ValueError(f"Orden no soportado: {sort!r}")
+
+    conditions = []
+    params = {}
+    for name, value in (filters or {}).items():
+        if value is None:
+            continue
+        filter_column, operator = MOVIE_FILTERS[name]
+        conditions.append(f"{filter_column} {operator} :{name}")
+        params[name] = value
+    if column != "id":
+        # El orden keyset necesita un valor: las películas sin dato quedan fuera
+        conditions.append(f"{column} IS NOT NULL")
+    if after:
+        comparison = "<" if descending else ">"
+        if column == "id":
+            conditions.append(f"id {comparison} :after_id")
+        else:
+            conditions.append(f"({column}, id) {comparison} (:after_value, :after_id)")
+            params["after_value"] = after[0]
+        params["after_id"] = after[1]
+
+    direction = "DESC" if descending else "ASC"
+    sql = "SELECT id, imdb_id, title, year, rating, duration, metascore FROM movies"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY {column} {direction}" if column == "id" else f" ORDER BY {column} {direction}, id {direction}"
+    if limit:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    return text(sql), params
+
 
+@track_query
+async def get_movies_async(
+    db: AsyncSession,
+    filters: Optional[dict] = None,
+    sort: str = "id",
+    limit: Optional[int] = None,
+    after: Optional[Tuple] = None,
+):
+    """
+    Películas filtradas por rangos (`MOVIE_FILTERS`) y ordenadas por `sort`
+    (`-` delante para orden descendente), paginadas por keyset sobre
+    (columna de orden, id): cada página es un recorrido del índice de esa
+    columna desde `after`, la última clave de la página anterior.
+    """
+    query, params = _movie_list_query(filters, sort, limit, after)
+    result = await db.execute(query, params)
+    return [dict(row._mapping) for row in result.fetchall()]
@@ -0,0 +1,173 @@
+"""
+Motor de analítica en memoria con NumPy.
+
+Con `ANALYTICS_ENGINE=numpy` la API carga las columnas de `movies` que usan
+las consultas de estadísticas (id, título, año, rating, duración y metascore)
+en arreglos NumPy al arrancar y cada vez que cambia `data_version`. El top por
+década, la desviación estándar por año y las diferencias IMDb/Metascore se
+calculan entonces de forma vectorizada, sin ir a la base de datos, con las
+mismas filas que devuelven las consultas SQL de `app/queries/movies.py`.
+
+Los nulos se representan como NaN: año, duración y metascore son enteros
+pequeños y se guardan en float32 (exactos); el rating se mantiene en float64
+para devolver el mismo valor que la base de datos. Como en SQL, las películas
+sin año forman su propio grupo (año y década None), que se ordena al final en
+PostgreSQL y al principio en SQLite y MySQL. Con `ANALYTICS_ENGINE=sql` (por
+defecto) este módulo no carga nada.
+"""
+
+import os
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from app.metrics import track_query
+from app.queries.cache import get_data_version_async
+
+ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "sql").lower()
+
+MOVIE_COLUMNS_QUERY = text("SELECT id, title, year, rating, duration, metascore FROM movies ORDER BY id")
+
+# Clave entera del grupo de los años (o décadas) nulos al agrupar y ordenar
+NULL_LAST = np.iinfo(np.int64).max
+NULL_FIRST = np.iinfo(np.int64).min
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """
+    Como `ROUND(x::numeric, 2)` de PostgreSQL: el cast a numeric descarta el
+    error de representación del double (4.1 / 4 = 1.02499... pasa a 1.025) y
+    los empates se redondean alejándose de cero.
+    """
+    scaled = np.round(values * 1e10)  # entero exacto: 1.0249999... -> 10250000000
+    return np.floor(scaled / 1e8 + 0.5) / 100
+
+
+def _optional_int(value: float) -> Optional[int]:
+    return None if np.isnan(value) else int(value)
+
+
+def _nullable(values: np.ndarray) -> list:
+    """Valores Python con None en lugar de NaN, como los NULL de SQL."""
+    return [None if value != value else value for value in values.tolist()]
+
+
+@dataclass(frozen=True)
+class MovieArrays:
+    """Columnas de `movies` para una versión de los datos."""
+    version: Optional[int]
+    id: np.ndarray
+    title: np.ndarray
+    year: np.ndarray
+    rating: np.ndarray
+    duration: np.ndarray
+    metascore: np.ndarray
+    nulls_first: bool = False  # orden de NULL en ORDER BY: PostgreSQL al final, SQLite/MySQL al principio
+
+    @classmethod
+    def from_rows(cls, version: Optional[int], rows: list, nulls_first: bool = False) -> "MovieArrays":
+        columns = list(zip(*rows)) or [()] * 6
+        return cls(
+            version=version,
+            nulls_first=nulls_first,
+            id=np.array(columns[0], dtype=np.int64),
+            title=np.array(columns[1], dtype=object),
+            year=np.array(columns[2], dtype=np.float32),
+            rating=np.array(columns[3], dtype=np.float64),
+            duration=np.array(columns[4], dtype=np.float32),
+            metascore=np.array(columns[5], dtype=np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def _group_key(self, values: np.ndarray) -> np.ndarray:
+        """Enteros para agrupar y ordenar `values`, con los NaN como un grupo más en el extremo de SQL."""
+        key = np.full(len(values), NULL_FIRST if self.nulls_first else NULL_LAST, dtype=np.int64)
+        known = ~np.isnan(values)
+        key[known] = values[known].astype(np.int64)
+        return key
+
+    def top_by_decade(self, top_n: int = 5) -> List[dict]:
+        """Top `top_n` de duración por década, ordenado por década y duración."""
+        index = np.flatnonzero(~np.isnan(self.duration))
+        decade = self._group_key(self.year[index] - self.year[index] % 10)
+        order = np.lexsort((-self.duration[index], decade))
+        index, decade = index[order], decade[order]
+
+        group_start = np.r_[0, np.flatnonzero(np.diff(decade)) + 1]
+        rn = np.arange(len(index)) - np.repeat(group_start, np.diff(np.r_[group_start, len(index)])) + 1
+        keep = rn <= top_n
+        index, decade, rn = index[keep], decade[keep], rn[keep]
+
+        return [
+            {
+                "id": movie_id, "title": title, "year": _optional_int(year), "rating": rating,
+                "metascore": metascore, "duration": int(duration),
+                "decade": None if movie_decade in (NULL_FIRST, NULL_LAST) else movie_decade, "rn": rank,
+            }
+            for movie_id, title, year, rating, metascore, duration, movie_decade, rank in zip(
+                self.id[index].tolist(), self.title[index].tolist(), self.year[index].tolist(),
+                _nullable(self.rating[index]), _nullable(self.metascore[index]), self.duration[index].tolist(),
+                decade.tolist(), rn.tolist(),
+            )
+        ]
+
+    def rating_stddev_by_year(self) -> List[dict]:
+        """Desviación estándar muestral del rating por año (0 si el año tiene una sola película)."""
+        mask = ~np.isnan(self.rating)
+        years, inverse, counts = np.unique(self._group_key(self.year[mask]), return_inverse=True, return_counts=True)
+        ratings = self.rating[mask]
+        means = np.bincount(inverse, weights=ratings, minlength=len(years)) / counts
+        squares = np.bincount(inverse, weights=(ratings - means[inverse]) ** 2, minlength=len(years))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stddev = np.where(counts > 1, np.sqrt(squares / (counts - 1)), 0.0)
+        return [
+            {"year": None if year in (NULL_FIRST, NULL_LAST) else year, "rating_stddev": value}
+            for year, value in zip(years.tolist(), _round2(stddev).tolist())
+        ]
+
+    def rating_differences(self, threshold: float = 0.20) -> List[dict]:
+        """Películas cuya diferencia relativa entre rating y metascore/10 supera `threshold`."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            abs_diff = np.abs(self.rating - self.metascore.astype(np.float64) / 10.0)
+            relative = abs_diff / self.rating
+            index = np.flatnonzero(relative > threshold)
+        return [
+            {
+                "id": movie_id, "title": title, "rating": rating, "metascore": metascore,
+                "abs_diff": diff, "relative_diff": rel,
+            }
+            for movie_id, title, rating, metascore, diff, rel in zip(
+                self.id[index].tolist(), self.title[index].tolist(), self.rating[index].tolist(),
+                self.metascore[index].tolist(), _round2(abs_diff[index]).tolist(), _round2(relative[index]).tolist(),
+            )
+        ]
+
+
+class NumpyAnalyticsEngine:
+    """Mantiene los `MovieArrays` de la versión actual y los recarga cuando cambia."""
+
+    def __init__(self):
+        self._arrays: Optional[MovieArrays] = None
+        self._lock = asyncio.Lock()
+
+    @track_query
+    async def arrays(self, db: AsyncSession) -> MovieArrays:
+        version = await get_data_version_async(db)
+        current = self._arrays
+        if current is not None and current.version == version:
+            return current
+
+        async with self._lock:
+            if self._arrays is None or self._arrays.version != version:
+                rows = (await db.execute(MOVIE_COLUMNS_QUERY)).fetchall()
+                nulls_first = db.get_bind().dialect.name != "postgresql"
+                # La conversión de filas a arreglos es CPU; no bloquea el event loop
+                self._arrays = await asyncio.to_thread(MovieArrays.from_rows, version, rows, nulls_first)
+        return self._arrays
+
+
+numpy_engine = NumpyAnalyticsEngine()
@@ -1,59 +1,197 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from sqlalchemy.exc import SQLAlchemyError
-from app.db.database import get_db
-from app.models.schemas import TopMovieBase, StdRatingBase, RatingNormalizadoBase, ActorBase
-from app.queries.movies import get_top_movies_by_decade, get_standard_deviation_rating,get_metascore_and_imdb_rating_normalizado
-from app.queries.actor import create_view_actor_movie, get_view_actor_movie
+from app.db.database import get_async_db
+from app.models.schemas import TopMovieBase, StdRatingBase, RatingNormalizadoBase, ActorBase, ActorSearchResult, MovieBase
+from app.queries.movies import (
+    get_top_movies_by_decade_async,
+    get_standard_deviation_rating_async,
+    get_metascore_and_imdb_rating_normalizado_async,
+    get_movies_async,
+    encode_movie_cursor,
+    decode_movie_cursor,
+)
+from app.queries.actor import get_view_actor_movie_async, iter_view_actor_movie_async, encode_cursor, decode_cursor
+from app.queries.actor_search import search_actors_async
+from app.queries.cache import get_data_version_async
+from app.routers.streaming import STREAM_CHUNK_SIZE, stream_format, stream_rows
 router = APIRouter(
     prefix="/movies",
     tags=["Movies"]
 )
 
+
+async def _not_modified(request: Request, response: Response, db: AsyncSession, name: str) -> Optional[Response]:
+    """
+    Agrega el ETag (derivado de la versión de los datos) a la respuesta y
+    devuelve un 304 si el cliente ya tiene esa versión (If-None-Match).
+    """
+    version = await get_data_version_async(db)
+    if version is None:
+        return None
+
+    etag = f'W/"{name}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+@router.get("", response_model=List[MovieBase])
+async def list_movies(
+    request: Request,
+    response: Response,
+    year_min: Optional[int] = Query(None, description="Año mínimo"),
+    year_max: Optional[int] = Query(None, description="Año máximo"),
+    rating_min: Optional[float] = Query(None, ge=0, le=10, description="Rating IMDb mínimo"),
+    rating_max: Optional[float] = Query(None, ge=0, le=10, description="Rating IMDb máximo"),
+    metascore_min: Optional[float] = Query(None, ge=0, le=100, description="Metascore mínimo"),
+    metascore_max: Optional[float] = Query(None, ge=0, le=100, description="Metascore máximo"),
+    duration_min: Optional[int] = Query(None, ge=0, description="Duración mínima (minutos)"),
+    duration_max: Optional[int] = Query(None, ge=0, description="Duración máxima (minutos)"),
+    sort: str = Query(
+        "id", pattern="^-?(id|year|rating|metascore|duration)$", description="Columna de orden; con `-` es descendente"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (X-Next-Cursor)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Lista películas filtradas por rangos de año, rating, metascore y duración,
+    ordenadas por `sort` y paginadas por cursor. Al ordenar por una columna se
+    excluyen las películas sin ese dato. Si hay más resultados, el cursor de
+    la página siguiente viene en `X-Next-Cursor` y en el encabezado `Link`;
+    un cursor de otro `sort` devuelve 400.
+    """
+    try:
+        after = decode_movie_cursor(cursor, sort) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filters = {
+        "year_min": year_min, "year_max": year_max,
+        "rating_min": rating_min, "rating_max": rating_max,
+        "metascore_min": metascore_min, "metascore_max": metascore_max,
+        "duration_min": duration_min, "duration_max": duration_max,
+    }
+    try:
+        rows = await get_movies_async(db, filters, sort, limit=limit + 1, after=after)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener películas: {str(e)}")
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        column = sort.lstrip("-")
+        next_cursor = encode_movie_cursor(sort, rows[-1][column], rows[-1]["id"])
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return rows
+
+
 @router.get("/top-by-decade", response_model=List[TopMovieBase])
-def fetch_top_movies_by_decade(db: Session = Depends(get_db)):
+async def fetch_top_movies_by_decade(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Devuelve las 5 películas con mayor promedio de duración por década.
     """
     try:
-        return get_top_movies_by_decade(db)
+        return await _not_modified(request, response, db, "top-by-decade") or await get_top_movies_by_decade_async(db)
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de la db: {str(e)}")
 
 
 @router.get("/ratings/std-dev", response_model=List[StdRatingBase])
-def fetch_ratings_std_deviation(db: Session = Depends(get_db)):
+async def fetch_ratings_std_deviation(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Calcula la desviación estándar de las calificaciones por año.
     """
     try:
-        return get_standard_deviation_rating(db)
+        return await _not_modified(request, response, db, "ratings-std-dev") or await get_standard_deviation_rating_async(db)
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de la db: {str(e)}")
 
 @router.get("/ratings/diff", response_model=List[RatingNormalizadoBase])
-def fetch_rating_differences(db: Session = Depends(get_db)):
+async def fetch_rating_differences(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Detecta películas con más de un 20% de diferencia entre IMDB y Metascore.
     """
     try:
-        return get_metascore_and_imdb_rating_normalizado(db)
+        return await _not_modified(request, response, db, "ratings-diff") or await get_metascore_and_imdb_rating_normalizado_async(db)
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de la db: {str(e)}")
 
+@router.get("/actors/search", response_model=List[ActorSearchResult])
+async def search_actors(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100, description="Nombre (o inicio del nombre) del actor"),
+    mode: str = Query("prefix", pattern="^(prefix|fuzzy)$", description="prefix o fuzzy (trigramas)"),
+    limit: int = Query(20, ge=1, le=100, description="Tamaño de página"),
+    offset: int = Query(0, ge=0, le=10000, description="Resultados a saltar"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Busca actores por inicio del nombre (`prefix`) o por similitud
+    (`fuzzy`), sin distinguir mayúsculas. Los resultados vienen ordenados por
+    puntaje; si hay más, la página siguiente está en el encabezado `Link`.
+    """
+    try:
+        not_modified = await _not_modified(request, response, db, "actors-search")
+        if not_modified:
+            return not_modified
+        rows = await search_actors_async(db, q, mode, limit + 1, offset)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error al buscar actores: {str(e)}")
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["Link"] = f'<{request.url.include_query_params(offset=offset + limit)}>; rel="next"'
+    return rows
+
+
 @router.get("/actors/view", response_model=List[ActorBase])
-def fetch_movies_actors_view(
+async def fetch_movies_actors_view(
+    request: Request,
+    response: Response,
     actor_name: Optional[str] = Query(None, description="Nombre del actor principal"),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (X-Next-Cursor)"),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson|csv)$", description="ndjson o csv para streaming"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Devuelve una vista que relaciona películas y actores.
-    Se puede filtrar por el nombre del actor.
+    Devuelve una vista que relaciona películas y actores, paginada por cursor.
+    Se puede filtrar por el nombre del actor. Si hay más resultados, el cursor
+    de la página siguiente viene en `X-Next-Cursor` y en el encabezado `Link`.
+
+    Con `format=ndjson|csv` (o `Accept: application/x-ndjson|text/csv`) se
+    envían en streaming todas las filas desde `cursor`, sin `limit`.
     """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    fmt = stream_format(request, format)
+    if fmt:
+        try:
+            return await stream_rows(
+                fmt,
+                lambda stream_db: iter_view_actor_movie_async(stream_db, actor_name, after, STREAM_CHUNK_SIZE),
+                "movie_actor_view",
+            )
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Error al obtener datos de la vista: {str(e)}")
 
     try:
-        create_view_actor_movie(db)
-        return get_view_actor_movie(db, actor_name)
+        rows = await get_view_actor_movie_async(db, actor_name, limit=limit + 1, after=after)
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de la vista: {str(e)}")
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["movie_id"], rows[-1]["person_id"])
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return rows
@@ -0,0 +1,113 @@
+"""
+Respuestas en streaming (NDJSON o CSV) para resultados grandes.
+
+Las rutas normales materializan todas las filas y FastAPI las vuelve a validar
+con el `response_model` antes de serializarlas. En modo streaming las filas se
+leen de un cursor del servidor en bloques de `STREAM_CHUNK_SIZE` y cada bloque
+se serializa y se envía en cuanto llega, así que la memoria es constante y el
+primer byte sale con el primer bloque.
+
+El modo se elige con el parámetro `format` (`ndjson` o `csv`) o, si no viene,
+con el encabezado `Accept` (`application/x-ndjson` o `text/csv`).
+"""
+
+import os
+import csv
+import io
+import json
+import logging
+from typing import AsyncIterable, AsyncIterator, Callable, List, Optional
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import AsyncSessionLocal
+
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+ACCEPT_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "text/csv": "csv",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def stream_format(request: Request, format: Optional[str] = None) -> Optional[str]:
+    """Formato de streaming pedido, o None para la respuesta JSON habitual."""
+    if format:
+        return format if format in MEDIA_TYPES else None
+    for media_range in request.headers.get("accept", "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in ACCEPT_FORMATS:
+            return ACCEPT_FORMATS[media_type]
+    return None
+
+
+async def encode_ndjson(chunks: AsyncIterable[List[dict]]) -> AsyncIterator[str]:
+    async for rows in chunks:
+        if rows:
+            yield "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows)
+
+
+async def encode_csv(chunks: AsyncIterable[List[dict]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = None
+    async for rows in chunks:
+        if not rows:
+            continue
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv}
+
+
+async def stream_rows(
+    fmt: str,
+    produce: Callable[[AsyncSession], AsyncIterator[List[dict]]],
+    filename: str,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+) -> StreamingResponse:
+    """
+    Devuelve una `StreamingResponse` con los bloques de `produce(db)`.
+
+    La sesión es propia de la respuesta (la de `get_async_db` se cierra al
+    terminar la ruta, antes de enviar el cuerpo) y se cierra cuando termina el
+    envío. El primer bloque se lee aquí, así que los errores de la consulta
+    todavía pueden convertirse en un 500 antes de empezar a enviar.
+    """
+    db = session_factory()
+    try:
+        chunks = produce(db)
+        first = await anext(chunks, [])
+    except Exception:
+        await db.close()
+        raise
+
+    async def with_first() -> AsyncIterator[List[dict]]:
+        yield first
+        async for rows in chunks:
+            yield rows
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            async for data in ENCODERS[fmt](with_first()):
+                yield data
+        except Exception as e:
+            logger.error("Error durante el streaming de %s: %s", filename, str(e))
+            raise
+        finally:
+            await db.close()
+
+    headers = {"Content-Disposition": f'inline; filename="{filename}.{fmt}"'}
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[fmt], headers=headers)
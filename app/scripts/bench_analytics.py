@@ -0,0 +1,87 @@
+"""
+Benchmark de las consultas de estadísticas: SQL directo sobre `movies`, tablas
+de analítica precalculadas (si están al día) y motor NumPy en memoria.
+
+Cada consulta se ejecuta `--repeat` veces con una sesión nueva por llamada
+(como una petición de la API) y sin la caché de consultas; se informan p50 y
+p99. Sólo lee de la base configurada (variables de `app/db/database.py`).
+
+Uso (desde la raíz del repo, con PYTHONPATH=$(pwd)):
+    python app/scripts/bench_analytics.py
+    python app/scripts/bench_analytics.py --repeat 500
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Awaitable, Callable, List
+from app.db.database import AsyncSessionLocal, async_engine
+from app.queries import movies
+from app.queries.cache import query_cache, analytics_ready_async
+from app.queries.numpy_engine import NumpyAnalyticsEngine
+
+DIALECT = async_engine.dialect.name
+QUERIES = {
+    "top-by-decade": (movies.TOP_MOVIES_BY_DECADE, "top_by_decade"),
+    "ratings/std-dev": (movies.rating_stddev_by_year_query(DIALECT), "rating_stddev_by_year"),
+    "ratings/diff": (movies.rating_differences_query(DIALECT), "rating_differences"),
+}
+SQL_FUNCTIONS = {
+    "top-by-decade": movies.get_top_movies_by_decade_async,
+    "ratings/std-dev": movies.get_standard_deviation_rating_async,
+    "ratings/diff": movies.get_metascore_and_imdb_rating_normalizado_async,
+}
+
+
+async def measure(call: Callable[..., Awaitable], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await call(db)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, mode: str, timings: List[float], rows: int) -> None:
+    quantiles = statistics.quantiles(timings, n=100)
+    print(f"{name:<16} {mode:<9} {rows:>7} filas  p50 {quantiles[49]:>9.3f} ms  p99 {quantiles[98]:>9.3f} ms")
+
+
+async def main_async(repeat: int) -> None:
+    query_cache.maxsize = 0
+    engine = NumpyAnalyticsEngine()
+
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        arrays = await engine.arrays(db)
+        print(f"Carga del motor NumPy: {len(arrays)} películas en {time.perf_counter() - start:.2f}s")
+        summaries = await analytics_ready_async(db)
+
+    for name, (live_query, method) in QUERIES.items():
+        async def live(db, query=live_query):
+            return [dict(row._mapping) for row in (await db.execute(query)).fetchall()]
+
+        async def in_memory(db, method=method):
+            return getattr(await engine.arrays(db), method)()
+
+        async with AsyncSessionLocal() as db:
+            rows = len(await in_memory(db))
+
+        report(name, "sql", await measure(live, repeat), rows)
+        if summaries:
+            report(name, "resumen", await measure(SQL_FUNCTIONS[name], repeat), rows)
+        report(name, "numpy", await measure(in_memory, repeat), rows)
+
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de analítica: SQL vs NumPy en memoria")
+    parser.add_argument("--repeat", type=int, default=200)
+    asyncio.run(main_async(parser.parse_args().repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Prueba de carga de la API: rutas asíncronas (`AsyncSession`) vs las mismas
+rutas síncronas (`def` + `SessionLocal`, que FastAPI ejecuta en su threadpool).
+
+Por defecto monta ambas versiones en el proceso con `httpx.ASGITransport` y las
+ejecuta contra la base de datos configurada (variables de `app/db/database.py`),
+con el mismo número de clientes concurrentes. Con `--url` prueba un servidor ya
+levantado (por ejemplo, `uvicorn app.main:app`).
+
+Uso (desde la raíz del repo, con PYTHONPATH=$(pwd)):
+    python app/scripts/bench_api.py
+    python app/scripts/bench_api.py --concurrency 200 --requests 5000 --no-cache
+    python app/scripts/bench_api.py --url http://localhost:8000
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+from typing import List, Optional
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, Query
+from sqlalchemy.orm import Session
+from app.db.database import get_db, async_engine, engine
+from app.queries.movies import get_top_movies_by_decade, get_metascore_and_imdb_rating_normalizado
+from app.queries.actor import get_view_actor_movie, decode_cursor
+from app.queries.cache import query_cache
+from app.routers import movies
+
+DEFAULT_PATHS = [
+    "/movies/actors/view?limit=100",
+    "/movies/ratings/diff",
+    "/movies/top-by-decade",
+]
+
+
+def build_async_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(movies.router)
+    return app
+
+
+def build_sync_app() -> FastAPI:
+    """Las rutas como eran antes de la capa asíncrona, para comparar."""
+    router = APIRouter(prefix="/movies")
+
+    @router.get("/top-by-decade")
+    def top_by_decade(db: Session = Depends(get_db)):
+        return get_top_movies_by_decade(db)
+
+    @router.get("/ratings/diff")
+    def ratings_diff(db: Session = Depends(get_db)):
+        return get_metascore_and_imdb_rating_normalizado(db)
+
+    @router.get("/actors/view")
+    def actors_view(
+        actor_name: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        db: Session = Depends(get_db),
+    ):
+        after = decode_cursor(cursor) if cursor else None
+        return get_view_actor_movie(db, actor_name, limit=limit, after=after)
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def run_load(client: httpx.AsyncClient, paths: List[str], total: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            path = paths[index % len(paths)]
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": quantiles[49] * 1000,
+        "p95": quantiles[94] * 1000,
+        "p99": quantiles[98] * 1000,
+    }
+
+
+def print_result(name: str, result: dict) -> None:
+    print(
+        f"{name:<8} {result['requests']:>7} req  {result['rps']:>9,.0f} req/s  "
+        f"p50 {result['p50']:>7.1f} ms  p95 {result['p95']:>7.1f} ms  "
+        f"p99 {result['p99']:>7.1f} ms  errores {result['errors']}"
+    )
+
+
+async def main_async(args) -> None:
+    if args.no_cache:
+        query_cache.maxsize = 0
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            print_result("remoto", await run_load(client, args.paths, args.requests, args.concurrency))
+        return
+
+    apps = {"sync": build_sync_app(), "async": build_async_app()}
+    for name, app in apps.items():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+            await run_load(client, args.paths, min(args.requests, args.concurrency), args.concurrency)  # calentamiento
+            print_result(name, await run_load(client, args.paths, args.requests, args.concurrency))
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga: rutas async vs sync")
+    parser.add_argument("--url", type=str, default=None, help="Servidor a probar (por defecto, en proceso)")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--no-cache", action="store_true", help="Desactiva la caché de consultas")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Registro de consultas lentas con captura automática del plan.
+
+Cuando una sentencia supera `SLOW_QUERY_MS` milisegundos se registra en el
+logger `app.slow_queries` con su duración, la ruta y la función de
+`app/queries` que la ejecutó (ver `app/metrics.py`), el SQL y sus parámetros.
+En un hilo aparte se obtiene su plan con el motor síncrono y se registra a
+continuación:
+
+* PostgreSQL: `EXPLAIN`, o `EXPLAIN (ANALYZE, BUFFERS)` con
+  `SLOW_QUERY_EXPLAIN_ANALYZE=1` (vuelve a ejecutar la consulta).
+* SQLite: `EXPLAIN QUERY PLAN`.
+
+Sólo se piden planes de las sentencias ejecutadas desde funciones marcadas con
+`track_query`. Los planes que recorren una tabla completa (`Seq Scan` / `SCAN tabla` sin
+índice) se marcan con `full_scan=True`, para detectar a tiempo la vista de
+actores o las consultas con funciones de ventana que dejan de usar índices.
+Cada sentencia se explica como mucho una vez cada `SLOW_QUERY_EXPLAIN_INTERVAL`
+segundos; se recuerdan las últimas `SLOW_QUERY_EXPLAIN_CACHE` sentencias (LRU).
+El log rota en `SLOW_QUERY_LOG_FILE` (`SLOW_QUERY_LOG_BYTES` por archivo,
+`SLOW_QUERY_LOG_BACKUPS` copias).
+
+Es opcional: sin `SLOW_QUERY_MS` (o con `0`) no se instalan los eventos, no se
+crea el archivo de log ni se arranca el hilo de `EXPLAIN`.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.metrics import query_context
+from app.queries.cache import LRUCache
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_EXPLAIN_ANALYZE = os.getenv("SLOW_QUERY_EXPLAIN_ANALYZE", "0").lower() in ("1", "true", "yes")
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+SLOW_QUERY_EXPLAIN_CACHE = int(os.getenv("SLOW_QUERY_EXPLAIN_CACHE", "1024"))
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "logs/slow_queries.log")
+SLOW_QUERY_LOG_BYTES = int(os.getenv("SLOW_QUERY_LOG_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+
+FULL_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"\bSeq Scan\b"),
+    # "SCAN movies" recorre la tabla; "SCAN movies USING INDEX ..." no
+    "sqlite": re.compile(r"\bSCAN (?!.*\bUSING (?:COVERING )?INDEX\b)(?!CONSTANT\b)\S+"),
+}
+
+logger = logging.getLogger("app.slow_queries")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = []
+_explained = LRUCache(SLOW_QUERY_EXPLAIN_CACHE)
+_explained_lock = threading.Lock()
+_log_files: set = set()
+
+
+def explain_prefix(dialect: str, analyze: bool = SLOW_QUERY_EXPLAIN_ANALYZE) -> Optional[str]:
+    if dialect == "postgresql":
+        return "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    if dialect == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    if dialect in ("mysql", "mariadb"):
+        return "EXPLAIN ANALYZE " if analyze else "EXPLAIN "
+    return None
+
+
+def _plan_lines(rows: list, dialect: str) -> list:
+    if dialect == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [" | ".join(str(value) for value in row) for row in rows]
+
+
+def _should_explain(statement: str) -> bool:
+    if not re.match(r"\s*(?:--[^\n]*\n\s*)*(SELECT|WITH)\b", statement, re.IGNORECASE):
+        return False
+    now = time.monotonic()
+    with _explained_lock:
+        last = _explained.get(statement)
+        if last is not None and now - last < SLOW_QUERY_EXPLAIN_INTERVAL:
+            return False
+        _explained.set(statement, now)
+    return True
+
+
+def _submit(*args) -> None:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+    _pending.append(_executor.submit(_explain, *args))
+    _pending[:] = [future for future in _pending if not future.done()]
+
+
+def _explain(explain_engine: Engine, clause, parameters: dict, route: str, function: str) -> None:
+    dialect = explain_engine.dialect.name
+    try:
+        # Se recompila para el dialecto del motor síncrono (asyncpg y psycopg2
+        # no comparten el estilo de parámetros)
+        bound = clause.params(**parameters) if parameters else clause
+        compiled = bound.compile(dialect=explain_engine.dialect, compile_kwargs={"render_postcompile": True})
+        params = compiled.params
+        if compiled.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+        with explain_engine.connect() as connection:
+            rows = connection.exec_driver_sql(explain_prefix(dialect) + compiled.string, params).fetchall()
+            connection.rollback()
+    except Exception as error:  # el plan es diagnóstico: nunca debe romper nada
+        logger.warning("No se pudo obtener el plan de %s (%s): %s", function, route, error)
+        return
+
+    plan = _plan_lines(rows, dialect)
+    pattern = FULL_SCAN_PATTERNS.get(dialect)
+    full_scan = bool(pattern and any(pattern.search(line) for line in plan))
+    logger.warning(
+        "Plan de consulta lenta route=%s function=%s full_scan=%s\n%s",
+        route, function, full_scan, "\n".join(plan),
+    )
+
+
+def _add_log_file(path: str) -> None:
+    if not path or path in _log_files:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    handler = RotatingFileHandler(
+        path, maxBytes=SLOW_QUERY_LOG_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS, delay=True
+    )
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    logger.addHandler(handler)
+    if logger.level == logging.NOTSET or logger.level > logging.WARNING:
+        logger.setLevel(logging.WARNING)
+    _log_files.add(path)
+
+
+def install_slow_query_log(
+    engine: Engine,
+    explain_engine: Engine,
+    threshold_ms: float = SLOW_QUERY_MS,
+    log_file: Optional[str] = SLOW_QUERY_LOG_FILE,
+) -> None:
+    """
+    Registra las sentencias de `engine` (o `async_engine.sync_engine`) que
+    superan `threshold_ms`; los planes se piden a `explain_engine`, que debe
+    ser síncrono y apuntar a la misma base de datos.
+    """
+    if threshold_ms <= 0:
+        return
+    _add_log_file(log_file)
+    threshold = threshold_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["slow_query_start"].pop()
+        if elapsed < threshold:
+            return
+        route, function = query_context()
+        logger.warning(
+            "Consulta lenta (%.1f ms) route=%s function=%s\n%s\nparámetros: %r",
+            elapsed * 1000, route, function, statement.strip(), parameters,
+        )
+        # Sólo se explican las sentencias de `app/queries` (no el DDL ni el catálogo)
+        clause = getattr(context, "invoked_statement", None)
+        if function == "-" or clause is None or executemany or explain_prefix(explain_engine.dialect.name) is None:
+            return
+        if _should_explain(statement):
+            compiled_parameters = dict(context.compiled_parameters[0]) if context.compiled_parameters else {}
+            _submit(explain_engine, clause, compiled_parameters, route, function)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("slow_query_start"):
+            connection.info["slow_query_start"].pop()
+
+
+def wait_for_explains(timeout: Optional[float] = None) -> None:
+    """Espera a que terminen los `EXPLAIN` pendientes (tests y scripts)."""
+    wait(list(_pending), timeout=timeout)
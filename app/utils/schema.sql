@@ -10,20 +10,96 @@
 -- ------------------------------------------------------
 CREATE TABLE IF NOT EXISTS movies (
     id SERIAL PRIMARY KEY,
+    imdb_id VARCHAR(20),
     title VARCHAR NOT NULL,
     year INTEGER,
     rating FLOAT,
     duration INTEGER,
-    metascore FLOAT
+    metascore FLOAT,
+    content_hash VARCHAR(32)
 );
 
+-- Bases creadas antes de la clave natural: agregar las columnas si no existen
+-- (las filas anteriores, sin imdb_id, se eliminan tras migrar `actors`; ver abajo)
+ALTER TABLE movies ADD COLUMN IF NOT EXISTS imdb_id VARCHAR(20);
+ALTER TABLE movies ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32);
+
 -- ------------------------------------------------------
--- Tabla: actors
+-- Tabla: people
 -- ------------------------------------------------------
-CREATE TABLE IF NOT EXISTS actors (
+-- Una fila por persona. person_key es el id de IMDb (nm...) o, si no se
+-- conoce, el nombre.
+CREATE TABLE IF NOT EXISTS people (
     id SERIAL PRIMARY KEY,
+    person_key VARCHAR NOT NULL,
+    imdb_person_id VARCHAR(20),
+    name VARCHAR NOT NULL
+);
+
+-- ------------------------------------------------------
+-- Tabla: movie_people
+-- ------------------------------------------------------
+-- Reparto de cada película (enlace película-persona y orden de aparición)
+CREATE TABLE IF NOT EXISTS movie_people (
     movie_id INTEGER NOT NULL REFERENCES movies(id) ON DELETE CASCADE,
-    name VARCHAR
+    person_id INTEGER NOT NULL REFERENCES people(id) ON DELETE CASCADE,
+    ordinal SMALLINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (movie_id, person_id)
+);
+
+-- ------------------------------------------------------
+-- Tabla: data_version
+-- ------------------------------------------------------
+-- Fila única (id = 1) que la carga del scraper incrementa en cada transacción
+-- con cambios. La API la usa para invalidar su caché y para los ETag.
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT now()
+);
+
+INSERT INTO data_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+-- ------------------------------------------------------
+-- Tablas de analítica precalculadas
+-- ------------------------------------------------------
+-- Las refresca el scraper después de cada carga (solo los años afectados).
+-- `analytics_state.version` es la versión de `data_version` que reflejan;
+-- la API las usa solo cuando coincide con la versión actual.
+CREATE TABLE IF NOT EXISTS analytics_state (
+    id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS analytics_top_by_decade (
+    movie_id INTEGER PRIMARY KEY,
+    decade INTEGER,  -- NULL para las películas sin año
+    rn INTEGER NOT NULL,
+    title VARCHAR NOT NULL,
+    year INTEGER,
+    rating FLOAT,
+    metascore FLOAT,
+    duration INTEGER
+);
+
+-- year es NULL en la fila de las películas sin año
+CREATE TABLE IF NOT EXISTS analytics_rating_by_year (
+    id SERIAL PRIMARY KEY,
+    year INTEGER,
+    ratings INTEGER NOT NULL,
+    rating_sum FLOAT NOT NULL,
+    rating_sum_sq FLOAT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS analytics_rating_diff (
+    movie_id INTEGER PRIMARY KEY,
+    year INTEGER,
+    title VARCHAR NOT NULL,
+    rating FLOAT,
+    metascore FLOAT,
+    abs_diff FLOAT,
+    relative_diff FLOAT
 );
 
 -- ------------------------------------------------------
@@ -33,27 +109,103 @@ CREATE TABLE IF NOT EXISTS actors (
 -- Índice en el año de la película (usado en búsquedas por década o filtrado)
 CREATE INDEX IF NOT EXISTS idx_movies_year ON movies(year);
 
--- Índice en movie_id para acelerar joins entre actores y películas
-CREATE INDEX IF NOT EXISTS idx_actors_movie_id ON actors(movie_id);
+-- Índices de las tablas de analítica (lectura ordenada y refresco por año)
+CREATE INDEX IF NOT EXISTS idx_analytics_top_by_decade_decade ON analytics_top_by_decade(decade, rn);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_rating_by_year_year ON analytics_rating_by_year(year);
+CREATE INDEX IF NOT EXISTS idx_analytics_rating_diff_year ON analytics_rating_diff(year);
+
+-- Listado /movies: cada filtro por rango y cada orden se resuelven con un
+-- índice (columna, id), que también sirve para la paginación keyset
+CREATE INDEX IF NOT EXISTS idx_movies_year_id ON movies(year, id);
+CREATE INDEX IF NOT EXISTS idx_movies_rating_id ON movies(rating, id);
+CREATE INDEX IF NOT EXISTS idx_movies_metascore_id ON movies(metascore, id);
+CREATE INDEX IF NOT EXISTS idx_movies_duration_id ON movies(duration, id);
+-- Rango de años y de rating a la vez (la combinación más común)
+CREATE INDEX IF NOT EXISTS idx_movies_year_rating ON movies(year, rating);
+
+-- Clave natural de IMDb (tt...): permite el upsert idempotente de cada carga
+CREATE UNIQUE INDEX IF NOT EXISTS idx_movies_imdb_id ON movies(imdb_id);
+
+-- Clave única de cada persona: permite resolver el id al cargar el reparto
+CREATE UNIQUE INDEX IF NOT EXISTS idx_people_person_key ON people(person_key);
 
--- Índice en el nombre del actor para búsquedas rápidas
-CREATE INDEX IF NOT EXISTS idx_actors_name ON actors(name);
+-- Índice en el nombre de la persona para búsquedas rápidas
+CREATE INDEX IF NOT EXISTS idx_people_name ON people(name);
+
+-- Búsqueda de actores (/movies/actors/search): prefijo sin distinguir
+-- mayúsculas y similitud por trigramas
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_people_name_prefix ON people (lower(name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_people_name_trgm ON people USING gin (lower(name) gin_trgm_ops);
+
+-- Películas de una persona (la PK de movie_people cubre movie_id)
+CREATE INDEX IF NOT EXISTS idx_movie_people_person_id ON movie_people(person_id);
+
+
+-- ------------------------------------------------------
+-- Migración desde la tabla anterior `actors` (movie_id, name)
+-- ------------------------------------------------------
+-- Copia los actores existentes a people/movie_people usando el nombre como
+-- clave. En las cargas siguientes, un actor que llega con id nm... adopta la
+-- fila con su nombre (sin id) en lugar de crear otra.
+-- Una vez verificada la migración se puede eliminar: DROP TABLE actors;
+DO $$
+BEGIN
+    IF to_regclass('actors') IS NOT NULL THEN
+        INSERT INTO people (person_key, name)
+        SELECT DISTINCT name, name FROM actors WHERE name IS NOT NULL AND name <> ''
+        ON CONFLICT (person_key) DO NOTHING;
+
+        INSERT INTO movie_people (movie_id, person_id, ordinal)
+        SELECT a.movie_id, p.id, (ROW_NUMBER() OVER (PARTITION BY a.movie_id ORDER BY MIN(a.id)) - 1)::SMALLINT
+        FROM actors a
+        JOIN people p ON p.person_key = a.name
+        GROUP BY a.movie_id, p.id
+        ON CONFLICT (movie_id, person_id) DO NOTHING;
+    END IF;
+END $$;
+
+-- ------------------------------------------------------
+-- Películas cargadas antes de la clave natural (imdb_id NULL)
+-- ------------------------------------------------------
+-- El esquema anterior no guardaba el id de IMDb, así que no hay de dónde
+-- completarlo y el upsert por imdb_id nunca coincide con estas filas: la
+-- siguiente carga las duplicaría. Se eliminan (su reparto en movie_people se
+-- borra en cascada; las personas se conservan y las adoptan los ids nm... de
+-- la carga siguiente) y se incrementa data_version para invalidar la caché
+-- de la API y las tablas de analítica. Después hay que volver a cargar los
+-- datos: `python -m imdb_movies.refine_load` o un nuevo crawl.
+DO $$
+DECLARE
+    legacy_movies INTEGER;
+BEGIN
+    DELETE FROM movies WHERE imdb_id IS NULL;
+    GET DIAGNOSTICS legacy_movies = ROW_COUNT;
+    IF legacy_movies > 0 THEN
+        UPDATE data_version SET version = version + 1, updated_at = now() WHERE id = 1;
+        RAISE NOTICE 'Eliminadas % películas sin imdb_id; vuelve a cargar los datos', legacy_movies;
+    END IF;
+END $$;
 
 
 -- ------------------------------------------------------
 -- Vista: movie_actor_view
 -- ------------------------------------------------------
 
--- Esta vista une información de películas y actores
+-- Esta vista une información de películas y su reparto
 -- Útil para consultas directas sin necesidad de hacer JOINs manuales
 CREATE OR REPLACE VIEW movie_actor_view AS
 SELECT
-    m.id AS movie_id,
+    mp.movie_id,
     m.title,
     m.year,
     m.rating,
     m.duration,
     m.metascore,
-    a.name AS actor_name
+    p.name AS actor_name,
+    mp.person_id,
+    p.imdb_person_id,
+    mp.ordinal
 FROM movies m
-JOIN actors a ON m.id = a.movie_id;
+JOIN movie_people mp ON mp.movie_id = m.id
+JOIN people p ON p.id = mp.person_id;
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# El proyecto Scrapy importa sus módulos como `imdb_movies.*` desde app/imdb_movies
+SCRAPY_PROJECT_PATH = Path(__file__).resolve().parent.parent / "app" / "imdb_movies"
+if str(SCRAPY_PROJECT_PATH) not in sys.path:
+    sys.path.insert(0, str(SCRAPY_PROJECT_PATH))
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, text
+from app.db.base import Base
+from app.models import models  # noqa: F401  (registra las tablas en Base)
+from app.queries.actor_search import ActorNameIndex, ActorSearchEngine, trigrams
+from app.queries.cache import query_cache
+
+PEOPLE = [
+    # id, name, imdb_person_id, movies
+    (1, "Tom Hanks", "nm0000158", 3),
+    (2, "Tom Hank", None, 1),
+    (3, "Tomás Núñez", None, 0),
+    (4, "Anne Hathaway", "nm0004266", 2),
+    (5, "Tom", None, 0),
+    (6, "Thomas Hanks", None, 0),
+]
+
+
+def test_trigramas_como_pg_trgm():
+    # Ejemplos de la documentación de pg_trgm
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("foo|bar") == {"  f", " fo", "foo", "oo ", "  b", " ba", "bar", "ar "}
+    index = ActorNameIndex.from_rows(None, [(1, "two words", None, 0)])
+    assert index.fuzzy("word", threshold=0.0)[0]["score"] == 0.3636
+
+
+def test_prefijo_y_aproximada_ordenadas_y_paginadas():
+    index = ActorNameIndex.from_rows(1, PEOPLE)
+
+    assert [row["person_id"] for row in index.prefix("TOM")] == [5, 2, 1, 3]
+    assert index.prefix("tom")[0] == {"person_id": 5, "name": "Tom", "imdb_person_id": None, "movies": 0, "score": 1.0}
+    assert [row["person_id"] for row in index.prefix("tom", limit=2, offset=2)] == [1, 3]
+    assert index.prefix("zz") == []
+
+    assert [row["person_id"] for row in index.fuzzy("hanks tom")] == [1, 2, 6, 5]
+    assert [row["person_id"] for row in index.fuzzy("hathaway")] == [4]
+
+
+def test_indice_se_reconstruye_al_cambiar_la_version(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.queries.actor_search import search_actors_async
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO people (id, person_key, name) VALUES (1, 'nm1', 'Tom Hanks')"))
+        connection.execute(text("INSERT INTO data_version (id, version) VALUES (1, 1)"))
+
+    async def search():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}")
+        motor, result = ActorSearchEngine(), []
+        for step in range(2):
+            if step:
+                with engine.begin() as connection:
+                    connection.execute(text("INSERT INTO people (id, person_key, name) VALUES (2, 'nm2', 'tom holland')"))
+                    connection.execute(text("UPDATE data_version SET version = 2"))
+            async with AsyncSession(async_engine) as db:
+                index = await motor.index(db)
+                result.append((index.version, [row["name"] for row in index.prefix("tom h")]))
+            query_cache.clear()
+            async with AsyncSession(async_engine) as db:
+                result.append(len(await search_actors_async(db, "TOM", "prefix")))
+        await async_engine.dispose()
+        return result
+
+    assert asyncio.run(search()) == [(1, ["Tom Hanks"]), 1, (2, ["Tom Hanks", "tom holland"]), 2]
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.models import models  # noqa: F401  (registra las tablas en Base)
+from app.queries.actor import create_view_actor_movie, get_view_actor_movie, iter_view_actor_movie, encode_cursor, decode_cursor
+
+
+def test_cursor_ida_y_vuelta():
+    assert decode_cursor(encode_cursor(12, 34)) == (12, 34)
+    with pytest.raises(ValueError):
+        decode_cursor("no-es-un-cursor")
+
+
+def _engine_con_reparto(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for movie_id in range(1, 4):
+            connection.execute(text(
+                "INSERT INTO movies (id, imdb_id, title, year) VALUES (:id, :imdb_id, 'Pelicula', 2000)"
+            ), {"id": movie_id, "imdb_id": f"tt{movie_id}"})
+        for person_id in range(1, 4):
+            connection.execute(text(
+                "INSERT INTO people (id, person_key, name) VALUES (:id, :key, :name)"
+            ), {"id": person_id, "key": f"nm{person_id}", "name": f"Actor {person_id}"})
+            for movie_id in range(1, 4):
+                connection.execute(text(
+                    "INSERT INTO movie_people (movie_id, person_id, ordinal) VALUES (:m, :p, :p)"
+                ), {"m": movie_id, "p": person_id})
+    with Session(engine) as db:
+        create_view_actor_movie(db)
+    return engine
+
+
+def test_paginacion_keyset_recorre_toda_la_vista(tmp_path):
+    engine = _engine_con_reparto(tmp_path)
+    with Session(engine) as db:
+        keys, after = [], None
+        while True:
+            page = get_view_actor_movie(db, limit=4, after=after)
+            keys += [(row["movie_id"], row["person_id"]) for row in page]
+            if len(page) < 4:
+                break
+            after = keys[-1]
+
+        assert keys == sorted((m, p) for m in range(1, 4) for p in range(1, 4))
+        assert len(get_view_actor_movie(db, "Actor 2", limit=10)) == 3
+
+
+def test_streaming_lee_la_vista_en_bloques(tmp_path):
+    engine = _engine_con_reparto(tmp_path)
+    with Session(engine) as db:
+        chunks = list(iter_view_actor_movie(db, after=(1, 3), chunk_size=4))
+
+    assert [len(rows) for rows in chunks] == [4, 2]
+    assert chunks[0][0]["movie_id"] == 2
@@ -0,0 +1,110 @@
+import multiprocessing
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from imdb_movies.adaptive_throttle import AimdController, parse_retry_after
+
+
+def test_retry_after_en_segundos_y_fecha():
+    assert parse_retry_after(b"5") == 5.0
+    assert parse_retry_after(formatdate(1_000_030, usegmt=True), now=1_000_000) == 30.0
+    assert parse_retry_after("mañana") is None
+    assert parse_retry_after(None) is None
+
+
+def test_aimd_sube_de_a_uno_y_recorta_a_la_mitad():
+    controller = AimdController(concurrency=1, delay=0.3, min_delay=0.1, delay_step=0.1, max_concurrency=4)
+
+    # El retardo baja de forma aditiva hasta el mínimo
+    assert [controller.observe(0.01, 200, None, sent_at=t, now=t) for t in (1, 2)] == ["increase", "increase"]
+    assert controller.delay == pytest.approx(0.1)
+
+    # Luego la concurrencia sube 1 por ventana de respuestas buenas: 1 -> 2 -> 3
+    decisions = [controller.observe(0.01, 200, None, sent_at=t, now=t) for t in range(3, 6)]
+    assert decisions == ["increase", "hold", "increase"]
+    assert controller.slot_concurrency == 3
+
+    # Un 429 con Retry-After recorta y pausa; las respuestas del mismo episodio no recortan otra vez
+    assert controller.observe(0.01, 429, 10, sent_at=6, now=7) == "decrease"
+    assert controller.slot_concurrency == 1 and controller.delay == pytest.approx(0.2)
+    assert controller.slot_delay(now=8) == pytest.approx(9)
+    assert controller.observe(0.01, 503, None, sent_at=6.5, now=8) == "hold"
+    assert controller.observe(0.01, 503, None, sent_at=7.5, now=8) == "decrease"
+
+    # La latencia alta también es congestión
+    slow = AimdController(concurrency=4, delay=0.1, target_latency=1.0)
+    assert slow.observe(3.0, 200, None, sent_at=1, now=2) == "decrease"
+    assert slow.slot_concurrency == 2
+
+
+class _MockImdb(BaseHTTPRequestHandler):
+    throttled = 2
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            throttle = _MockImdb.throttled > 0
+            _MockImdb.throttled -= throttle
+        if throttle:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+        body = b"<html><title>ok</title></html>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _crawl(base_url, queue):
+    import scrapy
+    from scrapy.crawler import CrawlerProcess
+
+    class PagesSpider(scrapy.Spider):
+        name = "pages"
+
+        def start_requests(self):
+            for page in range(40):
+                yield scrapy.Request(f"{base_url}/title/tt{page}/")
+
+        def parse(self, response):
+            yield {"url": response.url}
+
+    process = CrawlerProcess(settings={
+        "EXTENSIONS": {"imdb_movies.adaptive_throttle.AdaptiveThrottle": 500},
+        "ADAPTIVE_THROTTLE_ENABLED": True,
+        "ADAPTIVE_THROTTLE_START_DELAY": 0.2,
+        "ADAPTIVE_THROTTLE_MIN_DELAY": 0.0,
+        "ADAPTIVE_THROTTLE_MAX_CONCURRENCY": 4,
+        "RETRY_TIMES": 3,
+        "LOG_LEVEL": "WARNING",
+    })
+    crawler = process.create_crawler(PagesSpider)
+    process.crawl(crawler)
+    process.start()
+    queue.put(dict(crawler.stats.get_stats()))
+
+
+def test_crawl_contra_servidor_local():
+    pytest.importorskip("scrapy.core.downloader.handlers.http11", exc_type=ImportError)  # falla con versiones de Twisted no soportadas
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockImdb)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    context = multiprocessing.get_context("fork")  # el reactor de Twisted sólo arranca una vez por proceso
+    queue = context.Queue()
+    worker = context.Process(target=_crawl, args=(f"http://127.0.0.1:{server.server_port}", queue))
+    worker.start()
+    stats = queue.get(timeout=60)
+    worker.join(timeout=10)
+    server.shutdown()
+
+    assert stats["item_scraped_count"] == 40
+    assert stats["adaptive_throttle/throttled/429"] == 2
+    assert stats["adaptive_throttle/retry_after"] == 2
+    assert stats["adaptive_throttle/decrease"] >= 1
+    assert stats["adaptive_throttle/max_concurrency"] == 4
+    assert stats["adaptive_throttle/127.0.0.1/concurrency"] == 4
@@ -0,0 +1,109 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from app.db.sqlite import install_sqlite_hooks
+from imdb_movies.models_patterns.database_strategies import SQLiteStrategy
+from imdb_movies.models_patterns.analytics_refresh import refresh_analytics
+from imdb_movies.refine_load import refine_and_load
+from app.queries.movies import (
+    TOP_MOVIES_BY_DECADE,
+    get_standard_deviation_rating,
+    get_top_movies_by_decade,
+    rating_stddev_by_year_query,
+)
+from app.queries.cache import analytics_ready, query_cache
+
+SUMMARY_TABLES = ("analytics_top_by_decade", "analytics_rating_by_year", "analytics_rating_diff")
+
+
+def _frame(rows):
+    return pd.DataFrame([
+        {
+            "movie_id": movie_id,
+            "title": f"Película {movie_id}",
+            "date_published": f"{year}-01-01" if year else None,
+            "rating": rating,
+            "duration_minutes": float(duration),
+            "metascore": metascore,
+            "actors": [],
+        }
+        for movie_id, year, rating, duration, metascore in rows
+    ])
+
+
+def _load(strategy, tmp_path, name, rows):
+    parquet = tmp_path / f"{name}.parquet"
+    _frame(rows).to_parquet(parquet)
+    return refine_and_load([str(parquet)], strategy, workers=1)
+
+
+def _snapshot(strategy):
+    with strategy.engine.connect() as connection:
+        return {
+            # Sin el id autoincremental de analytics_rating_by_year
+            table: sorted(
+                tuple(value for key, value in row._mapping.items() if key != "id" or table != "analytics_rating_by_year")
+                for row in connection.execute(text(f"SELECT * FROM {table}"))
+            )
+            for table in SUMMARY_TABLES
+        }
+
+
+def test_refresco_incremental_igual_al_completo(tmp_path, caplog):
+    caplog.set_level("INFO")
+    strategy = SQLiteStrategy(db_path=str(tmp_path / "movies.db"))
+    strategy.create_tables_if_not_exist()
+    _load(strategy, tmp_path, "a", [
+        ("tt1", 1994, 9.3, 142, 82),
+        ("tt2", 1994, 8.0, 120, 40),
+        ("tt3", 1972, 9.2, 175, 100),
+        ("tt4", 2008, 9.0, 152, 84),
+        ("tt6", 1994, 8.5, 100, 85),
+    ])
+    # tt2 pasa de 1994 a 2001: hay que recalcular ambos años (y ambas décadas)
+    report = _load(strategy, tmp_path, "b", [("tt2", 2001, 7.0, 200, 90), ("tt5", 1995, 6.0, 90, 30)])
+
+    assert report.result.years == {1994, 1995, 2001}
+    assert "Analítica refrescada (incremental" in caplog.text
+    incremental = _snapshot(strategy)
+    with strategy.engine.begin() as connection:
+        refresh_analytics(connection, force=True)
+    assert incremental == _snapshot(strategy)
+    assert [row[0] for row in incremental["analytics_rating_diff"]] == [2, 6]
+
+    query_cache.clear()
+    with Session(strategy.engine) as db:
+        by_year = {row["year"]: row["rating_stddev"] for row in get_standard_deviation_rating(db)}
+        top = get_top_movies_by_decade(db)
+    assert by_year == {1972: 0.0, 1994: 0.57, 1995: 0.0, 2001: 0.0, 2008: 0.0}
+    assert [(row["decade"], row["id"]) for row in top] == [(1970, 3), (1990, 1), (1990, 5), (1990, 6), (2000, 2), (2000, 4)]
+
+
+def test_tablas_resumen_igual_que_consultas_directas_con_year_nulo(tmp_path):
+    strategy = SQLiteStrategy(db_path=str(tmp_path / "movies.db"))
+    strategy.create_tables_if_not_exist()
+    _load(strategy, tmp_path, "a", [
+        ("tt1", 1994, 9.3, 142, 82),
+        ("tt2", 1994, 8.0, 120, 40),
+        ("tt3", None, 9.0, 175, 100),
+        ("tt4", None, 7.0, 95, 84),
+        ("tt5", 2008, 9.0, 152, 84),
+    ])
+    # Refresco incremental que toca el grupo sin año
+    _load(strategy, tmp_path, "b", [("tt4", None, 6.0, 96, 84), ("tt6", None, 8.5, 101, 30)])
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'movies.db'}")
+    install_sqlite_hooks(engine)
+    query_cache.clear()
+    with Session(engine) as db:
+        assert analytics_ready(db)
+        summary = (get_standard_deviation_rating(db), get_top_movies_by_decade(db))
+        live = (
+            [dict(row._mapping) for row in db.execute(rating_stddev_by_year_query("sqlite"))],
+            [dict(row._mapping) for row in db.execute(TOP_MOVIES_BY_DECADE)],
+        )
+    engine.dispose()
+
+    assert summary == live
+    assert {"year": None, "rating_stddev": 1.61} in summary[0]
+    assert [row["id"] for row in summary[1] if row["decade"] is None] == [3, 6, 4]
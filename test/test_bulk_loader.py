@@ -0,0 +1,204 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from imdb_movies.enum_model import ConfigDB
+from imdb_movies.models_patterns.bulk_loader import BulkMovieLoader, build_movie_payloads
+from imdb_movies.models_patterns.database_strategies import SQLiteStrategy
+
+
+@pytest.fixture
+def strategy(tmp_path):
+    strategy = SQLiteStrategy(db_path=str(tmp_path / "movies.db"))
+    strategy.create_tables_if_not_exist()
+    return strategy
+
+
+def _frame():
+    return pd.DataFrame({
+        "movie_id": ["tt0111161", "tt0068646", "tt0068646", None],
+        "title": ["The Shawshank Redemption", "The Godfather", "The Godfather", "Sin id"],
+        "date_published": ["1994-10-14", "1972-03-24", "1972-03-24", "2000-01-01"],
+        "rating": [9.3, 9.1, 9.2, 5.0],
+        "duration_minutes": [142.0, 175.0, 175.0, 90.0],
+        "metascore": [82, 100, 100, None],
+        "actors": [["Tim Robbins", "Morgan Freeman"], "['Marlon Brando']", "['Marlon Brando', 'Al Pacino']", []],
+    })
+
+
+def _load(strategy, df, batch_size=1):
+    session = strategy.get_session()
+    try:
+        result = strategy.get_bulk_loader(batch_size=batch_size).load_frame(session, df)
+        session.commit()
+        counts = (
+            session.execute(text("SELECT COUNT(*) FROM movies")).scalar(),
+            session.execute(text("SELECT COUNT(*) FROM movie_people")).scalar(),
+        )
+        return result, counts
+    finally:
+        session.close()
+
+
+def test_registros_por_columnas():
+    df = pd.DataFrame({
+        "movie_id": ["tt1", "tt2", "tt3", ""],
+        "title": ["Con todo", "Sin datos", None, "Sin id"],
+        "date_published": ["1994-10-14", "fecha rota", "2000-01-01", "2000-01-01"],
+        "rating": pd.array([9.25, None, 5.0, 5.0], dtype="Float32"),
+        "duration_minutes": [142.9, float("nan"), 90.0, 90.0],
+        "metascore": pd.array([82, None, 50, 50], dtype="Int16"),
+        "actors": [["Tim Robbins"], None, [], []],
+    })
+    rows, casts, invalid = build_movie_payloads(df)
+    assert invalid == 2
+    assert [row["imdb_id"] for row in rows] == ["tt1", "tt2"]
+
+    full, empty = rows
+    assert (full["year"], full["rating"], full["duration"], full["metascore"]) == (1994, 9.25, 142, 82.0)
+    assert all(type(full[column]) in (int, float) for column in ("year", "rating", "duration", "metascore"))
+    assert (empty["year"], empty["rating"], empty["duration"], empty["metascore"]) == (None, None, None, None)
+    assert [member.name for member in casts[0]] == ["Tim Robbins"] and casts[1] == []
+
+    # Sin columnas opcionales (p. ej. salida antigua sin `actors`/`metascore`)
+    rows, casts, _ = build_movie_payloads(df[["movie_id", "title"]])
+    assert rows[0]["metascore"] is None and casts == [[], []]
+
+
+def test_lotes_no_cambian_el_resultado(tmp_path):
+    df = pd.DataFrame({
+        "movie_id": [f"tt{i}" for i in range(7)],
+        "title": [f"Película {i}" for i in range(7)],
+        "date_published": ["2001-01-01"] * 7,
+        "actors": [[f"Actor {i}", f"Actor {i + 1}"] for i in range(7)],
+    })
+    snapshots = []
+    for batch_size in (1, 3, 1000):
+        strategy = SQLiteStrategy(db_path=str(tmp_path / f"lotes_{batch_size}.db"))
+        strategy.create_tables_if_not_exist()
+        result, counts = _load(strategy, df, batch_size=batch_size)
+        session = strategy.get_session()
+        cast = session.execute(text("""
+            SELECT m.imdb_id, p.name, mp.ordinal
+            FROM movie_people mp JOIN movies m ON m.id = mp.movie_id JOIN people p ON p.id = mp.person_id
+            ORDER BY m.imdb_id, mp.ordinal
+        """)).all()
+        session.close()
+        snapshots.append(((result.movies, result.actors, result.people), counts, cast))
+    assert snapshots[0] == snapshots[1] == snapshots[2]
+    assert snapshots[0][0] == (7, 14, 8)
+
+
+def test_tamano_de_lote_por_defecto(strategy):
+    assert strategy.get_bulk_loader().batch_size == ConfigDB.BULK_BATCH_SIZE.value
+    assert strategy.get_bulk_loader(batch_size=50).batch_size == 50
+    assert BulkMovieLoader().load_frame(None, pd.DataFrame()).movies == 0
+
+
+def test_dialecto_sin_returning_en_executemany(strategy, monkeypatch):
+    # Como MySQL: los ids se consultan después del upsert
+    monkeypatch.setattr(strategy.engine.dialect, "insert_executemany_returning", False)
+    result, counts = _load(strategy, _frame(), batch_size=2)
+    assert (result.movies, result.actors, result.skipped) == (2, 4, 0)
+    assert counts == (2, 4)
+
+    session = strategy.get_session()
+    cast = session.execute(text("""
+        SELECT m.imdb_id, p.name FROM movie_people mp
+        JOIN movies m ON m.id = mp.movie_id JOIN people p ON p.id = mp.person_id
+        ORDER BY m.imdb_id, mp.ordinal
+    """)).all()
+    session.close()
+    assert cast == [
+        ("tt0068646", "Marlon Brando"),
+        ("tt0068646", "Al Pacino"),
+        ("tt0111161", "Tim Robbins"),
+        ("tt0111161", "Morgan Freeman"),
+    ]
+
+
+def test_carga_idempotente_por_imdb_id(strategy):
+    result, counts = _load(strategy, _frame())
+    assert (result.movies, result.actors, result.skipped) == (2, 4, 0)
+    assert counts == (2, 4)
+
+    result, counts = _load(strategy, _frame())
+    assert (result.movies, result.actors, result.skipped) == (0, 0, 2)
+    assert counts == (2, 4)
+
+
+def test_carga_actualiza_filas_modificadas(strategy):
+    _load(strategy, _frame())
+    df = _frame()
+    df.loc[0, "rating"] = 9.0
+    df.at[0, "actors"] = ["Morgan Freeman"]
+
+    result, counts = _load(strategy, df)
+    assert (result.movies, result.skipped) == (1, 1)
+    assert counts == (2, 3)
+
+    session = strategy.get_session()
+    rating = session.execute(text("SELECT rating FROM movies WHERE imdb_id = 'tt0111161'")).scalar()
+    session.close()
+    assert rating == 9.0
+
+
+def test_personas_normalizadas_por_id_o_nombre(strategy):
+    df = _frame()
+    df["actor_ids"] = [["nm0000209", "nm0000151"], None, None, None]
+    df.at[2, "actors"] = ["Marlon Brando", "Morgan Freeman", "Marlon Brando"]
+    df.at[2, "actor_ids"] = ["", "nm0000151", ""]
+
+    result, counts = _load(strategy, df)
+    assert (result.movies, result.actors, result.people) == (2, 4, 3)
+    assert counts == (2, 4)
+
+    session = strategy.get_session()
+    people = session.execute(text("SELECT person_key, imdb_person_id, name FROM people ORDER BY id")).all()
+    cast = session.execute(text("""
+        SELECT m.imdb_id, p.name, mp.ordinal
+        FROM movie_people mp
+        JOIN movies m ON m.id = mp.movie_id
+        JOIN people p ON p.id = mp.person_id
+        ORDER BY m.imdb_id, mp.ordinal
+    """)).all()
+    session.close()
+
+    assert people == [
+        ("nm0000209", "nm0000209", "Tim Robbins"),
+        ("nm0000151", "nm0000151", "Morgan Freeman"),
+        ("Marlon Brando", None, "Marlon Brando"),
+    ]
+    assert cast == [
+        ("tt0068646", "Marlon Brando", 0),
+        ("tt0068646", "Morgan Freeman", 1),
+        ("tt0111161", "Tim Robbins", 0),
+        ("tt0111161", "Morgan Freeman", 1),
+    ]
+
+
+def test_carga_sobre_actores_migrados_por_nombre(strategy):
+    # Estado que deja la migración de `actors`: personas con el nombre como clave y sin id
+    _load(strategy, _frame())
+    session = strategy.get_session()
+    assert session.execute(text("SELECT COUNT(*) FROM people WHERE imdb_person_id IS NULL")).scalar() == 4
+    session.close()
+
+    df = _frame()
+    df["actor_ids"] = [["nm0000209", "nm0000151"], None, ["nm0000008", "nm0000199"], None]
+    df.loc[0, "rating"] = 9.0
+    df.loc[2, "rating"] = 9.0
+    result, counts = _load(strategy, df)
+    assert (result.movies, result.people) == (2, 0)
+    assert counts == (2, 4)
+
+    session = strategy.get_session()
+    people = session.execute(text("SELECT person_key, imdb_person_id, name FROM people ORDER BY name")).all()
+    per_person = session.execute(text("SELECT person_id, COUNT(*) FROM movie_people GROUP BY person_id")).all()
+    session.close()
+    assert people == [
+        ("nm0000199", "nm0000199", "Al Pacino"),
+        ("nm0000008", "nm0000008", "Marlon Brando"),
+        ("nm0000151", "nm0000151", "Morgan Freeman"),
+        ("nm0000209", "nm0000209", "Tim Robbins"),
+    ]
+    assert len(per_person) == 4
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+import pytest
+from scrapy import Request, Spider
+from scrapy.crawler import Crawler
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse, Response
+from imdb_movies.conditional import ConditionalRequestMiddleware, load_succeeded
+from imdb_movies.models_patterns.bulk_loader import LoadResult
+from imdb_movies.pipelines import ImdbMoviesPipeline
+
+URL = "https://www.imdb.com/title/tt0113277/"
+PAGE = b"<html><title>Heat</title></html>"
+
+
+def _middleware(tmp_path):
+    # Sin reactor: el middleware no descarga nada
+    crawler = Crawler(Spider, {"TWISTED_REACTOR": None, "INCREMENTAL_CRAWL": True, "INCREMENTAL_CRAWL_DB": str(tmp_path / "v.sqlite")})
+    crawler._apply_settings()
+    middleware = ConditionalRequestMiddleware.from_crawler(crawler)
+    middleware.crawler = crawler
+    return crawler.stats, middleware
+
+
+def _fetch(middleware, status=200, body=PAGE, headers=None, conditional=True):
+    request = Request(URL, meta={"conditional": conditional})
+    middleware.process_request(request, None)
+    response_class = HtmlResponse if body else Response
+    return request, middleware.process_response(request, response_class(URL, status=status, body=body, headers=headers, request=request), None)
+
+
+def test_validadores_y_paginas_sin_cambios(tmp_path):
+    stats, middleware = _middleware(tmp_path)
+    _fetch(middleware, headers={"ETag": '"v1"', "Last-Modified": "Tue, 01 Sep 2026 10:00:00 GMT"})
+    _, response = _fetch(middleware, conditional=False)
+    assert response.status == 200 and stats.get_value("incremental/new") == 1
+    middleware.crawler.signals.send_catch_log(signal=load_succeeded)
+    middleware.spider_closed(None, "finished")
+
+    stats, middleware = _middleware(tmp_path)
+    with pytest.raises(IgnoreRequest):
+        _fetch(middleware, status=304, body=b"")
+    with pytest.raises(IgnoreRequest):
+        _fetch(middleware)  # 200 con el mismo cuerpo
+    request, response = _fetch(middleware, body=PAGE + b"<!-- v2 -->")
+    assert request.headers["If-None-Match"] == b'"v1"'
+    assert request.headers["If-Modified-Since"] == b"Tue, 01 Sep 2026 10:00:00 GMT"
+    assert response.status == 200
+
+    assert stats.get_value("incremental/conditional_requests") == 3
+    assert stats.get_value("incremental/not_modified") == 1
+    assert stats.get_value("incremental/unchanged_body") == 1
+    assert stats.get_value("incremental/changed") == 1
+    assert stats.get_value("incremental/parse_calls_saved") == 2
+    assert stats.get_value("incremental/bytes_saved") == len(PAGE)
+
+    # Un crawl interrumpido no actualiza los validadores
+    middleware.spider_closed(None, "shutdown")
+    stats, middleware = _middleware(tmp_path)
+    with pytest.raises(IgnoreRequest):
+        _fetch(middleware)
+
+
+@pytest.mark.parametrize("load_error", [None, RuntimeError("base de datos no disponible")])
+def test_validadores_solo_tras_una_carga_exitosa(tmp_path, monkeypatch, load_error):
+    def refine_and_load(*args, **kwargs):
+        if load_error:
+            raise load_error
+        return SimpleNamespace(result=LoadResult(movies=1))
+
+    monkeypatch.setattr("imdb_movies.pipelines.refine_and_load", refine_and_load)
+    monkeypatch.setattr("imdb_movies.pipelines.get_database_strategy", lambda logger=None: None)
+    _, middleware = _middleware(tmp_path)
+    _fetch(middleware)
+    spider = Spider("imdb", crawler=middleware.crawler)
+    pipeline = ImdbMoviesPipeline()
+    pipeline.output_document_json_path = pipeline.output_document_parquet_path = None
+    pipeline._refine_and_load(spider, ["movies.jsonl"])  # los errores de carga sólo se registran
+    middleware.spider_closed(spider, "finished")
+
+    _, middleware = _middleware(tmp_path)
+    if load_error:
+        _, response = _fetch(middleware)  # la página se vuelve a extraer
+        assert response.status == 200
+    else:
+        with pytest.raises(IgnoreRequest):
+            _fetch(middleware)
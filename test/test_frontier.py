@@ -0,0 +1,127 @@
+import json
+import multiprocessing
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from imdb_movies.frontier import Frontier, SeedSource, load_seed_sources
+
+
+def test_frontera_sin_repetidos_por_prioridad_y_con_tope(tmp_path):
+    frontier = Frontier(tmp_path / "frontier.sqlite", limit=3)
+    assert frontier.add("tt1", "u1", 10, "top", {"title": "A"}) == "added"
+    assert frontier.add("tt2", "u2", 0, "search", {}) == "added"
+    assert frontier.add("tt2", "u2", 50, "list", {}) == "duplicate"  # sube su prioridad
+    assert frontier.add("tt3", "u3", 10, "top", {}) == "added"
+    assert frontier.add("tt4", "u4", 99, "top", {}) == "full"
+
+    assert [title[0] for title in frontier.pop(2)] == ["tt2", "tt1"]
+    assert frontier.pop(5)[0] == ("tt3", "u3", 10, {})
+    assert frontier.pop(5) == [] and len(frontier) == 3
+    frontier.done("tt1")
+    frontier.close()
+
+    # Al reanudar se vuelven a pedir los despachados sin terminar
+    frontier = Frontier(tmp_path / "frontier.sqlite", limit=3, resume=True)
+    assert sorted(title[0] for title in frontier.pop(5)) == ["tt2", "tt3"]
+    frontier.close()
+    assert len(Frontier(tmp_path / "frontier.sqlite")) == 0
+
+
+def test_fuentes_semilla(tmp_path):
+    search = SeedSource("drama", "https://www.imdb.com/search/title/?genres=drama&start={start}", kind="search", max_pages=3, page_size=50)
+    assert search.page_url(2) == "https://www.imdb.com/search/title/?genres=drama&start=101"
+    assert search.has_page(2) and not search.has_page(3)
+    with pytest.raises(ValueError):
+        SeedSource("drama", "https://www.imdb.com/search/title/", kind="search")
+
+    seeds = tmp_path / "seeds.json"
+    seeds.write_text(json.dumps([{"name": "top", "url": "https://www.imdb.com/chart/top/", "priority": 100}]))
+    assert load_seed_sources(str(seeds))[0].priority == 100
+    assert load_seed_sources(None)[0].name == "top"
+
+
+def _ld_json(data):
+    return f'<script type="application/ld+json">{json.dumps(data)}</script>'
+
+
+def _chart(base, ids):
+    items = [{"item": {"url": f"{base}/title/tt{i}/", "name": f"Película {i}", "aggregateRating": {"ratingValue": 8.0}, "duration": "PT2H"}} for i in ids]
+    return _ld_json({"itemListElement": items})
+
+
+class _MockImdb(BaseHTTPRequestHandler):
+    def do_GET(self):
+        base = f"http://{self.headers['Host']}"
+        url = urlparse(self.path)
+        if url.path == "/chart/top/":
+            body = _chart(base, range(1, 31))
+        elif url.path == "/list/ls1/":
+            body = _chart(base, range(20, 41))
+        elif url.path == "/search/title/":
+            start = int(parse_qs(url.query)["start"][0])
+            body = "".join(f'<a href="/title/tt{i}/">{i}</a>' for i in range(start + 34, min(start + 44, 66)))
+        elif url.path.startswith("/title/"):
+            title_id = url.path.split("/")[2]
+            body = _ld_json({"name": f"Película {title_id}", "aggregateRating": {"ratingValue": 7.5}, "duration": "PT1H30M", "actor": [{"name": "Actor", "url": "/name/nm1/"}]})
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = f"<html><head>{body}</head></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _crawl(seeds, frontier_db, queue):
+    from scrapy.crawler import CrawlerProcess
+    from imdb_movies.spiders.imdb_movies_spider import ImdbMoviesSpiderSpider
+
+    items = []
+
+    class Collect:
+        def process_item(self, item, spider):
+            items.append(dict(item)["info_movie"])
+            return item
+
+    process = CrawlerProcess(settings={"ITEM_PIPELINES": {Collect: 300}, "LOG_LEVEL": "WARNING"})
+    crawler = process.create_crawler(ImdbMoviesSpiderSpider)
+    process.crawl(crawler, refine=0, seeds=seeds, total_scrapy=60, frontier_db=frontier_db)
+    process.start()
+    queue.put((items, {key: value for key, value in crawler.stats.get_stats().items() if key.startswith("frontier/")}))
+
+
+def test_crawl_con_varias_fuentes(tmp_path, monkeypatch):
+    pytest.importorskip("scrapy.core.downloader.handlers.http11", exc_type=ImportError)  # falla con versiones de Twisted no soportadas
+    monkeypatch.setattr("imdb_movies.enum_model.ConfigImdb.FRONTIER_IN_FLIGHT._value_", 4)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockImdb)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    seeds = tmp_path / "seeds.json"
+    seeds.write_text(json.dumps([
+        {"name": "top", "kind": "chart", "url": f"{base}/chart/top/", "priority": 100},
+        {"name": "lista", "kind": "list", "url": f"{base}/list/ls1/", "priority": 50},
+        {"name": "busqueda", "kind": "search", "url": f"{base}/search/title/?start={{start}}", "priority": 0, "max_pages": 10, "page_size": 10},
+    ]))
+
+    context = multiprocessing.get_context("fork")  # el reactor de Twisted sólo arranca una vez por proceso
+    queue = context.Queue()
+    worker = context.Process(target=_crawl, args=(str(seeds), str(tmp_path / "frontier.sqlite"), queue))
+    worker.start()
+    items, stats = queue.get(timeout=60)
+    worker.join(timeout=10)
+    server.shutdown()
+
+    # Búsqueda: tt35..tt65 en páginas de 10; la frontera no repite títulos y se detiene en el tope de 60
+    movie_ids = [movie["movie_id"] for movie in items]
+    assert len(movie_ids) == len(set(movie_ids)) == 60
+    assert set(movie_ids) == {f"tt{i}" for i in range(1, 61)}
+    assert stats["frontier/added"] == 60 and stats["frontier/duplicate"] >= 11
+    search_movie = next(movie for movie in items if movie["movie_id"] == "tt50")
+    assert search_movie["title"] == "Película tt50" and search_movie["rating"] == 7.5
@@ -0,0 +1,36 @@
+import pytest
+from imdb_movies.imdb_extract import extract_ld_json, extract_metascore, find_ld_json
+
+PAGE = (
+    '<html><head><script>var x = 1;</script>'
+    '<script type="application/ld+json">{"name": "Heat", "actor": [{"name": "Al Pacino"}], '
+    '"isFamilyFriendly": false}</script></head>'
+    '<body><script id="__NEXT_DATA__">{"metacritic":{"metascore":{"score":76}}}</script></body></html>'
+)
+
+
+def test_extract_ld_json_decodifica_json_real():
+    info_movie = extract_ld_json(PAGE)
+    assert info_movie["name"] == "Heat"
+    assert info_movie["isFamilyFriendly"] is False
+
+
+def test_extract_ld_json_respaldo_literal_eval():
+    page = "<script type='application/ld+json'>{'name': 'Heat'}</script>"
+    assert extract_ld_json(page) == {"name": "Heat"}
+
+
+def test_extract_ld_json_sin_script():
+    assert find_ld_json("<html></html>") is None
+    assert extract_ld_json("<html></html>") is None
+
+
+def test_extract_ld_json_invalido():
+    with pytest.raises(ValueError):
+        extract_ld_json('<script type="application/ld+json">{"name": </script>')
+
+
+def test_extract_metascore():
+    assert extract_metascore(PAGE, extract_ld_json(PAGE)) == "76"
+    assert extract_metascore(PAGE, {"metascore": 90}) == "90"
+    assert extract_metascore("<html></html>") == ""
@@ -0,0 +1,65 @@
+import json
+import logging
+import pandas as pd
+from imdb_movies.enum_model import ConfigRefine
+from imdb_movies.imdb_refine import CreatorOutputData, parse_iso_durations
+
+
+def test_parse_iso_durations():
+    durations = pd.Series(["PT2H22M", "PT45M", "P1DT1H", "PT1M30S", None, "desconocida", "P1W"])
+
+    minutes, invalid = parse_iso_durations(durations)
+
+    assert minutes.tolist()[:4] == [142.0, 45.0, 1500.0, 1.5]
+    assert minutes.iloc[6] == 7 * 24 * 60
+    assert minutes.iloc[[4, 5]].isna().all()
+    assert invalid.tolist() == [False, False, False, False, False, True, False]
+
+
+def test_valores_invalidos_en_un_solo_aviso(caplog):
+    records = [
+        {"info_movie": {"title": "A", "rating": "x", "duration": "PT2H", "metascore": "77", "date_published": "1994"}},
+        {"info_movie": {"title": "B", "rating": 9.1, "duration": "??", "date_published": "1972-03-24"}},
+        {"info_movie": {"title": "C", "rating": "y", "duration": "PT1H5M"}},
+    ]
+
+    with caplog.at_level(logging.WARNING):
+        df = CreatorOutputData(logger=logging.getLogger("test")).refine_records(records)
+
+    assert df["duration_minutes"].tolist()[::2] == [120.0, 65.0]
+    assert df["rating"].isna().tolist() == [True, False, True]
+    assert df["metascore"].iloc[0] == 77
+    assert df["date_published"].dt.year.tolist()[:2] == [1994, 1972]
+    assert len(caplog.records) == 1
+    assert "rating=2" in caplog.text and "duration=1" in caplog.text
+
+
+def _json_lines(tmp_path, count):
+    items = [
+        {"info_movie": {"movie_id": f"tt{i}", "title": f"Película {i}", "rating": 8.0, "duration": "PT1H30M", "date_published": "2000-01-01"}}
+        for i in range(count)
+    ]
+    lines = [json.dumps(item, ensure_ascii=False) for item in items]
+    lines.insert(2, "")
+    # Última línea truncada, como la de un proceso interrumpido
+    file_path = tmp_path / "movies_info.jsonl"
+    file_path.write_text("\n".join(lines) + '\n{"info_movie": {"title": "trunc', encoding="utf-8")
+    return file_path
+
+
+def test_lee_json_lines_por_bloques(tmp_path, caplog):
+    file_path = _json_lines(tmp_path, 5)
+    reader = CreatorOutputData(document_json_path=str(file_path), chunk_size=2, logger=logging.getLogger("test"))
+
+    with caplog.at_level(logging.WARNING):
+        batches = list(reader.iter_movie_batches())
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [item["info_movie"]["movie_id"] for batch in batches for item in batch] == [f"tt{i}" for i in range(5)]
+    assert "Línea 7 inválida" in caplog.text
+
+
+
+def test_config_refine_sin_alias():
+    # Un miembro con el mismo valor que otro (False == 0) se vuelve su alias y desaparece de la enumeración
+    assert list(ConfigRefine.__members__) == [member.name for member in ConfigRefine]
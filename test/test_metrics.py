@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+import subprocess
+from pathlib import Path
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+from app import metrics
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def count_rows(db: Session) -> int:
+    return db.execute(text("SELECT COUNT(*) FROM movies")).scalar()
+
+
+def test_desactivadas_por_defecto():
+    # Los valores por defecto se leen del entorno al importar: se comprueban en un proceso sin las variables
+    env = {key: value for key, value in os.environ.items() if key not in ("METRICS_ENABLED", "SLOW_QUERY_MS")}
+    code = "from app import metrics; print(metrics.METRICS_ENABLED, metrics.TRACK_QUERIES, metrics.track_query(len) is len)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    assert output.stdout.split() == ["False", "False", "True"]
+
+
+def test_latencias_por_ruta_y_funcion(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "TRACK_QUERIES", True)
+    tracked_count_rows = metrics.track_query(count_rows)
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", poolclass=metrics.timed_pool_class(QueuePool, "test"))
+    metrics.install_engine_metrics(engine, "test")
+    for metric in (metrics.REQUEST_LATENCY, metrics.QUERY_LATENCY, metrics.POOL_WAIT, metrics.POOL_CONNECTS):
+        metric.clear()
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE movies (id INTEGER PRIMARY KEY)"))
+
+    api = FastAPI()
+    api.add_middleware(metrics.MetricsMiddleware)
+    api.include_router(metrics.router)
+
+    @api.get("/movies/{movie_id}")
+    def movie(movie_id: int):
+        with Session(engine) as db:
+            return {"rows": tracked_count_rows(db)}
+
+    with TestClient(api) as client:
+        assert client.get("/movies/1").json() == {"rows": 0}
+        client.get("/movies/2")
+        body = client.get("/metrics").text
+
+    assert 'http_request_duration_seconds_count{method="GET",route="/movies/{movie_id}",status="200"} 2' in body
+    assert (
+        'db_query_duration_seconds_count{engine="test",route="/movies/{movie_id}",function="test_metrics.count_rows"} 2'
+        in body
+    )
+    assert 'db_pool_checkout_seconds_count{engine="test"} 3' in body  # CREATE TABLE y dos peticiones
+    assert 'db_pool_connections_opened_total{engine="test"} 1' in body  # el pool reutiliza la conexión
+    assert 'db_pool_checked_out{engine="test"} 0' in body
+    assert engine.raw_connection.__func__ is type(engine).raw_connection  # el motor no se modifica
+
+
+def test_espera_del_pool_agotado(tmp_path):
+    pool_class = metrics.timed_pool_class(QueuePool, "espera")
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=pool_class, pool_size=1, max_overflow=0)
+    metrics.POOL_WAIT.clear()
+
+    held = engine.connect()
+    threading.Timer(0.3, held.close).start()
+    with engine.connect():  # espera a que se devuelva la única conexión
+        pass
+    body = metrics.render_metrics()
+    assert 'db_pool_checkout_seconds_bucket{engine="espera",le="0.1"} 1' in body
+    assert 'db_pool_checkout_seconds_count{engine="espera"} 2' in body
+
+    engine.dispose()
+    assert type(engine.pool) is pool_class
@@ -0,0 +1,124 @@
+import os
+import asyncio
+import itertools
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+# app.db.database crea los motores al importarse a partir de DB/NAMEDB
+os.environ.setdefault("DB", "sqlite")
+
+from app.db.base import Base  # noqa: E402
+from app.models import models  # noqa: E402,F401  (registra las tablas en Base)
+from app.queries.movies import MOVIE_SORTS, _movie_list_query, decode_movie_cursor, encode_movie_cursor  # noqa: E402
+from app.slow_queries import FULL_SCAN_PATTERNS  # noqa: E402
+
+RANGES = {"year": (1990, 1999), "rating": (7.0, 9.0), "metascore": (60, 90), "duration": (90, 150)}
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'movies.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO movies (id, imdb_id, title, year, rating, duration, metascore) "
+                "VALUES (:id, :imdb_id, :title, :year, :rating, :duration, :metascore)"
+            ),
+            [
+                {
+                    "id": movie_id, "imdb_id": f"tt{movie_id}", "title": f"Película {movie_id}",
+                    "year": 1950 + movie_id % 70, "rating": round(1 + movie_id % 90 / 10, 1),
+                    "duration": 60 + movie_id % 150, "metascore": None if movie_id % 7 == 0 else movie_id % 100,
+                }
+                for movie_id in range(1, 2001)
+            ],
+        )
+    return engine
+
+
+def _filters(columns):
+    filters = {}
+    for column in columns:
+        filters[f"{column}_min"], filters[f"{column}_max"] = RANGES[column]
+    return filters
+
+
+def test_cursor_de_listado_ida_y_vuelta():
+    assert decode_movie_cursor(encode_movie_cursor("-rating", 8.5, 12), "-rating") == (8.5, 12)
+    with pytest.raises(ValueError):
+        decode_movie_cursor("no-es-un-cursor", "year")
+    for other in ("rating", "-year", "id"):  # otra columna o la misma en la otra dirección
+        with pytest.raises(ValueError, match="orden"):
+            decode_movie_cursor(encode_movie_cursor("-rating", 8.5, 12), other)
+
+
+def test_cada_combinacion_de_filtros_usa_un_indice(tmp_path):
+    engine = _engine(tmp_path)
+    full_scan = FULL_SCAN_PATTERNS["sqlite"]
+    with engine.connect() as connection:
+        for size in range(1, len(RANGES) + 1):
+            for columns in itertools.combinations(RANGES, size):
+                for sort in ("id", "-rating", "year"):
+                    query, params = _movie_list_query(_filters(columns), sort, limit=51)
+                    plan = [row[-1] for row in connection.execute(text("EXPLAIN QUERY PLAN " + query.text), params)]
+                    assert not any(full_scan.search(line) for line in plan), (columns, sort, plan)
+        for sort in MOVIE_SORTS:
+            query, params = _movie_list_query(sort=f"-{sort}", limit=51, after=(1, 1))
+            plan = [row[-1] for row in connection.execute(text("EXPLAIN QUERY PLAN " + query.text), params)]
+            assert not any(full_scan.search(line) for line in plan), (sort, plan)
+            assert not any("TEMP B-TREE" in line for line in plan), (sort, plan)
+
+
+def test_paginacion_keyset_con_filtros(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.queries.movies import get_movies_async
+
+    engine = _engine(tmp_path)
+    filters = _filters(("year", "metascore"))
+    with engine.connect() as connection:
+        query, params = _movie_list_query(filters, "-rating")
+        expected = [row.id for row in connection.execute(query, params)]
+
+    async def pages():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'movies.db'}")
+        ids, after = [], None
+        async with AsyncSession(async_engine) as db:
+            while True:
+                rows = await get_movies_async(db, filters, "-rating", limit=7, after=after)
+                ids += [row["id"] for row in rows]
+                if len(rows) < 7:
+                    break
+                after = decode_movie_cursor(encode_movie_cursor("-rating", rows[-1]["rating"], rows[-1]["id"]), "-rating")
+        await async_engine.dispose()
+        return ids
+
+    assert expected and asyncio.run(pages()) == expected
+
+
+def test_ruta_rechaza_cursor_de_otro_orden(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.db.database import AsyncSessionLocal
+    from app.routers import movies
+
+    _engine(tmp_path).dispose()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'movies.db'}")
+    previous = AsyncSessionLocal.kw["bind"]
+    AsyncSessionLocal.configure(bind=async_engine)
+    api = FastAPI()
+    api.include_router(movies.router)
+    try:
+        with TestClient(api) as client:
+            response = client.get("/movies", params={"sort": "-rating", "limit": 5})
+            cursor = response.headers["X-Next-Cursor"]
+            following = client.get("/movies", params={"sort": "-rating", "limit": 5, "cursor": cursor})
+            assert following.status_code == 200 and len(following.json()) == 5
+            response = client.get("/movies", params={"sort": "rating", "limit": 5, "cursor": cursor})
+            assert response.status_code == 400
+            assert "orden" in response.json()["detail"]
+    finally:
+        AsyncSessionLocal.configure(bind=previous)
+        asyncio.run(async_engine.dispose())
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, text
+from app.db.base import Base
+from app.db.sqlite import install_sqlite_hooks
+from app.models import models  # noqa: F401  (registra las tablas en Base)
+from app.queries.movies import TOP_MOVIES_BY_DECADE, rating_differences_query, rating_stddev_by_year_query
+from app.queries.numpy_engine import MovieArrays, NumpyAnalyticsEngine
+
+ROWS = [
+    # id, title, year, rating, duration, metascore
+    (1, "A", 1994, 9.3, 142, 82),
+    (2, "B", 1994, 8.0, 120, 40),
+    (3, "C", 1995, 6.0, 90, None),
+    (4, "D", 1972, 9.2, 175, 100),
+    (5, "E", None, 7.0, 100, 20),
+    (6, "F", 1999, None, None, 50),
+    (7, "G", None, 8.0, 95, 80),
+]
+
+
+def test_arreglos_reproducen_las_consultas_sql(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    install_sqlite_hooks(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO movies (id, title, year, rating, duration, metascore) "
+                "VALUES (:id, :title, :year, :rating, :duration, :metascore)"
+            ),
+            [dict(zip(("id", "title", "year", "rating", "duration", "metascore"), row)) for row in ROWS],
+        )
+        sql = {
+            name: [dict(row._mapping) for row in connection.execute(query)]
+            for name, query in (
+                ("top", TOP_MOVIES_BY_DECADE),
+                ("stddev", rating_stddev_by_year_query("sqlite")),
+                ("diff", rating_differences_query("sqlite")),
+            )
+        }
+    engine.dispose()
+
+    arrays = MovieArrays.from_rows(1, ROWS, nulls_first=True)  # SQLite ordena los NULL al principio
+    assert arrays.top_by_decade() == sql["top"]
+    assert arrays.rating_stddev_by_year() == sql["stddev"]
+    assert arrays.rating_differences() == sql["diff"]
+    assert [(row["decade"], row["id"]) for row in sql["top"]] == [(None, 5), (None, 7), (1970, 4), (1990, 1), (1990, 2), (1990, 3)]
+    assert sql["stddev"][0] == {"year": None, "rating_stddev": 0.71}
+
+    # En PostgreSQL el grupo sin año va al final
+    top = MovieArrays.from_rows(1, ROWS).top_by_decade(top_n=2)
+    assert [(row["decade"], row["id"], row["rn"]) for row in top] == [
+        (1970, 4, 1), (1990, 1, 1), (1990, 2, 2), (None, 5, 1), (None, 7, 2),
+    ]
+
+
+def test_motor_recarga_al_cambiar_la_version(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO movies (imdb_id, title, year, rating) VALUES ('tt1', 'A', 2000, 8.0)"))
+        connection.execute(text("INSERT INTO data_version (id, version) VALUES (1, 1)"))
+
+    async def sizes():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}")
+        motor, result = NumpyAnalyticsEngine(), []
+        for step in range(2):
+            if step:
+                with engine.begin() as connection:
+                    connection.execute(text("INSERT INTO movies (imdb_id, title, year) VALUES ('tt2', 'B', 2001)"))
+                    connection.execute(text("UPDATE data_version SET version = 2"))
+            async with AsyncSession(async_engine) as db:
+                arrays = await motor.arrays(db)
+                result.append((arrays.version, len(arrays)))
+        await async_engine.dispose()
+        return result
+
+    assert asyncio.run(sizes()) == [(1, 1), (2, 2)]
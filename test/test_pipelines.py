@@ -0,0 +1,43 @@
+import json
+import logging
+from types import SimpleNamespace
+from imdb_movies.pipelines import ImdbMoviesPipeline, JsonLinesWriter
+
+
+def _lines(file_path):
+    return file_path.read_text(encoding="utf-8").splitlines()
+
+
+def test_escritor_json_lines_vuelca_por_bloques(tmp_path):
+    output = tmp_path / "movies_info.jsonl"
+    writer = JsonLinesWriter(str(output), buffer_size=2)
+
+    writer.write({"info_movie": {"title": "Amélie"}})
+    assert _lines(output) == []  # todavía en el búfer
+    writer.write({"info_movie": {"title": "Heat"}})
+    assert len(_lines(output)) == 2  # búfer lleno: ya está en disco
+    writer.write({"info_movie": {"title": "Ran"}})
+    writer.flush()
+    assert len(_lines(output)) == 3
+
+    writer.write({"info_movie": {"title": "Up"}})
+    writer.close()
+    writer.close()  # cerrar dos veces no falla
+    assert writer.count == 4
+    assert [json.loads(line)["info_movie"]["title"] for line in _lines(output)] == ["Amélie", "Heat", "Ran", "Up"]
+    assert "Amélie" in output.read_text(encoding="utf-8")  # sin escapes \u
+
+
+def test_pipeline_refina_en_el_proceso(monkeypatch):
+    calls = []
+
+    def refine_and_load(input_paths, strategy, **kwargs):
+        calls.append(kwargs)
+        raise RuntimeError("sin base de datos")
+
+    monkeypatch.setattr("imdb_movies.pipelines.refine_and_load", refine_and_load)
+    monkeypatch.setattr("imdb_movies.pipelines.get_database_strategy", lambda logger=None: None)
+    pipeline = ImdbMoviesPipeline()
+    pipeline.output_document_json_path = pipeline.output_document_parquet_path = None
+    pipeline._refine_and_load(SimpleNamespace(logger=logging.getLogger("test")), ["movies_info.jsonl"])
+    assert calls[0]["workers"] == 1
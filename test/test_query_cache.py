@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.models import models  # noqa: F401  (registra las tablas en Base)
+from app.queries.cache import LRUCache, cached_query, query_cache
+
+
+def test_lru_expulsa_la_entrada_menos_usada():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c"), len(cache)) == (1, 3, 2)
+
+
+def test_cached_query_se_invalida_con_la_version(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    calls = []
+
+    @cached_query
+    def count_movies(db, min_year=None):
+        calls.append(min_year)
+        return db.execute(text("SELECT COUNT(*) FROM movies")).scalar()
+
+    query_cache.clear()
+    for _ in range(2):
+        with Session(engine) as db:
+            assert count_movies(db, min_year=2000) == 0
+    assert calls == [2000]
+
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO movies (imdb_id, title) VALUES ('tt1', 'Nueva')"))
+        connection.execute(text("INSERT INTO data_version (id, version) VALUES (1, 1)"))
+
+    with Session(engine) as db:
+        assert count_movies(db, min_year=2000) == 1
+        assert count_movies(db, min_year=1990) == 1
+    assert calls == [2000, 2000, 1990]
+
+
+def test_cached_query_asincrona_usa_la_misma_version(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO data_version (id, version) VALUES (1, 5)"))
+    calls = []
+
+    @cached_query
+    async def count_movies(db):
+        calls.append(1)
+        return (await db.execute(text("SELECT COUNT(*) FROM movies"))).scalar()
+
+    async def run():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}")
+        results = []
+        for _ in range(2):
+            async with AsyncSession(async_engine) as db:
+                results.append(await count_movies(db))
+        await async_engine.dispose()
+        return results
+
+    query_cache.clear()
+    assert asyncio.run(run()) == [0, 0]
+    assert calls == [1]
@@ -0,0 +1,113 @@
+import json
+import pytest
+import pandas as pd
+from sqlalchemy import text
+from imdb_movies.models_patterns.database_strategies import SQLiteStrategy
+from imdb_movies.refine_load import refine_and_load
+
+
+def _item(movie_id, title, actors):
+    return {"info_movie": {
+        "title": title,
+        "alternate_title": title,
+        "rating": 8.5,
+        "duration": "PT2H22M",
+        "movie_url": f"https://www.imdb.com/title/{movie_id}/",
+        "movie_id": movie_id,
+        "date_published": "1994-10-14",
+        "actors": actors,
+        "metascore": 80,
+    }}
+
+
+def test_refina_y_carga_shards_en_paralelo(tmp_path):
+    shard_a = tmp_path / "movies_info-0.jsonl"
+    shard_b = tmp_path / "movies_info-1.jsonl"
+    shard_a.write_text(
+        json.dumps(_item("tt0111161", "The Shawshank Redemption", ["Tim Robbins"])) + "\n"
+        + '{"info_movie": {"title": "trunc\n'
+        + json.dumps(_item("tt0068646", "The Godfather", ["Marlon Brando", "Al Pacino"])) + "\n",
+        encoding="utf-8",
+    )
+    shard_b.write_text(
+        json.dumps(_item("tt0468569", "The Dark Knight", ["Christian Bale"])) + "\n",
+        encoding="utf-8",
+    )
+    strategy = SQLiteStrategy(db_path=str(tmp_path / "movies.db"))
+    strategy.create_tables_if_not_exist()
+    csv_path = tmp_path / "refine.csv"
+
+    report = refine_and_load(
+        [str(shard_a), str(shard_b)], strategy, csv_path=str(csv_path), workers=2, chunk_size=2
+    )
+
+    assert report.read.rows == 4
+    assert report.refine.rows == report.load.rows == 3
+    assert (report.result.movies, report.result.actors) == (3, 4)
+    with strategy.engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM movies")).scalar() == 3
+        assert connection.execute(text("SELECT duration FROM movies WHERE imdb_id = 'tt0111161'")).scalar() == 142
+    assert len(pd.read_csv(csv_path)) == 3
+
+
+def test_parquet_refinado_se_carga_sin_reinterpretar(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    shard = tmp_path / "movies_info.jsonl"
+    shard.write_text(
+        json.dumps(_item("tt0068646", "The Godfather", ["Marlon Brando", "Al Pacino"])) + "\n"
+        + json.dumps(_item("tt0468569", "The Dark Knight", ["Christian Bale"])) + "\n",
+        encoding="utf-8",
+    )
+    parquet_path = tmp_path / "refine.parquet"
+    source = SQLiteStrategy(db_path=str(tmp_path / "source.db"))
+    source.create_tables_if_not_exist()
+    refine_and_load([str(shard)], source, parquet_path=str(parquet_path), workers=1)
+
+    schema = pq.read_schema(parquet_path)
+    assert str(schema.field("actors").type) == "list<element: string>"
+    assert str(schema.field("metascore").type) == "int16"
+
+    target = SQLiteStrategy(db_path=str(tmp_path / "target.db"))
+    target.create_tables_if_not_exist()
+    report = refine_and_load([str(parquet_path)], target, workers=1)
+
+    assert report.refine.rows == 0
+    assert (report.result.movies, report.result.actors) == (2, 3)
+
+
+def test_un_solo_bloque_no_arranca_el_pool(tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("no debe arrancar el pool de procesos")
+
+    monkeypatch.setattr("imdb_movies.refine_load.ProcessPoolExecutor", no_pool)
+    shard = tmp_path / "movies_info.jsonl"
+    shard.write_text(
+        json.dumps(_item("tt0068646", "The Godfather", ["Marlon Brando"])) + "\n"
+        + json.dumps(_item("tt0468569", "The Dark Knight", ["Christian Bale"])) + "\n",
+        encoding="utf-8",
+    )
+    strategy = SQLiteStrategy(db_path=str(tmp_path / "movies.db"))
+    strategy.create_tables_if_not_exist()
+
+    report = refine_and_load([str(shard)], strategy, workers=4, chunk_size=10)
+    assert report.chunks == 1 and report.result.movies == 2
+    assert refine_and_load([], strategy, workers=4).chunks == 0
+
+
+def test_refinado_bloque_a_bloque_sin_concatenar(tmp_path, monkeypatch):
+    shard = tmp_path / "movies_info.jsonl"
+    shard.write_text(
+        "".join(json.dumps(_item(f"tt{i}", f"Película {i}", [f"Actor {i}"])) + "\n" for i in range(5)),
+        encoding="utf-8",
+    )
+    strategy = SQLiteStrategy(db_path=str(tmp_path / "movies.db"))
+    strategy.create_tables_if_not_exist()
+    csv_path = tmp_path / "refine.csv"
+    monkeypatch.setattr(pd, "concat", lambda *args, **kwargs: pytest.fail("no debe concatenar los bloques"))
+
+    report = refine_and_load([str(shard)], strategy, csv_path=str(csv_path), workers=1, chunk_size=2)
+    assert report.chunks == 3 and report.refine.rows == 5
+    monkeypatch.undo()
+    exported = pd.read_csv(csv_path)
+    assert exported["title"].tolist() == [f"Película {i}" for i in range(5)]
+    assert exported["duration_minutes"].tolist() == [142.0] * 5
@@ -0,0 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from imdb_movies.reparse import reparse_pages
+from imdb_movies.response_archive import ResponseArchive
+
+FIXTURES_PATH = Path(__file__).resolve().parent.parent / "app" / "imdb_movies" / "benchmarks" / "fixtures"
+
+
+def _archive(tmp_path):
+    archive = ResponseArchive(tmp_path)
+    for fixture in sorted(FIXTURES_PATH.glob("title_*.html")):
+        title_id = fixture.stem.split("_")[1]
+        url = f"https://www.imdb.com/title/{title_id}/"
+        meta = {"title": title_id, "movie_url": url, "movie_id": title_id, "actors": [], "metascore": ""}
+        archive.add_page(title_id, url, b"<html>version anterior</html>", meta, fetched_at=1.0)
+        archive.add_page(title_id, url, fixture.read_bytes(), meta, fetched_at=2.0)
+    return archive
+
+
+def test_ultima_descarga_de_cada_titulo(tmp_path):
+    archive = _archive(tmp_path)
+    pages = archive.latest_pages()
+    assert [page.title_id for page in pages] == ["tt0068646", "tt0111161", "tt0468569"]
+    assert {page.fetched_at for page in pages} == {2.0}
+    assert [page.title_id for page in archive.latest_pages(["tt0111161"])] == ["tt0111161"]
+    archive.close()
+
+
+def test_reextraccion_en_paralelo_sin_red(tmp_path):
+    archive = _archive(tmp_path)
+    pages = archive.latest_pages()
+    tasks = [(str(archive.objects), pages[:1]), (str(archive.objects), pages[1:])]
+
+    serial = [item for task in tasks for item in reparse_pages(task)]
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = [item for items in executor.map(reparse_pages, tasks) for item in items]
+
+    assert serial == parallel
+    movies = {item["info_movie"]["movie_id"]: item["info_movie"] for item in serial}
+    assert list(movies) == ["tt0068646", "tt0111161", "tt0468569"]
+    assert all(len(movie["actors"]) >= 3 for movie in movies.values())
+    assert movies["tt0111161"]["date_published"].startswith("1994")
+    archive.close()
@@ -0,0 +1,52 @@
+import pytest
+from scrapy import Request, Spider
+from scrapy.crawler import Crawler
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse
+from imdb_movies.response_archive import ResponseArchive, ResponseArchiveMiddleware
+
+PAGE = b"<html><head><title>Heat</title></head><body>" + b"x" * 5000 + b"</body></html>"
+
+
+def test_cuerpos_direccionados_por_contenido(tmp_path):
+    archive = ResponseArchive(tmp_path)
+    written = archive.record("a", "https://www.imdb.com/title/tt1/", "GET", 200, {"Content-Type": ["text/html"]}, PAGE)
+    again = archive.record("b", "https://www.imdb.com/title/tt2/", "GET", 200, {}, PAGE)
+
+    assert 0 < written < len(PAGE) and again == 0
+    assert len(list((tmp_path / "objects").rglob("*.gz"))) == 1
+    assert archive.lookup("b").body_sha256 == archive.lookup("a").body_sha256
+    assert archive.get_body(archive.lookup("a").body_sha256) == PAGE
+    assert archive.lookup("c") is None
+    assert len(archive) == 2
+    archive.close()
+
+
+def _middleware(tmp_path, mode):
+    # Sin reactor: el middleware no descarga nada
+    crawler = Crawler(Spider, {"TWISTED_REACTOR": None, "RESPONSE_ARCHIVE_MODE": mode, "RESPONSE_ARCHIVE_DIR": str(tmp_path)})
+    crawler._apply_settings()
+    return crawler, ResponseArchiveMiddleware.from_crawler(crawler)
+
+
+def test_grabar_y_reproducir_sin_red(tmp_path):
+    request = Request("https://www.imdb.com/title/tt0113277/")
+    response = HtmlResponse(
+        request.url, status=200, headers={"Content-Type": "text/html; charset=utf-8", "ETag": '"v1"'},
+        body=PAGE, request=request,
+    )
+    crawler, recorder = _middleware(tmp_path, "record")
+    assert recorder.process_response(request, response, None) is response
+    assert crawler.stats.get_value("response_archive/record/responses") == 1
+    recorder.spider_closed(None)
+
+    crawler, player = _middleware(tmp_path, "replay")
+    replayed = player.process_request(Request(request.url), None)
+    assert isinstance(replayed, HtmlResponse)
+    assert (replayed.status, replayed.body, replayed.headers[b"ETag"]) == (200, PAGE, b'"v1"')
+    assert "replay" in replayed.flags and replayed.css("title::text").get() == "Heat"
+
+    with pytest.raises(IgnoreRequest):
+        player.process_request(Request("https://www.imdb.com/title/tt9999999/"), None)
+    assert crawler.stats.get_value("response_archive/replay/hit") == 1
+    assert crawler.stats.get_value("response_archive/replay/miss") == 1
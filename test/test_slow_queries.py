@@ -0,0 +1,64 @@
+import os
+import sys
+import subprocess
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from app import metrics, slow_queries
+from app.metrics import track_query
+from app.queries.cache import LRUCache
+from app.slow_queries import install_slow_query_log, wait_for_explains
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def by_title(connection, title):
+    return connection.execute(text("SELECT id FROM slow_movies WHERE title = :title"), {"title": title}).fetchall()
+
+
+def by_year(connection, year):
+    return connection.execute(text("SELECT id FROM slow_movies WHERE year = :year"), {"year": year}).fetchall()
+
+
+def test_consultas_lentas_con_plan(tmp_path, caplog, monkeypatch):
+    monkeypatch.setattr(metrics, "TRACK_QUERIES", True)  # como con SLOW_QUERY_MS al importar app.metrics
+    caplog.set_level("WARNING", logger="app.slow_queries")
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE slow_movies (id INTEGER PRIMARY KEY, title TEXT, year INTEGER)"))
+        connection.execute(text("CREATE INDEX ix_slow_movies_year ON slow_movies (year)"))
+    install_slow_query_log(engine, explain_engine=engine, threshold_ms=1e-6, log_file=str(tmp_path / "slow.log"))
+
+    with engine.connect() as connection:
+        track_query(by_title)(connection, "Heat")
+        track_query(by_year)(connection, 1995)
+    wait_for_explains(timeout=10)
+
+    assert "function=test_slow_queries.by_title\nSELECT id FROM slow_movies WHERE title = ?" in caplog.text
+    assert "parámetros: ('Heat',)" in caplog.text
+    assert "function=test_slow_queries.by_title full_scan=True\nSCAN slow_movies" in caplog.text
+    assert "function=test_slow_queries.by_year full_scan=False\nSEARCH slow_movies USING " in caplog.text
+    assert "full_scan=True" in (tmp_path / "slow.log").read_text(encoding="utf-8")
+
+
+def test_sin_umbral_no_se_instala(tmp_path, monkeypatch):
+    monkeypatch.setattr(slow_queries, "_executor", None)
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    install_slow_query_log(engine, explain_engine=engine, threshold_ms=0, log_file=str(tmp_path / "logs" / "slow.log"))
+    assert not engine.dispatch.after_cursor_execute
+    assert not (tmp_path / "logs").exists()
+    assert slow_queries._executor is None
+
+    # El umbral por defecto se lee del entorno al importar: se comprueba en un proceso sin SLOW_QUERY_MS
+    env = {key: value for key, value in os.environ.items() if key != "SLOW_QUERY_MS"}
+    code = "from app import slow_queries; print(slow_queries.SLOW_QUERY_MS)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "0.0"
+
+
+def test_sentencias_explicadas_acotadas(monkeypatch):
+    monkeypatch.setattr(slow_queries, "_explained", LRUCache(maxsize=2))
+    assert all(slow_queries._should_explain(f"SELECT {i}") for i in range(5))
+    assert len(slow_queries._explained) == 2
+    assert not slow_queries._should_explain("SELECT 4")  # reciente: dentro del intervalo
+    assert slow_queries._should_explain("SELECT 0")  # expulsada por LRU
+    assert not slow_queries._should_explain("INSERT INTO movies VALUES (1)")
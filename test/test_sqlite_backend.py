@@ -0,0 +1,138 @@
+import os
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+# app.db.database crea los motores al importarse a partir de DB/NAMEDB
+os.environ.setdefault("DB", "sqlite")
+
+from app.db.base import Base  # noqa: E402
+from app.db.sqlite import install_sqlite_hooks, round_numeric, sqlite_connect_args  # noqa: E402
+from app.models import models  # noqa: E402,F401  (registra las tablas en Base)
+from app.queries import movies  # noqa: E402
+from app.queries.cache import query_cache  # noqa: E402
+from app.queries.numpy_engine import MovieArrays, numpy_engine  # noqa: E402
+
+ROWS = [
+    # id, title, year, rating, duration, metascore
+    (1, "A", 1994, 9.3, 142, 82),
+    (2, "B", 1994, 8.0, 120, 40),
+    (3, "C", 1995, 4.1, 90, 20),
+    (4, "D", 1972, 9.2, 175, 100),
+    (5, "E", 1995, 7.0, 100, 20),
+    (6, "F", 1999, None, None, 50),
+    (7, "G", None, 7.5, 130, 30),
+    (8, "H", None, 5.5, 95, None),
+]
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    install_sqlite_hooks(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for movie_id, title, year, rating, duration, metascore in ROWS:
+            connection.execute(
+                text(
+                    "INSERT INTO movies (id, imdb_id, title, year, rating, duration, metascore) "
+                    "VALUES (:id, :imdb_id, :title, :year, :rating, :duration, :metascore)"
+                ),
+                {
+                    "id": movie_id, "imdb_id": f"tt{movie_id}", "title": title, "year": year,
+                    "rating": rating, "duration": duration, "metascore": metascore,
+                },
+            )
+    return engine
+
+
+def test_round_como_numeric_de_postgresql():
+    # 4.1 / 4 = 1.0249999... en double; ROUND(x::numeric, 2) da 1.03
+    assert round_numeric(4.1 / 4, 2) == 1.03
+    assert round_numeric(-2.345, 2) == -2.35
+    assert round_numeric(None, 2) is None
+
+
+def test_endpoints_sobre_sqlite_igual_que_postgresql(tmp_path):
+    engine = _engine(tmp_path)
+    arrays = MovieArrays.from_rows(None, ROWS, nulls_first=True)
+
+    query_cache.clear()
+    with Session(engine) as db:
+        top = movies.get_top_movies_by_decade(db)
+        stddev = movies.get_standard_deviation_rating(db)
+        diff = movies.get_metascore_and_imdb_rating_normalizado(db)
+
+    assert [(row["decade"], row["id"]) for row in top] == [(row["decade"], row["id"]) for row in arrays.top_by_decade()]
+    assert [row["decade"] for row in top][:2] == [None, None]
+    assert stddev == arrays.rating_stddev_by_year()
+    assert stddev[0] == {"year": None, "rating_stddev": 1.41}
+    assert [{key: row[key] for key in ("id", "abs_diff", "relative_diff")} for row in diff] == [
+        {key: row[key] for key in ("id", "abs_diff", "relative_diff")} for row in arrays.rating_differences()
+    ]
+
+
+def test_funciones_registradas_en_aiosqlite(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    _engine(tmp_path)
+
+    async def stddev():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}", connect_args=sqlite_connect_args())
+        install_sqlite_hooks(async_engine.sync_engine)
+        query_cache.clear()
+        async with AsyncSession(async_engine) as db:
+            result = await movies.get_standard_deviation_rating_async(db)
+            journal = (await db.execute(text("PRAGMA journal_mode"))).scalar()
+        await async_engine.dispose()
+        return result, journal
+
+    result, journal = asyncio.run(stddev())
+    assert result == MovieArrays.from_rows(None, ROWS, nulls_first=True).rating_stddev_by_year()
+    assert journal == "wal"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.db.database import AsyncSessionLocal
+    from app.routers import movies as movies_router
+
+    _engine(tmp_path).dispose()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}", connect_args=sqlite_connect_args())
+    install_sqlite_hooks(async_engine.sync_engine)
+    previous = AsyncSessionLocal.kw["bind"]
+    AsyncSessionLocal.configure(bind=async_engine)
+    query_cache.clear()
+    api = FastAPI()
+    api.include_router(movies_router.router)
+    with TestClient(api) as test_client:
+        yield test_client
+    AsyncSessionLocal.configure(bind=previous)
+    query_cache.clear()
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.mark.parametrize("engine_name", ["sql", "numpy"])
+def test_rutas_con_peliculas_sin_year(client, monkeypatch, engine_name):
+    monkeypatch.setattr(movies, "ANALYTICS_ENGINE", engine_name)
+    monkeypatch.setattr(numpy_engine, "_arrays", None)
+    arrays = MovieArrays.from_rows(None, ROWS, nulls_first=True)
+
+    response = client.get("/movies/top-by-decade")
+    assert response.status_code == 200
+    top = response.json()
+    assert [(row["decade"], row["id"]) for row in top] == [(row["decade"], row["id"]) for row in arrays.top_by_decade()]
+    assert {row["id"]: row["year"] for row in top if row["decade"] is None} == {7: None, 8: None}
+    assert next(row for row in top if row["id"] == 8)["metascore"] is None
+
+    response = client.get("/movies/ratings/std-dev")
+    assert response.status_code == 200
+    assert response.json() == arrays.rating_stddev_by_year()
+    assert response.json()[0] == {"year": None, "rating_stddev": 1.41}
+
+    assert client.get("/movies/ratings/diff").status_code == 200
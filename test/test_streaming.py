@@ -0,0 +1,129 @@
+import os
+import csv
+import io
+import json
+import asyncio
+from datetime import date
+from decimal import Decimal
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+# app.db.database crea los motores al importarse a partir de DB/NAMEDB
+os.environ.setdefault("DB", "sqlite")
+
+from app.db.base import Base  # noqa: E402
+from app.models import models  # noqa: E402,F401  (registra las tablas en Base)
+from app.queries.actor import create_view_actor_movie  # noqa: E402
+from app.routers.streaming import encode_csv, encode_ndjson, stream_format  # noqa: E402
+
+
+def _request(accept=None):
+    headers = [(b"accept", accept.encode())] if accept else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+def test_formato_por_parametro_o_por_accept():
+    assert stream_format(_request(), "csv") == "csv"
+    assert stream_format(_request("text/csv"), "ndjson") == "ndjson"  # el parámetro manda
+    assert stream_format(_request("text/csv"), "json") is None
+    assert stream_format(_request("application/json, text/csv;q=0.5")) == "csv"
+    assert stream_format(_request("Application/X-NDJSON")) == "ndjson"
+    assert stream_format(_request("application/ndjson")) == "ndjson"
+    assert stream_format(_request("application/json")) is None
+    assert stream_format(_request()) is None
+
+
+async def _chunks(*chunks):
+    for rows in chunks:
+        yield rows
+
+
+def _encode(encoder, *chunks):
+    async def collect():
+        return [data async for data in encoder(_chunks(*chunks))]
+    return asyncio.run(collect())
+
+
+def test_ndjson_una_linea_por_fila():
+    rows = [{"id": 1, "title": "Amélie", "rating": Decimal("8.30")}, {"id": 2, "title": None, "date": date(2001, 4, 25)}]
+    out = _encode(encode_ndjson, rows[:1], [], rows[1:])
+    assert out == [
+        '{"id": 1, "title": "Amélie", "rating": "8.30"}\n',
+        '{"id": 2, "title": null, "date": "2001-04-25"}\n',
+    ]
+    assert _encode(encode_ndjson) == []
+
+
+def test_csv_con_encabezado_y_comillas():
+    rows = [{"id": 1, "title": 'Dr. Strangelove, or "How I Learned"'}, {"id": 2, "title": "Línea\nnueva"}]
+    out = _encode(encode_csv, [], rows[:1], rows[1:])
+    assert len(out) == 2 and out[0].startswith("id,title\r\n")
+    assert "id,title" not in out[1]
+    assert list(csv.DictReader(io.StringIO("".join(out)))) == [
+        {"id": "1", "title": 'Dr. Strangelove, or "How I Learned"'},
+        {"id": "2", "title": "Línea\nnueva"},
+    ]
+    assert _encode(encode_csv, []) == []
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.db.database import AsyncSessionLocal
+    from app.routers import movies
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO movies (id, imdb_id, title, year, rating, duration, metascore) VALUES (1, 'tt1', 'Heat, 1995', 1995, 8.3, 170, 76)"))
+        for person_id in range(1, 6):
+            connection.execute(text("INSERT INTO people (id, person_key, name) VALUES (:id, :key, :name)"), {"id": person_id, "key": f"nm{person_id}", "name": f"Actor {person_id}"})
+            connection.execute(text("INSERT INTO movie_people (movie_id, person_id, ordinal) VALUES (1, :id, :id)"), {"id": person_id})
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}")
+    previous = AsyncSessionLocal.kw["bind"]
+    AsyncSessionLocal.configure(bind=async_engine)
+    monkeypatch.setattr(movies, "STREAM_CHUNK_SIZE", 2)
+    api = FastAPI()
+    api.include_router(movies.router)
+    with TestClient(api) as test_client:
+        yield test_client, tmp_path / "api.db"
+    AsyncSessionLocal.configure(bind=previous)
+    asyncio.run(async_engine.dispose())
+
+
+def _create_view(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as db:
+        create_view_actor_movie(db)
+    engine.dispose()
+
+
+def test_vista_en_streaming_por_la_ruta(client):
+    client, db_path = client
+    _create_view(db_path)
+
+    response = client.get("/movies/actors/view", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'inline; filename="movie_actor_view.ndjson"'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["person_id"] for row in rows] == [1, 2, 3, 4, 5]  # bloques de 2, sin `limit`
+
+    response = client.get("/movies/actors/view", params={"format": "csv", "actor_name": "Actor 3"})
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["title"], row["actor_name"]) for row in rows] == [("Heat, 1995", "Actor 3")]
+
+
+def test_error_en_el_primer_bloque_es_un_500(client):
+    client, _ = client  # sin la vista movie_actor_view: la consulta falla al leer el primer bloque
+    response = client.get("/movies/actors/view", params={"format": "ndjson"})
+    assert response.status_code == 500
+    assert "Error al obtener datos de la vista" in response.json()["detail"]